@@ -7,7 +7,7 @@ from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 
-from ..services.scheduler_service import SchedulerService
+from ..services.scheduler_service import SchedulerService, get_scheduler
 
 # Create router
 router = APIRouter()
@@ -50,7 +50,7 @@ class CronJobResponse(CronJobBase):
 # Dependency
 def get_scheduler_service():
     """Get the scheduler service"""
-    return SchedulerService()
+    return get_scheduler()
 
 
 # Routes
@@ -117,6 +117,14 @@ class DownloadResponse(BaseModel):
     message: str
 
 
+class DownloadInProgress(BaseModel):
+    """Model for a download in progress"""
+
+    video_id: str
+    started_at: str
+    user: Optional[str] = None
+
+
 class DownloadStatusResponse(BaseModel):
     """Response model for checking download status"""
 
@@ -124,6 +132,7 @@ class DownloadStatusResponse(BaseModel):
     video_id: Optional[str] = None
     started_at: Optional[str] = None
     user: Optional[str] = None
+    downloads: List[DownloadInProgress] = []
 
 
 # Nostrmedia models
@@ -6,7 +6,7 @@ from typing import Any, Dict, List
 
 from fastapi import APIRouter, Depends, HTTPException
 
-from ..services.scheduler_service import SchedulerService
+from ..services.scheduler_service import SchedulerService, get_scheduler
 from ..services.video_service import download_status
 from .models import DownloadStatusResponse
 
@@ -17,7 +17,7 @@ router = APIRouter()
 # Dependency
 def get_scheduler_service():
     """Get the scheduler service"""
-    return SchedulerService()
+    return get_scheduler()
 
 
 @router.get("/jobs", response_model=List[Dict[str, Any]])
@@ -77,8 +77,10 @@ def get_download_status():
     - **video_id**: The ID of the video being downloaded (if any)
     - **started_at**: When the download started (ISO format)
     - **user**: Identifier for the user who initiated the download
+    - **downloads**: All downloads in progress, the fields above for each
 
-    This endpoint is useful for monitoring download progress and preventing
-    concurrent downloads that could cause conflicts.
+    Different videos are downloaded at the same time, the fields outside of
+    **downloads** describe the earliest running download. This endpoint is
+    useful for monitoring download progress and avoiding duplicate requests.
     """
-    return download_status
+    return download_status()
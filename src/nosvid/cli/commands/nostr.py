@@ -2,11 +2,14 @@
 Nostr command for nosvid CLI
 """
 
+import logging
 import os
 from datetime import datetime
 
 from ...metadata.list import list_videos
+from ...nostr import upload as nostr_upload
 from ...nostr.upload import upload_to_nostr
+from ...platforms.youtube import VIDEO_SUFFIXES
 from ...utils.filesystem import (
     get_platform_dir,
     load_json_file,
@@ -28,6 +31,11 @@ def nostr_command(args):
         int: Exit code
     """
     try:
+        if args.debug:
+            # Show the upload module's debug log on the console
+            logging.basicConfig(format="%(message)s")
+            nostr_upload.logger.setLevel(logging.DEBUG)
+
         channel_title = get_channel_title()
         print(f"Channel title: {channel_title}")
 
@@ -92,10 +100,10 @@ def nostr_command(args):
             return 1
 
         # Find the video file
-        video_files = []
-        for file in os.listdir(youtube_dir):
-            if file.endswith(".mp4") or file.endswith(".webm") or file.endswith(".mkv"):
-                video_files.append(os.path.join(youtube_dir, file))
+        with os.scandir(youtube_dir) as entries:
+            video_files = [
+                entry.path for entry in entries if entry.name.endswith(VIDEO_SUFFIXES)
+            ]
 
         if not video_files:
             print(f"No video files found in: {youtube_dir}")
@@ -2,6 +2,7 @@
 Nostrmedia command for nosvid CLI
 """
 
+import logging
 import os
 from datetime import datetime
 
@@ -10,6 +11,7 @@ from ...metadata.common import (
     update_main_metadata,
     update_platform_metadata,
 )
+from ...nostrmedia import upload as nostrmedia_upload
 from ...platforms.nostrmedia import (
     update_nostrmedia_metadata,
     upload_video_to_nostrmedia,
@@ -30,6 +32,11 @@ def nostrmedia_command(args):
         int: Exit code
     """
     try:
+        if args.debug:
+            # Show the upload module's debug log on the console
+            logging.basicConfig(format="%(message)s")
+            nostrmedia_upload.logger.setLevel(logging.DEBUG)
+
         channel_title = get_channel_title()
         print(f"Channel title: {channel_title}")
 
@@ -8,6 +8,7 @@ import os
 from datetime import datetime
 
 from ..utils.filesystem import (
+    StatCache,
     get_platform_dir,
     get_video_dir,
     load_json_file,
@@ -20,6 +21,11 @@ COLORS = {
     "RESET": "\033[0m",  # Reset to default color
 }
 
+# What list_videos needs from the main metadata.json of recently listed
+# videos, keyed by path and validated against (st_ino, st_mtime_ns, st_size).
+# save_json_file replaces files, so a rewrite also changes the inode.
+_summary_cache = StatCache(8192)
+
 
 def generate_metadata_from_files(video_dir, video_id):
     """
@@ -137,6 +143,96 @@ def generate_metadata_from_files(video_dir, video_id):
     return main_metadata
 
 
+def _summarize_metadata(video_id, main_metadata):
+    """
+    Extract the fields list_videos reports from a video's main metadata
+
+    Args:
+        video_id: ID of the video
+        main_metadata: Main metadata dictionary
+
+    Returns:
+        Video dictionary as listed by list_videos
+    """
+    platforms = main_metadata.get("platforms", {})
+
+    # Check if YouTube platform exists and get download status
+    youtube_downloaded = False
+    if "youtube" in platforms:
+        youtube_downloaded = platforms["youtube"].get("downloaded", False)
+
+    # Check if nostrmedia platform exists
+    nostrmedia_url = ""
+    if "nostrmedia" in platforms:
+        nostrmedia_url = platforms["nostrmedia"].get("url", "")
+
+    # Check if nostr platform exists and count posts
+    nostr_post_count = 0
+    if "nostr" in platforms:
+        nostr_data = platforms["nostr"]
+        # Check for posts array (new format)
+        if "posts" in nostr_data:
+            nostr_post_count = len(nostr_data["posts"])
+        # Check for event_id (old format)
+        elif "event_id" in nostr_data:
+            nostr_post_count = 1
+
+    # Count npubs if they exist in metadata
+    npub_count = 0
+    if "npubs" in main_metadata:
+        # Count npubs in chat
+        if "chat" in main_metadata["npubs"]:
+            npub_count += len(main_metadata["npubs"]["chat"])
+        # Count npubs in description
+        if "description" in main_metadata["npubs"]:
+            npub_count += len(main_metadata["npubs"]["description"])
+
+    return {
+        "video_id": video_id,
+        "title": main_metadata.get("title", "Unknown"),
+        "published_at": main_metadata.get("published_at", ""),
+        "duration": main_metadata.get("duration", 0),  # Add duration field
+        "downloaded": youtube_downloaded,
+        "url": platforms.get("youtube", {}).get("url", ""),
+        "nostrmedia_url": nostrmedia_url,
+        "nostr_post_count": nostr_post_count,  # Add nostr post count
+        "npub_count": npub_count,  # Add npub count
+    }
+
+
+def _load_video_summary(video_dir, video_id):
+    """
+    Summarize a video's main metadata, reusing the summary while it's unchanged
+
+    The scheduler lists the whole archive every few minutes, and almost
+    all metadata files are the same as last time, so a stat per video
+    replaces parsing its metadata.json.
+
+    Args:
+        video_dir: Directory of the video
+        video_id: ID of the video
+
+    Returns:
+        Video dictionary as listed by list_videos, not to be modified
+    """
+    main_metadata_file = os.path.join(video_dir, "metadata.json")
+    try:
+        stat = os.stat(main_metadata_file)
+    except FileNotFoundError:
+        # If metadata.json doesn't exist, try to generate it from existing files
+        print(f"Generating metadata for video: {video_id}")
+        main_metadata = generate_metadata_from_files(video_dir, video_id)
+        return _summarize_metadata(video_id, main_metadata)
+
+    signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    summary = _summary_cache.get(main_metadata_file, signature)
+    if summary is None:
+        summary = _summarize_metadata(video_id, load_json_file(main_metadata_file))
+        _summary_cache.put(main_metadata_file, signature, summary)
+
+    return summary
+
+
 def list_videos(
     videos_dir,
     metadata_dir=None,
@@ -183,37 +279,17 @@ def list_videos(
             except Exception as e:
                 print(f"Error reading cache: {e}")
 
-    # Count videos with metadata
-    if os.path.exists(videos_dir):
-        stats["total_with_metadata"] = sum(
-            1
-            for item in os.listdir(videos_dir)
-            if os.path.isdir(os.path.join(videos_dir, item))
-        )
-
-    for video_id in os.listdir(videos_dir):
-        video_dir = get_video_dir(videos_dir, video_id)
-
-        if not os.path.isdir(video_dir):
-            continue
-
-        main_metadata_file = os.path.join(video_dir, "metadata.json")
+    with os.scandir(videos_dir) as entries:
+        video_ids = [entry.name for entry in entries if entry.is_dir()]
 
-        # If metadata.json doesn't exist, try to generate it from existing files
-        if not os.path.exists(main_metadata_file):
-            print(f"Generating metadata for video: {video_id}")
-            main_metadata = generate_metadata_from_files(video_dir, video_id)
-        else:
-            main_metadata = load_json_file(main_metadata_file)
+    # Count videos with metadata
+    stats["total_with_metadata"] = len(video_ids)
 
-        # Check if YouTube platform exists and get download status
-        youtube_downloaded = False
-        if "platforms" in main_metadata and "youtube" in main_metadata["platforms"]:
-            youtube_downloaded = main_metadata["platforms"]["youtube"].get(
-                "downloaded", False
-            )
-            if youtube_downloaded:
-                stats["total_downloaded"] += 1
+    for video_id in video_ids:
+        summary = _load_video_summary(get_video_dir(videos_dir, video_id), video_id)
+        youtube_downloaded = summary["downloaded"]
+        if youtube_downloaded:
+            stats["total_downloaded"] += 1
 
         # Filter based on download status
         if youtube_downloaded and not show_downloaded:
@@ -222,61 +298,20 @@ def list_videos(
         if not youtube_downloaded and not show_not_downloaded:
             continue
 
-        # Check if nostrmedia platform exists
-        has_nostrmedia = (
-            "platforms" in main_metadata and "nostrmedia" in main_metadata["platforms"]
-        )
-        nostrmedia_url = ""
-        if has_nostrmedia:
-            nostrmedia_url = main_metadata["platforms"]["nostrmedia"].get("url", "")
-            if nostrmedia_url:
-                stats["total_uploaded_nm"] += 1
-
-        # Check if nostr platform exists and count posts
-        nostr_post_count = 0
-        if "platforms" in main_metadata and "nostr" in main_metadata["platforms"]:
-            nostr_data = main_metadata["platforms"]["nostr"]
-            # Check for posts array (new format)
-            if "posts" in nostr_data:
-                nostr_post_count = len(nostr_data["posts"])
-            # Check for event_id (old format)
-            elif "event_id" in nostr_data:
-                nostr_post_count = 1
-
-            # Update stats if posts were found
-            if nostr_post_count > 0:
-                stats["total_posted_nostr"] = stats.get("total_posted_nostr", 0) + 1
-
-        # Count npubs if they exist in metadata
-        npub_count = 0
-        if "npubs" in main_metadata:
-            # Count npubs in chat
-            if "chat" in main_metadata["npubs"]:
-                npub_count += len(main_metadata["npubs"]["chat"])
-            # Count npubs in description
-            if "description" in main_metadata["npubs"]:
-                npub_count += len(main_metadata["npubs"]["description"])
-
-            # Update stats if npubs were found
-            if npub_count > 0:
-                stats["total_with_npubs"] += 1
-                stats["total_npubs"] += npub_count
-
-        videos.append(
-            {
-                "video_id": video_id,
-                "title": main_metadata.get("title", "Unknown"),
-                "published_at": main_metadata.get("published_at", ""),
-                "duration": main_metadata.get("duration", 0),  # Add duration field
-                "downloaded": youtube_downloaded,
-                "url": main_metadata.get("platforms", {})
-                .get("youtube", {})
-                .get("url", ""),
-                "nostrmedia_url": nostrmedia_url,
-                "nostr_post_count": nostr_post_count,  # Add nostr post count
-                "npub_count": npub_count,  # Add npub count
-            }
-        )
+        if summary["nostrmedia_url"]:
+            stats["total_uploaded_nm"] += 1
+
+        # Update stats if posts were found
+        if summary["nostr_post_count"] > 0:
+            stats["total_posted_nostr"] += 1
+
+        # Update stats if npubs were found
+        if summary["npub_count"] > 0:
+            stats["total_with_npubs"] += 1
+            stats["total_npubs"] += summary["npub_count"]
+
+        # Callers may modify the entries, so hand out copies
+        videos.append(dict(summary))
 
     # Sort by published date (oldest first)
     videos.sort(key=lambda x: x.get("published_at", ""), reverse=False)
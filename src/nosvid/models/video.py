@@ -4,7 +4,7 @@ Video model for nosvid
 
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 
 @dataclass
@@ -29,18 +29,19 @@ class Platform:
     uploaded_at: Optional[str] = None
 
     @classmethod
-    def from_dict(cls, data: Dict[str, Any]) -> "Platform":
+    def from_dict(cls, data: Dict[str, Any], name: Optional[str] = None) -> "Platform":
         """
         Create a Platform from a dictionary
 
         Args:
             data: Dictionary representation of a Platform
+            name: Platform name, overriding the name in the dictionary
 
         Returns:
             Platform object
         """
         return cls(
-            name=data.get("name", ""),
+            name=data.get("name", "") if name is None else name,
             url=data.get("url", ""),
             downloaded=data.get("downloaded", False),
             downloaded_at=data.get("downloaded_at"),
@@ -65,7 +66,7 @@ class Platform:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class NostrPost:
     """
     Nostr post information
@@ -75,14 +76,20 @@ class NostrPost:
         pubkey: Public key that created the post
         uploaded_at: When the post was created
         nostr_uri: URI for the post
-        links: Links to the post on various platforms
+        links: Links to the post on various platforms, as (name, url) pairs
     """
 
     event_id: str
     pubkey: str
     uploaded_at: str
     nostr_uri: Optional[str] = None
-    links: Dict[str, str] = field(default_factory=dict)
+    links: Tuple[Tuple[str, str], ...] = ()
+
+    def __post_init__(self):
+        # Posts are loaded by the thousand and the links are almost always
+        # the same two viewers, so keep them as a tuple instead of a dict
+        if isinstance(self.links, dict):
+            self.links = tuple(self.links.items())
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "NostrPost":
@@ -95,12 +102,17 @@ class NostrPost:
         Returns:
             NostrPost object
         """
+        # Only format the current time if there is no timestamp
+        uploaded_at = data.get("uploaded_at")
+        if uploaded_at is None:
+            uploaded_at = datetime.now().isoformat()
+
         return cls(
             event_id=data.get("event_id", ""),
             pubkey=data.get("pubkey", ""),
-            uploaded_at=data.get("uploaded_at", datetime.now().isoformat()),
+            uploaded_at=uploaded_at,
             nostr_uri=data.get("nostr_uri"),
-            links=data.get("links", {}),
+            links=tuple((data.get("links") or {}).items()),
         )
 
     def to_dict(self) -> Dict[str, Any]:
@@ -115,7 +127,7 @@ class NostrPost:
             "pubkey": self.pubkey,
             "uploaded_at": self.uploaded_at,
             "nostr_uri": self.nostr_uri,
-            "links": self.links,
+            "links": dict(self.links),
         }
 
 
@@ -155,20 +167,19 @@ class Video:
         Returns:
             Video object
         """
-        platforms = {}
-        if "platforms" in data:
-            for name, platform_data in data["platforms"].items():
-                platform_data["name"] = name
-                platforms[name] = Platform.from_dict(platform_data)
-
-        nostr_posts = []
-        if (
-            "platforms" in data
-            and "nostr" in data["platforms"]
-            and "posts" in data["platforms"]["nostr"]
-        ):
-            for post_data in data["platforms"]["nostr"]["posts"]:
-                nostr_posts.append(NostrPost.from_dict(post_data))
+        platforms_data = data.get("platforms") or {}
+
+        # The platform name is the key, pass it along instead of copying each
+        # platform dict to add it
+        platforms = {
+            name: Platform.from_dict(platform_data, name=name)
+            for name, platform_data in platforms_data.items()
+        }
+
+        nostr_posts = [
+            NostrPost.from_dict(post_data)
+            for post_data in platforms_data.get("nostr", {}).get("posts", ())
+        ]
 
         return cls(
             video_id=data.get("video_id", ""),
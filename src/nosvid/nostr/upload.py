@@ -2,33 +2,16 @@
 Functions for uploading videos to the Nostr network
 """
 
+import asyncio
+import functools
 import json
+import logging
 import os
+import re
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-
-try:
-    print("Attempting to import nostr_sdk...")
-    from nostr_sdk import (
-        Client,
-        EventBuilder,
-        Keys,
-        Kind,
-        NostrSigner,
-        RelayOptions,
-        Tag,
-    )
-
-    print("nostr_sdk imported successfully")
-    NOSTR_AVAILABLE = True
-except ImportError as e:
-    print(f"ImportError: {e}")
-    NOSTR_AVAILABLE = False
-    print(
-        "Warning: nostr-sdk package not available. Nostr upload functionality will be limited."
-    )
-
-import os.path
+from pathlib import PurePath
 
 from ..nostrmedia.upload import upload_to_nostrmedia
 from ..utils.config import get_nostr_key, get_nostr_relays, load_config
@@ -39,6 +22,60 @@ from ..utils.filesystem import (
     save_json_file,
 )
 
+logger = logging.getLogger(__name__)
+
+# Everything that is not a letter or digit (underscore counts as punctuation here)
+_HASHTAG_STRIP_RE = re.compile(r"[\W_]+")
+
+# nostr-sdk is a large native extension, so it is only imported once an
+# upload needs it; these are filled in by _nostr_sdk_available()
+Client = EventBuilder = Keys = Kind = NostrSigner = Tag = None
+_VIDEO_HASHTAG = _MP4_MIME_TAG = None
+_SIGN_METHOD = None
+_HAS_PUBLISH_EVENT = False
+_ADD_RELAY_ASYNC = _CONNECT_ASYNC = _SEND_EVENT_ASYNC = _DISCONNECT_ASYNC = False
+
+# Upper bound for threads writing back metadata after a batch post
+_MAX_SAVE_WORKERS = 8
+
+
+@functools.lru_cache(maxsize=None)
+def _nostr_sdk_available():
+    """
+    Import nostr-sdk on first use and resolve its version-dependent API
+
+    Returns:
+        True if nostr-sdk is installed, False otherwise
+    """
+    global Client, EventBuilder, Keys, Kind, NostrSigner, Tag
+    global _VIDEO_HASHTAG, _MP4_MIME_TAG, _SIGN_METHOD, _HAS_PUBLISH_EVENT
+    global _ADD_RELAY_ASYNC, _CONNECT_ASYNC, _SEND_EVENT_ASYNC, _DISCONNECT_ASYNC
+
+    try:
+        from nostr_sdk import Client, EventBuilder, Keys, Kind, NostrSigner, Tag
+    except ImportError as e:
+        logger.warning("nostr-sdk package not available: %s", e)
+        return False
+
+    # Tags that are the same on every video note
+    _VIDEO_HASHTAG = Tag.parse(["t", "video"])
+    _MP4_MIME_TAG = Tag.parse(["m", "video/mp4"])
+
+    # The signing/publishing API differs between nostr-sdk versions but is
+    # fixed for a given install, so resolve it once instead of on every upload
+    if hasattr(EventBuilder, "sign"):
+        _SIGN_METHOD = "sign"
+    elif hasattr(EventBuilder, "to_event"):
+        _SIGN_METHOD = "to_event"
+    else:
+        _SIGN_METHOD = "client"
+    _HAS_PUBLISH_EVENT = hasattr(Client, "publish_event")
+    _ADD_RELAY_ASYNC = asyncio.iscoroutinefunction(Client.add_relay)
+    _CONNECT_ASYNC = asyncio.iscoroutinefunction(Client.connect)
+    _SEND_EVENT_ASYNC = asyncio.iscoroutinefunction(Client.send_event)
+    _DISCONNECT_ASYNC = asyncio.iscoroutinefunction(Client.disconnect)
+    return True
+
 
 def post_to_nostr(video_id, channel_id, debug=False):
     """
@@ -52,9 +89,61 @@ def post_to_nostr(video_id, channel_id, debug=False):
     Returns:
         True if successful, False otherwise
     """
+    return post_many_to_nostr([video_id], channel_id, debug=debug)[video_id]
+
+
+def post_many_to_nostr(video_ids, channel_id, debug=False):
+    """
+    Post several videos to Nostr, publishing all events over one relay session
+
+    Args:
+        video_ids: List of YouTube video IDs
+        channel_id: Channel ID
+        debug: Whether to print debug information
+
+    Returns:
+        Dictionary mapping each video ID to True if it was posted, False otherwise
+    """
+    results = {video_id: False for video_id in video_ids}
+
+    posts = []
+    for video_id in video_ids:
+        post = _prepare_post(video_id, channel_id, debug=debug)
+        if post:
+            posts.append(post)
+
+    if not posts:
+        return results
+
+    nostr_results = upload_many_to_nostr(
+        [(post["video_path"], post["nostr_metadata"]) for post in posts],
+        debug=debug,
+    )
+
+    # Write the metadata of all posted videos back in parallel
+    with ThreadPoolExecutor(max_workers=min(_MAX_SAVE_WORKERS, len(posts))) as pool:
+        saved = pool.map(_save_post_result, posts, nostr_results)
+        for post, success in zip(posts, saved):
+            results[post["video_id"]] = success
+
+    return results
+
+
+def _prepare_post(video_id, channel_id, debug=False):
+    """
+    Make sure a video is downloaded and on nostrmedia, and collect what is
+    needed to post it to Nostr
+
+    Args:
+        video_id: YouTube video ID
+        channel_id: Channel ID
+        debug: Whether to print debug information
+
+    Returns:
+        Dictionary describing the pending post, or None if it can't be posted
+    """
     try:
-        if debug:
-            print(f"Posting video {video_id} to Nostr")
+        logger.debug("Posting video %s to Nostr", video_id)
 
         # Get the video directory
         video_dir = os.path.join(get_video_dir(channel_id), video_id)
@@ -62,13 +151,13 @@ def post_to_nostr(video_id, channel_id, debug=False):
         # Check if the video exists
         if not os.path.exists(video_dir):
             print(f"Video directory not found: {video_dir}")
-            return False
+            return None
 
         # Load the metadata
         metadata_path = os.path.join(video_dir, "metadata.json")
         if not os.path.exists(metadata_path):
             print(f"Metadata file not found: {metadata_path}")
-            return False
+            return None
 
         metadata = load_json_file(metadata_path)
 
@@ -88,7 +177,7 @@ def post_to_nostr(video_id, channel_id, debug=False):
             download_result = download_video(video_id, channel_id)
             if not download_result:
                 print("Failed to download video")
-                return False
+                return None
 
             # Refresh the list of video files
             video_files = [f for f in os.listdir(youtube_dir) if f.endswith(".mp4")]
@@ -97,7 +186,7 @@ def post_to_nostr(video_id, channel_id, debug=False):
         video_file = video_files[0] if video_files else None
         if not video_file:
             print("No video file found after download attempt")
-            return False
+            return None
 
         video_path = os.path.join(youtube_dir, video_file)
 
@@ -118,13 +207,13 @@ def post_to_nostr(video_id, channel_id, debug=False):
             nostrmedia_result = upload_to_nostrmedia(video_id, channel_id, debug=debug)
             if not nostrmedia_result or not nostrmedia_result.get("success"):
                 print("Failed to upload to nostrmedia")
-                return False
+                return None
 
             # Get the nostrmedia URL
             nostrmedia_url = nostrmedia_result.get("url")
             if not nostrmedia_url:
                 print("No nostrmedia URL returned")
-                return False
+                return None
 
             # Update the metadata
             metadata["platforms"] = metadata.get("platforms", {})
@@ -132,7 +221,11 @@ def post_to_nostr(video_id, channel_id, debug=False):
                 "url": nostrmedia_url,
                 "uploaded_at": datetime.now().isoformat(),
             }
-            save_json_file(metadata_path, metadata)
+            # Written together with the nostr post; only flushed on its own
+            # if the nostr upload fails so the nostrmedia URL isn't lost
+            nostrmedia_updated = True
+        else:
+            nostrmedia_updated = False
 
         # Prepare metadata for nostr
         nostr_metadata = {
@@ -145,12 +238,44 @@ def post_to_nostr(video_id, channel_id, debug=False):
             "nostrmedia_url": nostrmedia_url,
         }
 
-        # Upload to nostr
-        nostr_result = upload_to_nostr(video_path, nostr_metadata, debug=debug)
+        return {
+            "video_id": video_id,
+            "video_dir": video_dir,
+            "video_path": video_path,
+            "metadata": metadata,
+            "metadata_path": metadata_path,
+            "nostrmedia_updated": nostrmedia_updated,
+            "nostr_metadata": nostr_metadata,
+        }
+
+    except Exception as e:
+        print(f"Error posting to Nostr: {str(e)}")
+        return None
+
+
+def _save_post_result(post, nostr_result):
+    """
+    Record the outcome of a Nostr post in the video's metadata files
+
+    Args:
+        post: Pending post as returned by _prepare_post
+        nostr_result: Result of the Nostr upload for this post
+
+    Returns:
+        True if the video was posted and its metadata saved, False otherwise
+    """
+    video_id = post["video_id"]
+    video_dir = post["video_dir"]
+    metadata = post["metadata"]
+    metadata_path = post["metadata_path"]
+
+    try:
         if not nostr_result or not nostr_result.get("success"):
             print(
                 f"Failed to upload to nostr: {nostr_result.get('error') if nostr_result else 'Unknown error'}"
             )
+            if post["nostrmedia_updated"]:
+                save_json_file(metadata_path, metadata)
             return False
 
         # Update the metadata with nostr information
@@ -180,7 +305,7 @@ def post_to_nostr(video_id, channel_id, debug=False):
         # Save the nostr metadata
         save_json_file(nostr_metadata_path, nostr_metadata)
 
-        # Update the main metadata file
+        # Update the main metadata file (nostrmedia and nostr in one write)
         metadata["platforms"] = metadata.get("platforms", {})
         metadata["platforms"]["nostr"] = {"posts": nostr_metadata["posts"]}
         save_json_file(metadata_path, metadata)
@@ -206,343 +331,413 @@ def upload_to_nostr(file_path, metadata, private_key_str=None, debug=False):
     Returns:
         Dictionary with upload result
     """
-    if not NOSTR_AVAILABLE:
-        return {
-            "success": False,
-            "error": "nostr-sdk package not available. Please install it with 'pip install nostr-sdk'",
-        }
+    return upload_many_to_nostr(
+        [(file_path, metadata)], private_key_str=private_key_str, debug=debug
+    )[0]
 
-    if not os.path.exists(file_path):
-        return {"success": False, "error": f"File not found: {file_path}"}
 
-    try:
-        # Get file information
-        file_name = os.path.basename(file_path)
-        file_size = os.path.getsize(file_path)
-        file_ext = os.path.splitext(file_path)[1].lower()
-
-        if debug:
-            print("\n=== DEBUG: File Information ===")
-            print(f"File path: {file_path}")
-            print(f"File name: {file_name}")
-            print(f"File size: {file_size} bytes")
-            print(f"File extension: {file_ext}")
-
-        # Create or load keys
-        if private_key_str:
-            # Use the provided private key
-            try:
-                keys = Keys.parse(private_key_str)
-            except Exception as e:
-                return {
-                    "success": False,
-                    "error": f"Invalid private key format: {str(e)}",
-                }
-        else:
-            # Try to get the private key from config
-            config_nsec = get_nostr_key("nsec")
-
-            if debug and config_nsec:
-                print("\n=== DEBUG: Config Key ===")
-                print(
-                    f"Config nsec format: {config_nsec[:4]}...{config_nsec[-4:] if len(config_nsec) > 8 else ''}"
-                )
-
-            if config_nsec:
-                try:
-                    keys = Keys.parse(config_nsec)
-                    print("Using private key from config.yaml")
-                except Exception as e:
-                    print(f"Warning: Invalid private key in config: {str(e)}")
-                    return {
-                        "success": False,
-                        "error": f"Invalid nsec key in config.yaml: {str(e)}",
-                    }
-            else:
-                return {
-                    "success": False,
-                    "error": "No private key provided or found in config.",
-                }
-
-        # Extract relevant metadata
-        title = metadata.get("title", "Untitled Video")
-        description = metadata.get("full_description", metadata.get("description", ""))
-        published_at = metadata.get("published_at", "")
-        channel_title = metadata.get("channel_title", "")
-        video_id = metadata.get("video_id", "")
-        youtube_url = metadata.get(
-            "youtube_url",
-            f"https://www.youtube.com/watch?v={video_id}" if video_id else "",
-        )
-        nostrmedia_url = metadata.get("nostrmedia_url", "")
+def upload_many_to_nostr(uploads, private_key_str=None, debug=False):
+    """
+    Upload several videos to the Nostr network over a single relay session
 
-        if debug:
-            print("\n=== DEBUG: Metadata ===")
-            print(f"Title: {title}")
-            print(f"Channel: {channel_title}")
-            print(f"Published: {published_at}")
-            print(
-                f"Description length: {len(description) if description else 0} characters"
-            )
-            print(
-                f"Using full_description: {'Yes' if 'full_description' in metadata else 'No'}"
-            )
+    Args:
+        uploads: List of (file_path, metadata) tuples
+        private_key_str: Private key string (hex or nsec format, if None, will try to use from config)
+        debug: Whether to print detailed debug information
+
+    Returns:
+        List of upload result dictionaries, one per upload
+    """
+    if not _nostr_sdk_available():
+        return [
+            {
+                "success": False,
+                "error": "nostr-sdk package not available. Please install it with 'pip install nostr-sdk'",
+            }
+            for _ in uploads
+        ]
+
+    results = [None] * len(uploads)
+
+    keys, error = _load_keys(private_key_str)
+    if error:
+        return [dict(error) for _ in uploads]
 
-        # Create content for the Nostr event
-        content = f"# {title}\n\n"
-
-        # Add video embed - prioritize nostrmedia URL if available
-        if nostrmedia_url:
-            # Add nostrmedia URL for embedding
-            content += f"{nostrmedia_url}\n\n"
-            if debug:
-                print(f"Embedding nostrmedia URL: {nostrmedia_url}")
-        elif youtube_url:
-            # Fallback to YouTube URL if nostrmedia not available
-            content += f"{youtube_url}\n\n"
-            if debug:
-                print(f"Embedding YouTube URL: {youtube_url}")
-
-        if channel_title:
-            content += f"Channel: {channel_title}\n\n"
-        if published_at:
-            content += f"Published: {published_at}\n\n"
-
-        # Add the full description
-        if description:
-            content += f"{description}\n\n"
-
-        if debug:
-            print("\n=== DEBUG: Event Content ===")
-            print(content[:500] + "..." if len(content) > 500 else content)
-
-        # Create a Nostr event (kind 1 = text note)
-        kind = Kind(1)
-        builder = EventBuilder(kind, content)
-
-        # Add tags
-        tags = []
-
-        # Add subject tag with video title
-        subject_tag = Tag.parse(["subject", title])
-        tags.append(subject_tag)
-
-        # Add hashtags
-        tags.append(Tag.parse(["t", "video"]))
-        if channel_title:
-            # Convert channel title to a hashtag format (remove spaces, special chars)
-            channel_hashtag = "".join(c for c in channel_title if c.isalnum())
-            tags.append(Tag.parse(["t", channel_hashtag]))
-
-        # Add video metadata as tags
-        if video_id:
-            # Add YouTube video ID tag
-            tags.append(Tag.parse(["video_id", video_id]))
-
-        # Add reference tags for URLs
-        if nostrmedia_url:
-            # Add nostrmedia URL as primary reference
-            tags.append(Tag.parse(["r", nostrmedia_url]))
-
-            # Add special media tag for better client support
-            tags.append(Tag.parse(["media", nostrmedia_url]))
-
-            # Add file type tag
-            tags.append(Tag.parse(["m", "video/mp4"]))
-        elif youtube_url:
-            # Add YouTube URL as reference if nostrmedia not available
-            tags.append(Tag.parse(["r", youtube_url]))
-
-            # Add special YouTube embed tag that some clients recognize
-            tags.append(Tag.parse(["youtube", video_id]))
-
-            # Add media tag for better client support
-            tags.append(Tag.parse(["m", "video/mp4"]))
-
-        # We don't add a content warning tag as it's not needed for videos
-
-        builder = builder.tags(tags)
-
-        if debug:
-            print("\n=== DEBUG: Event Tags ===")
-            for tag in tags:
-                print(f"Tag: {tag.as_vec()}")
-
-        # Create a signer from keys
-        signer = NostrSigner.keys(keys)
-
-        if debug:
-            print("\n=== DEBUG: Signer Created ===")
-            print(f"Public key: {keys.public_key().to_hex()}")
-
-        # Import asyncio here to avoid reference errors
-        import asyncio
-
-        # Set up the event loop for async operations
+    # Build one event per existing file
+    builders = {}
+    for i, (file_path, metadata) in enumerate(uploads):
+        # One stat both checks the file exists and gets its size
         try:
-            loop = asyncio.get_event_loop()
-        except RuntimeError:
-            # If there's no event loop in the current thread, create one
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-
-        # Get relays from config or use defaults
-        relays = get_nostr_relays()
-
-        if debug:
-            print("\n=== DEBUG: Relay Configuration ===")
-            # Check if relays are from config or defaults
-            config = load_config()
-            using_config_relays = "nostr" in config and "relays" in config["nostr"]
-            print(
-                f"Using {len(relays)} relays from {'config' if using_config_relays else 'defaults'}"
-            )
+            file_size = os.stat(file_path).st_size
+        except FileNotFoundError:
+            results[i] = {"success": False, "error": f"File not found: {file_path}"}
+            continue
+        try:
+            builders[i] = _build_event(file_path, file_size, metadata)
+        except Exception as e:
+            print(f"Error uploading to Nostr: {str(e)}")
+            results[i] = {"success": False, "error": str(e)}
 
-        if debug:
-            print("\n=== DEBUG: Connecting to Relays ===")
-            for relay in relays:
-                print(f"Relay: {relay}")
+    if builders:
+        try:
+            _publish_events(keys, builders, results)
+        except Exception as e:
+            print(f"Error uploading to Nostr: {str(e)}")
+            for i in builders:
+                if results[i] is None:
+                    results[i] = {"success": False, "error": str(e)}
+
+    return results
+
+
+def _load_keys(private_key_str=None):
+    """
+    Parse the given private key, or the one from the config
 
-        # Create client
-        client = Client()
+    Args:
+        private_key_str: Private key string (hex or nsec format, if None, will try to use from config)
 
-        # Set the signer
+    Returns:
+        Tuple of (keys, None) on success or (None, error result) on failure
+    """
+    if private_key_str:
+        # Use the provided private key
         try:
-            client.signer = signer
-            if debug:
-                print("Signer set successfully")
+            return Keys.parse(private_key_str), None
         except Exception as e:
-            print(f"Warning: Could not set signer on client: {e}")
-            print("Events may not be signed correctly.")
+            return None, {
+                "success": False,
+                "error": f"Invalid private key format: {str(e)}",
+            }
 
-        # Add relays
-        for relay in relays:
-            try:
-                # Create relay options if needed
-                # Note: We're not using options directly, but keeping this for future use
+    # Try to get the private key from config
+    config_nsec = get_nostr_key("nsec")
 
-                # Try to add the relay
-                if debug:
-                    print(f"Adding relay: {relay}")
+    if config_nsec:
+        logger.debug("=== Config Key ===")
+        logger.debug(
+            "Config nsec format: %s...%s",
+            config_nsec[:4],
+            config_nsec[-4:] if len(config_nsec) > 8 else "",
+        )
 
-                # Check if add_relay is a coroutine
-                if asyncio.iscoroutinefunction(client.add_relay):
-                    loop.run_until_complete(client.add_relay(relay))
-                else:
-                    client.add_relay(relay)
+    if not config_nsec:
+        return None, {
+            "success": False,
+            "error": "No private key provided or found in config.",
+        }
 
-                if debug:
-                    print(f"Added relay: {relay}")
-            except Exception as e:
-                print(f"Error adding relay {relay}: {e}")
+    try:
+        keys = Keys.parse(config_nsec)
+        print("Using private key from config.yaml")
+        return keys, None
+    except Exception as e:
+        print(f"Warning: Invalid private key in config: {str(e)}")
+        return None, {
+            "success": False,
+            "error": f"Invalid nsec key in config.yaml: {str(e)}",
+        }
 
-        # Connect to relays
-        if asyncio.iscoroutinefunction(client.connect):
-            loop.run_until_complete(client.connect())
-        else:
-            client.connect()
 
-        if debug:
-            print("\n=== DEBUG: Client Connected ===")
+def _build_event(file_path, file_size, metadata):
+    """
+    Build the (unsigned) Nostr text note announcing a video
+
+    Args:
+        file_path: Path to the video file
+        file_size: Size of the video file in bytes
+        metadata: Dictionary containing video metadata
+
+    Returns:
+        EventBuilder for the note
+    """
+    if logger.isEnabledFor(logging.DEBUG):
+        path = PurePath(file_path)
+        logger.debug("=== File Information ===")
+        logger.debug("File path: %s", file_path)
+        logger.debug("File name: %s", path.name)
+        logger.debug("File size: %d bytes", file_size)
+        logger.debug("File extension: %s", path.suffix.lower())
+
+    # Extract relevant metadata
+    title = metadata.get("title", "Untitled Video")
+    description = metadata.get("full_description", metadata.get("description", ""))
+    published_at = metadata.get("published_at", "")
+    channel_title = metadata.get("channel_title", "")
+    video_id = metadata.get("video_id", "")
+    youtube_url = metadata.get(
+        "youtube_url",
+        f"https://www.youtube.com/watch?v={video_id}" if video_id else "",
+    )
+    nostrmedia_url = metadata.get("nostrmedia_url", "")
+
+    logger.debug("=== Metadata ===")
+    logger.debug("Title: %s", title)
+    logger.debug("Channel: %s", channel_title)
+    logger.debug("Published: %s", published_at)
+    logger.debug(
+        "Description length: %d characters", len(description) if description else 0
+    )
+    logger.debug(
+        "Using full_description: %s",
+        "Yes" if "full_description" in metadata else "No",
+    )
+
+    # Create content for the Nostr event, collecting the sections first so
+    # long descriptions are copied only once
+    parts = [f"# {title}\n\n"]
+
+    # Add video embed - prioritize nostrmedia URL if available
+    if nostrmedia_url:
+        # Add nostrmedia URL for embedding
+        parts.append(f"{nostrmedia_url}\n\n")
+        logger.debug("Embedding nostrmedia URL: %s", nostrmedia_url)
+    elif youtube_url:
+        # Fallback to YouTube URL if nostrmedia not available
+        parts.append(f"{youtube_url}\n\n")
+        logger.debug("Embedding YouTube URL: %s", youtube_url)
+
+    if channel_title:
+        parts.append(f"Channel: {channel_title}\n\n")
+    if published_at:
+        parts.append(f"Published: {published_at}\n\n")
+
+    # Add the full description
+    if description:
+        parts.append(f"{description}\n\n")
+
+    content = "".join(parts)
+
+    logger.debug("=== Event Content ===")
+    logger.debug("%.500s%s", content, "..." if len(content) > 500 else "")
+
+    # Create a Nostr event (kind 1 = text note)
+    kind = Kind(1)
+    builder = EventBuilder(kind, content)
+
+    # Collect the per-video tags as plain lists and parse them in one pass;
+    # the constant tags are parsed once when nostr-sdk is loaded
+
+    # Add subject tag with video title
+    raw_tags = [["subject", title]]
+
+    # Add hashtags
+    if channel_title:
+        # Convert channel title to a hashtag format (remove spaces, special chars)
+        channel_hashtag = _HASHTAG_STRIP_RE.sub("", channel_title)
+        raw_tags.append(["t", channel_hashtag])
+
+    # Add video metadata as tags
+    if video_id:
+        # Add YouTube video ID tag
+        raw_tags.append(["video_id", video_id])
+
+    # Add reference tags for URLs
+    if nostrmedia_url:
+        # Add nostrmedia URL as primary reference, plus the special media tag
+        # for better client support
+        raw_tags.append(["r", nostrmedia_url])
+        raw_tags.append(["media", nostrmedia_url])
+    elif youtube_url:
+        # Add YouTube URL as reference if nostrmedia not available, plus the
+        # special YouTube embed tag that some clients recognize
+        raw_tags.append(["r", youtube_url])
+        raw_tags.append(["youtube", video_id])
+
+    tags = [Tag.parse(tag) for tag in raw_tags]
+    tags.append(_VIDEO_HASHTAG)
+    if nostrmedia_url or youtube_url:
+        # Add file type tag
+        tags.append(_MP4_MIME_TAG)
+
+    # We don't add a content warning tag as it's not needed for videos
+
+    builder = builder.tags(tags)
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("=== Event Tags ===")
+        for tag in tags:
+            logger.debug("Tag: %s", tag.as_vec())
+
+    return builder
+
+
+def _publish_events(keys, builders, results):
+    """
+    Sign the given events and publish them all over one relay connection
+
+    Args:
+        keys: Nostr Keys used to sign the events
+        builders: Dictionary mapping result index to EventBuilder
+        results: List of results, filled in at the builders' indexes
+    """
+    # Create a signer from keys
+    signer = NostrSigner.keys(keys)
 
-        # Sign and publish the event
-        import asyncio
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("=== Signer Created ===")
+        logger.debug("Public key: %s", keys.public_key().to_hex())
+
+    # Set up the event loop for async operations
+    try:
+        loop = asyncio.get_event_loop()
+    except RuntimeError:
+        # If there's no event loop in the current thread, create one
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+
+    # Get relays from config or use defaults
+    relays = get_nostr_relays()
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("=== Relay Configuration ===")
+        # Check if relays are from config or defaults
+        config = load_config()
+        using_config_relays = "nostr" in config and "relays" in config["nostr"]
+        logger.debug(
+            "Using %d relays from %s",
+            len(relays),
+            "config" if using_config_relays else "defaults",
+        )
+
+        logger.debug("=== Connecting to Relays ===")
+        for relay in relays:
+            logger.debug("Relay: %s", relay)
 
-        # Set up the event loop for async operations
+    # Create client
+    client = Client()
+
+    # Set the signer
+    try:
+        client.signer = signer
+        logger.debug("Signer set successfully")
+    except Exception as e:
+        print(f"Warning: Could not set signer on client: {e}")
+        print("Events may not be signed correctly.")
+
+    # Add relays
+    for relay in relays:
         try:
-            loop = asyncio.get_event_loop()
-        except RuntimeError:
-            # If there's no event loop in the current thread, create one
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
+            # Try to add the relay
+            logger.debug("Adding relay: %s", relay)
+
+            if _ADD_RELAY_ASYNC:
+                loop.run_until_complete(client.add_relay(relay))
+            else:
+                client.add_relay(relay)
+
+            logger.debug("Added relay: %s", relay)
+        except Exception as e:
+            print(f"Error adding relay {relay}: {e}")
+
+    # Connect to relays
+    if _CONNECT_ASYNC:
+        loop.run_until_complete(client.connect())
+    else:
+        client.connect()
+
+    logger.debug("=== Client Connected ===")
 
-        # Sign the event
-        if debug:
-            print("\n=== DEBUG: Signing Event ===")
+    # Sign the events
+    logger.debug("=== Signing Events ===")
 
-        # Try different ways to sign the event
+    events = {}
+    for i, builder in builders.items():
         try:
             # Method 1: Use the builder's sign method if available
-            if hasattr(builder, "sign"):
+            if _SIGN_METHOD == "sign":
                 event = loop.run_until_complete(builder.sign(signer))
-                if debug:
-                    print("Event signed using builder.sign()")
             # Method 2: Use the to_event method if available
-            elif hasattr(builder, "to_event"):
+            elif _SIGN_METHOD == "to_event":
                 event = builder.to_event(keys)
-                if debug:
-                    print("Event signed using builder.to_event()")
             # Method 3: Use the client to sign the event
             else:
                 event = client.sign_event_builder(builder)
-                if debug:
-                    print("Event signed using client.sign_event_builder()")
         except Exception as e:
             print(f"Error signing event: {e}")
-            raise
-
-        if debug:
-            print("Event signed successfully")
-            print(f"Event ID: {event.id().to_hex()}")
-            print(f"Event JSON: {event.as_json()}")
-
-        # Publish the event
-        if debug:
-            print("\n=== DEBUG: Publishing Event ===")
-
-        try:
-            # Try different ways to publish the event
-            if hasattr(client, "publish_event"):
-                loop.run_until_complete(client.publish_event(event))
-                if debug:
-                    print("Event published using client.publish_event()")
-            else:
-                if asyncio.iscoroutinefunction(client.send_event):
-                    loop.run_until_complete(client.send_event(event))
-                else:
-                    client.send_event(event)
-                if debug:
-                    print("Event published using client.send_event()")
-        except Exception as e:
-            print(f"Error publishing event: {e}")
-            raise
-
-        if debug:
-            print("Event published successfully")
-
-        # Wait for confirmation from relays
-        time.sleep(1)
+            results[i] = {"success": False, "error": str(e)}
+            continue
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Event signed using %s", _SIGN_METHOD)
+            logger.debug("Event ID: %s", event.id().to_hex())
+            logger.debug("Event JSON: %s", event.as_json())
+
+        events[i] = event
+
+    # Publish the events
+    logger.debug("=== Publishing Events ===")
+
+    if _HAS_PUBLISH_EVENT:
+        publish, publish_async = client.publish_event, True
+    else:
+        publish, publish_async = client.send_event, _SEND_EVENT_ASYNC
+
+    if publish_async:
+        # Send all events concurrently over the open connection
+        outcomes = loop.run_until_complete(
+            asyncio.gather(
+                *(publish(event) for event in events.values()),
+                return_exceptions=True,
+            )
+        )
+    else:
+        outcomes = []
+        for event in events.values():
+            try:
+                outcomes.append(publish(event))
+            except Exception as e:
+                outcomes.append(e)
 
-        # Disconnect from relays
-        if asyncio.iscoroutinefunction(client.disconnect):
-            loop.run_until_complete(client.disconnect())
+    pubkey = keys.public_key().to_hex()
+    for (i, event), outcome in zip(events.items(), outcomes):
+        if isinstance(outcome, Exception):
+            print(f"Error publishing event: {outcome}")
+            results[i] = {"success": False, "error": str(outcome)}
         else:
-            client.disconnect()
+            results[i] = _event_result(event, pubkey)
 
-        # Create the result
-        event_id = event.id().to_hex()
-        pubkey = keys.public_key().to_hex()
+    logger.debug("Published %d event(s)", len(events))
 
-        # Generate nostr: URI
-        nostr_uri = f"nostr:note1{event_id}"
+    # Wait for confirmation from relays
+    time.sleep(1)
 
-        # Generate web links to nostr viewers
-        snort_link = f"https://snort.social/e/{event_id}"
-        primal_link = f"https://primal.net/e/{event_id}"
+    # Disconnect from relays
+    if _DISCONNECT_ASYNC:
+        loop.run_until_complete(client.disconnect())
+    else:
+        client.disconnect()
 
-        print("Video uploaded successfully to Nostr!")
-        print(f"Event ID: {event_id}")
-        print(f"View on Snort: {snort_link}")
-        print(f"View on Primal: {primal_link}")
 
-        return {
-            "success": True,
-            "event_id": event_id,
-            "pubkey": pubkey,
-            "nostr_uri": nostr_uri,
-            "links": {"snort": snort_link, "primal": primal_link},
-        }
+def _event_result(event, pubkey):
+    """
+    Build the upload result for a published event
 
-    except Exception as e:
-        print(f"Error uploading to Nostr: {str(e)}")
-        return {"success": False, "error": str(e)}
+    Args:
+        event: Signed and published Nostr event
+        pubkey: Hex public key the event was signed with
+
+    Returns:
+        Dictionary with upload result
+    """
+    event_id = event.id().to_hex()
+
+    # Generate nostr: URI
+    nostr_uri = f"nostr:note1{event_id}"
+
+    # Generate web links to nostr viewers
+    snort_link = f"https://snort.social/e/{event_id}"
+    primal_link = f"https://primal.net/e/{event_id}"
+
+    print("Video uploaded successfully to Nostr!")
+    print(f"Event ID: {event_id}")
+    print(f"View on Snort: {snort_link}")
+    print(f"View on Primal: {primal_link}")
+
+    return {
+        "success": True,
+        "event_id": event_id,
+        "pubkey": pubkey,
+        "nostr_uri": nostr_uri,
+        "links": {"snort": snort_link, "primal": primal_link},
+    }
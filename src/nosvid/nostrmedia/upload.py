@@ -2,27 +2,97 @@
 Upload functionality for nostrmedia.com
 """
 
+import asyncio
 import base64
+import functools
 import hashlib
 import json
+import logging
+import mimetypes
+import mmap
 import os
+import tempfile
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime
 
 import requests
+from requests.adapters import HTTPAdapter
+from requests_toolbelt import MultipartEncoder
 
-from ..utils.config import get_nostr_key
+from ..utils.config import get_config_path, get_nostr_key
 
-# Try to import nostr-sdk packages, but make them optional
-try:
-    from nostr_sdk import Event, EventBuilder, Keys, Kind, NostrSigner, Tag
+logger = logging.getLogger(__name__)
 
-    NOSTR_AVAILABLE = True
-except ImportError:
-    NOSTR_AVAILABLE = False
-    print(
-        "Warning: nostr-sdk package not available. Nostrmedia upload functionality will be limited."
-    )
+# nostr-sdk is a large native extension, so it is only imported once an
+# upload needs it; these are filled in by _nostr_sdk_available()
+EventBuilder = Keys = Kind = NostrSigner = Tag = None
+_SIGN_WITH_KEYS = False
+
+# Event loops for signing with nostr-sdk versions without sign_with_keys,
+# one per thread since a loop can only run one upload at a time; created on
+# first use and reused for the thread's later uploads
+_loop_state = threading.local()
+
+# nsec from the config file, with the (path, mtime, size) it was read at
+_CONFIG_NSEC = None
+
+# Read size for hashing files when hashlib.file_digest is unavailable
+_HASH_CHUNK_SIZE = 1 << 20
+
+# Hashing releases the GIL, so it can run alongside the rest of the upload
+_HASH_EXECUTOR = ThreadPoolExecutor(thread_name_prefix="nostrmedia-hash")
+
+# MIME types of common video formats, mimetypes is asked for anything else
+_MIME_TYPES = {
+    ".mp4": "video/mp4",
+    ".webm": "video/webm",
+    ".mkv": "video/x-matroska",
+    ".avi": "video/x-msvideo",
+    ".mov": "video/quicktime",
+    ".wmv": "video/x-ms-wmv",
+    ".flv": "video/x-flv",
+}
+
+# Shared session so consecutive uploads reuse the connection to nostrmedia
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+
+
+@functools.lru_cache(maxsize=None)
+def _nostr_sdk_available():
+    """
+    Import nostr-sdk on first use
+
+    Returns:
+        True if nostr-sdk is installed, False otherwise
+    """
+    global EventBuilder, Keys, Kind, NostrSigner, Tag, _SIGN_WITH_KEYS
+
+    try:
+        from nostr_sdk import EventBuilder, Keys, Kind, NostrSigner, Tag
+    except ImportError:
+        print(
+            "Warning: nostr-sdk package not available. Nostrmedia upload functionality will be limited."
+        )
+        return False
+
+    _SIGN_WITH_KEYS = hasattr(EventBuilder, "sign_with_keys")
+    return True
+
+
+def _get_loop():
+    """
+    Get the current thread's event loop for signing, creating it on first use
+
+    Returns:
+        asyncio event loop
+    """
+    loop = getattr(_loop_state, "loop", None)
+    if loop is None or loop.is_closed():
+        loop = _loop_state.loop = asyncio.new_event_loop()
+    return loop
 
 
 def compute_sha256(file_path):
@@ -35,95 +105,220 @@ def compute_sha256(file_path):
     Returns:
         SHA-256 hash as a hex string
     """
-    sha256_hash = hashlib.sha256()
-
     with open(file_path, "rb") as f:
-        # Read the file in chunks to avoid loading large files into memory
-        for byte_block in iter(lambda: f.read(4096), b""):
-            sha256_hash.update(byte_block)
+        return compute_sha256_fp(f)
+
 
+def compute_sha256_fp(fp):
+    """
+    Compute the SHA-256 hash of an already opened file
+
+    The whole file is hashed regardless of the current position, which is
+    left undefined afterwards.
+
+    Args:
+        fp: File object opened in binary mode
+
+    Returns:
+        SHA-256 hash as a hex string
+    """
+    fd = fp.fileno()
+    if hasattr(os, "posix_fadvise"):
+        # Let the kernel read ahead aggressively, the file is read once
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+
+    if os.fstat(fd).st_size > 0:
+        # Hash straight from the mapped pages, without copying them
+        # into Python buffers first. hashlib.sha256 is OpenSSL's, which
+        # picks the SHA-NI code path at runtime on CPUs that have it.
+        try:
+            with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mm:
+                return hashlib.sha256(mm).hexdigest()
+        except OSError:
+            # Not mappable (e.g. some network filesystems), read it instead
+            pass
+
+    fp.seek(0)
+    if hasattr(hashlib, "file_digest"):
+        # Python 3.11+: hash in C with large buffers and the GIL released
+        return hashlib.file_digest(fp, "sha256").hexdigest()
+
+    sha256_hash = hashlib.sha256()
+    # Read the file in chunks to avoid loading large files into memory
+    for byte_block in iter(lambda: fp.read(_HASH_CHUNK_SIZE), b""):
+        sha256_hash.update(byte_block)
     return sha256_hash.hexdigest()
 
 
-def create_signed_event(keys, file_hash, file_path=None, debug=False):
+def _cached_sha256(file_path, fp=None):
+    """
+    Compute the SHA-256 hash of a file, reusing the hash stored next to it
+
+    The hash is kept in a "<file>.sha256" sidecar together with the file's
+    mtime and size, and is only recomputed when either of them changed.
+
+    Args:
+        file_path: Path to the file
+        fp: The file already opened in binary mode, to hash it without
+            opening it again (optional)
+
+    Returns:
+        SHA-256 hash as a hex string
+    """
+    sidecar_path = file_path + ".sha256"
+    stat = os.fstat(fp.fileno()) if fp else os.stat(file_path)
+
+    try:
+        with open(sidecar_path, "r") as f:
+            file_hash, mtime_ns, size = f.read().split()
+        if int(mtime_ns) == stat.st_mtime_ns and int(size) == stat.st_size:
+            return file_hash
+    except (OSError, ValueError):
+        # Missing or unreadable sidecar
+        pass
+
+    file_hash = compute_sha256_fp(fp) if fp else compute_sha256(file_path)
+
+    tmp_path = None
+    try:
+        # A unique temporary file, so processes hashing the same video at
+        # the same time don't write into each other's
+        fd, tmp_path = tempfile.mkstemp(
+            dir=os.path.dirname(sidecar_path) or ".",
+            prefix=os.path.basename(sidecar_path) + ".",
+            suffix=".tmp",
+        )
+        # mkstemp creates the file readable by the owner only
+        os.fchmod(fd, 0o644)
+        with os.fdopen(fd, "w") as f:
+            f.write(f"{file_hash} {stat.st_mtime_ns} {stat.st_size}\n")
+        os.replace(tmp_path, sidecar_path)
+    except OSError:
+        # Caching is best effort, e.g. the video directory may be read-only
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    return file_hash
+
+
+def create_signed_event(keys, file_hash, file_ext=None):
     """
     Create a signed Nostr event for uploading to nostrmedia.com
 
     Args:
         keys: Nostr Keys object
         file_hash: SHA-256 hash of the file
-        file_path: Path to the file (for extension info)
-        debug: Whether to print debug information
+        file_ext: File extension without the leading dot (e.g. 'mp4')
 
     Returns:
         Signed Nostr event
     """
-    import asyncio
-
-    # Get file extension if file_path is provided
-    file_ext = None
-    if file_path:
-        file_ext = os.path.splitext(file_path)[1].lower()
-        if file_ext and file_ext.startswith("."):
-            file_ext = file_ext[1:]  # Remove the leading dot
-
-    if debug:
-        print("\n=== DEBUG: Event Creation ===")
-        print(f"Public key: {keys.public_key().to_hex()}")
-        print(f"File hash: {file_hash}")
-        print(f"File extension: {file_ext if file_ext else 'None'}")
-        print(f"Event kind: 24242 (custom for nostrmedia)")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("=== Event Creation ===")
+        logger.debug("Public key: %s", keys.public_key().to_hex())
+        logger.debug("File hash: %s", file_hash)
+        logger.debug("File extension: %s", file_ext)
+        logger.debug("Event kind: 24242 (custom for nostrmedia)")
 
     # Create a custom event with kind 24242
     kind = Kind(24242)
     builder = EventBuilder(kind, "Uploading blob with SHA-256 hash")
 
     # Add tags
-    t_tag = Tag.parse(["t", "upload"])
-    x_tag = Tag.parse(["x", file_hash])
-    tags = [t_tag, x_tag]
+    tags = [Tag.parse(["t", "upload"]), Tag.parse(["x", file_hash])]
 
     # Add file extension tag if available
     if file_ext:
-        ext_tag = Tag.parse(["ext", file_ext])
-        tags.append(ext_tag)
-        if debug:
-            print(f"Added extension tag: {ext_tag.as_vec()}")
+        tags.append(Tag.parse(["ext", file_ext]))
 
     builder = builder.tags(tags)
 
-    if debug:
-        print("\n=== DEBUG: Event Tags ===")
-        print(f"t tag: {t_tag.as_vec()}")
-        print(f"x tag: {x_tag.as_vec()}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("=== Event Tags ===")
+        for tag in tags:
+            logger.debug("%s", tag.as_vec())
+
+    if _SIGN_WITH_KEYS:
+        # Synchronous signing, no event loop needed
+        event = builder.sign_with_keys(keys)
+    else:
+        # Older nostr-sdk versions only have the async signer API
+        signer = NostrSigner.keys(keys)
+        event = _get_loop().run_until_complete(builder.sign(signer))
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Event signed successfully")
+        logger.debug("Event ID: %s", event.id().to_hex())
 
-    # Create a signer from keys
-    signer = NostrSigner.keys(keys)
+    return event
+
+
+def _config_nsec():
+    """
+    Get the nsec from the config, only re-reading the config when it changed
 
-    if debug:
-        print("\n=== DEBUG: Signer Created ===")
-        print(f"Signer type: NostrSigner with Keys")
+    Returns:
+        nsec string or None if not configured
+    """
+    global _CONFIG_NSEC
 
-    # Set up the event loop for async operations
+    config_path = get_config_path()
     try:
-        loop = asyncio.get_event_loop()
-    except RuntimeError:
-        # If there's no event loop in the current thread, create one
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
+        stat = os.stat(config_path)
+        signature = (config_path, stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        signature = (config_path, None, None)
 
-    if debug:
-        print("\n=== DEBUG: Signing Event ===")
+    if _CONFIG_NSEC is None or _CONFIG_NSEC[0] != signature:
+        _CONFIG_NSEC = (signature, get_nostr_key("nsec"))
+    return _CONFIG_NSEC[1]
 
-    # Sign the event (this is an async operation in Python)
-    event = loop.run_until_complete(builder.sign(signer))
 
-    if debug:
-        print("Event signed successfully")
-        print(f"Event ID: {event.id().to_hex()}")
-        # The signature is part of the JSON representation, not directly accessible
+def _load_keys(private_key_str=None):
+    """
+    Parse the given private key, or the one from the config
 
-    return event
+    Args:
+        private_key_str: Private key string (hex or nsec format, if None, will try to use from config)
+
+    Returns:
+        Tuple of (keys, None) on success or (None, error result) on failure
+    """
+    if private_key_str:
+        # Use the provided private key
+        try:
+            # Parse the private key (works with both hex and bech32/nsec format)
+            return Keys.parse(private_key_str), None
+        except Exception as e:
+            return None, {
+                "success": False,
+                "error": f"Invalid private key format: {str(e)}",
+            }
+
+    # Try to get the private key from config
+    config_nsec = _config_nsec()
+
+    if config_nsec and logger.isEnabledFor(logging.DEBUG):
+        logger.debug("=== Config Key ===")
+        logger.debug(
+            "Config nsec format: %s...%s",
+            config_nsec[:4],
+            config_nsec[-4:] if len(config_nsec) > 8 else "",
+        )
+
+    if config_nsec:
+        try:
+            keys = Keys.parse(config_nsec)
+            print("Using private key from config.yaml")
+            return keys, None
+        except Exception as e:
+            print(f"Warning: Invalid private key in config: {str(e)}")
+            print("Generating a new private key instead")
+            return Keys.generate(), None
+
+    # If no key is provided or found in config, generate a new one
+    print("No private key provided or found in config. Generating a new one.")
+    return Keys.generate(), None
 
 
 def upload_to_nostrmedia(file_path, private_key_str=None, debug=False):
@@ -138,7 +333,7 @@ def upload_to_nostrmedia(file_path, private_key_str=None, debug=False):
     Returns:
         Dictionary with upload result
     """
-    if not NOSTR_AVAILABLE:
+    if not _nostr_sdk_available():
         return {
             "success": False,
             "error": "nostr-sdk package not available. Please install it with 'pip install nostr-sdk'",
@@ -148,146 +343,152 @@ def upload_to_nostrmedia(file_path, private_key_str=None, debug=False):
         return {"success": False, "error": f"File not found: {file_path}"}
 
     try:
-        # Compute the SHA-256 hash of the file
-        file_hash = compute_sha256(file_path)
-        print(f"File hash: {file_hash}")
-
-        if debug:
-            print("\n=== DEBUG: Upload Parameters ===")
-            print(f"File path: {file_path}")
-            print(f"File size: {os.path.getsize(file_path)} bytes")
-            print(f"File hash: {file_hash}")
-            print(f"Private key provided: {bool(private_key_str)}")
-
-        # Create or load keys
-        if private_key_str:
-            # Use the provided private key
-            try:
-                # Parse the private key (works with both hex and bech32/nsec format)
-                keys = Keys.parse(private_key_str)
-            except Exception as e:
-                return {
-                    "success": False,
-                    "error": f"Invalid private key format: {str(e)}",
-                }
-        else:
-            # Try to get the private key from config
-            config_nsec = get_nostr_key("nsec")
-
-            if debug and config_nsec:
-                print("\n=== DEBUG: Config Key ===")
-                print(
-                    f"Config nsec format: {config_nsec[:4]}...{config_nsec[-4:] if len(config_nsec) > 8 else ''}"
-                )
-
-            if config_nsec:
-                try:
-                    keys = Keys.parse(config_nsec)
-                    print("Using private key from config.yaml")
-                except Exception as e:
-                    print(f"Warning: Invalid private key in config: {str(e)}")
-                    print("Generating a new private key instead")
-                    keys = Keys.generate()
-            else:
-                # If no key is provided or found in config, generate a new one
-                print(
-                    "No private key provided or found in config. Generating a new one."
-                )
-                keys = Keys.generate()
-
-        # Create and sign the event
-        event = create_signed_event(keys, file_hash, file_path=file_path, debug=debug)
-
-        # Get the event as JSON and encode it as base64
-        event_json = event.as_json()
-        print(f"Event JSON: {event_json}")
-        event_base64 = base64.b64encode(event_json.encode()).decode()
-
-        if debug:
-            print("\n=== DEBUG: Event Encoding ===")
-            print(f"Event JSON length: {len(event_json)} bytes")
-            print(f"Event Base64 length: {len(event_base64)} bytes")
-
-        # Prepare the upload request
-        url = "https://nostrmedia.com/upload"
-        headers = {"Authorization": f"Nostr {event_base64}"}
-
-        if debug:
-            print("\n=== DEBUG: Upload Request ===")
-            print(f"URL: {url}")
-            print(f"Headers: {headers}")
-
-        # Determine the MIME type based on file extension
+        # Extension with its leading dot, e.g. '.mp4'
         file_ext = os.path.splitext(file_path)[1].lower()
-        mime_type = "application/octet-stream"  # Default MIME type
-
-        # Map common video extensions to MIME types
-        mime_types = {
-            ".mp4": "video/mp4",
-            ".webm": "video/webm",
-            ".mkv": "video/x-matroska",
-            ".avi": "video/x-msvideo",
-            ".mov": "video/quicktime",
-            ".wmv": "video/x-ms-wmv",
-            ".flv": "video/x-flv",
-        }
 
-        if file_ext in mime_types:
-            mime_type = mime_types[file_ext]
-
-        if debug:
-            print(
-                f"\n=== DEBUG: File Type ===\nFile extension: {file_ext}\nMIME type: {mime_type}"
+        # The file is opened once, for hashing and then for the upload
+        with open(file_path, "rb") as f:
+            # Compute the SHA-256 hash of the file in the background while
+            # the keys are loaded
+            hash_future = _HASH_EXECUTOR.submit(_cached_sha256, file_path, f)
+
+            keys, error = _load_keys(private_key_str)
+            if error:
+                # The hash thread is still reading from f, don't close it
+                # under its feet
+                wait([hash_future])
+                return error
+
+            file_hash = hash_future.result()
+
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("=== Upload Parameters ===")
+                logger.debug("File path: %s", file_path)
+                logger.debug("File size: %d bytes", os.path.getsize(file_path))
+                logger.debug("File hash: %s", file_hash)
+                logger.debug("Private key provided: %s", bool(private_key_str))
+
+            # Create and sign the event
+            event = create_signed_event(keys, file_hash, file_ext=file_ext[1:] or None)
+
+            # Get the event as JSON and encode it as base64
+            event_json = event.as_json()
+            # The JSON is ASCII apart from an unusual file extension, and for
+            # ASCII text encoding to UTF-8 is a plain copy
+            event_base64 = base64.b64encode(event_json.encode("utf-8")).decode("ascii")
+
+            logger.debug("=== Event Encoding ===")
+            logger.debug("Event JSON: %s", event_json)
+            logger.debug("Event JSON length: %d bytes", len(event_json))
+            logger.debug("Event Base64 length: %d bytes", len(event_base64))
+
+            # Prepare the upload request
+            url = "https://nostrmedia.com/upload"
+            headers = {"Authorization": f"Nostr {event_base64}"}
+
+            logger.debug("=== Upload Request ===")
+            logger.debug("URL: %s", url)
+            logger.debug("Headers: %s", headers)
+
+            # Determine the MIME type based on file extension
+            mime_type = (
+                _MIME_TYPES.get(file_ext)
+                or mimetypes.guess_type(file_path)[0]
+                or "application/octet-stream"
             )
 
-        # Open the file for upload
-        with open(file_path, "rb") as f:
-            files = {"file": (os.path.basename(file_path), f, mime_type)}
+            logger.debug("=== File Type ===")
+            logger.debug("File extension: %s", file_ext)
+            logger.debug("MIME type: %s", mime_type)
+
+            # Rewind after hashing, then stream the multipart body from disk
+            # instead of building it in memory, videos can be several GB
+            f.seek(0)
+            encoder = MultipartEncoder(
+                fields={"file": (os.path.basename(file_path), f, mime_type)}
+            )
 
             # Send the upload request
             print(f"Uploading file to {url}...")
 
-            if debug:
-                print("\n=== DEBUG: File Upload ===")
-                print(f"File name: {os.path.basename(file_path)}")
-                print(f"Content type: {mime_type}")
-
-            response = requests.post(url, headers=headers, files=files)
-
-            if debug:
-                print("\n=== DEBUG: Response ===")
-                print(f"Status code: {response.status_code}")
-                print(f"Response headers: {response.headers}")
-                print(
-                    f"Response content: {response.text[:500]}{'...' if len(response.text) > 500 else ''}"
-                )
-
-            if response.status_code == 200:
-                print("Upload successful!")
-
-                # Parse the response to get the actual URL
-                response_data = response.json() if response.content else {}
-                url = response_data.get("url", f"https://nostrmedia.com/{file_hash}")
-
-                if debug:
-                    print(f"\n=== DEBUG: URL Handling ===")
-                    print(f"Response URL: {url}")
-                    print(f"File hash: {file_hash}")
-
-                return {
-                    "success": True,
-                    "url": url,
-                    "hash": file_hash,
-                    "response": response_data,
-                }
-            else:
-                print(f"Upload failed with status code {response.status_code}")
-                return {
-                    "success": False,
-                    "error": f"Upload failed with status code {response.status_code}",
-                    "response": response.text,
-                }
+            logger.debug("=== File Upload ===")
+            logger.debug("Content type: %s", encoder.content_type)
+
+            response = _SESSION.post(
+                url,
+                headers={**headers, "Content-Type": encoder.content_type},
+                data=encoder,
+            )
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("=== Response ===")
+            logger.debug("Status code: %s", response.status_code)
+            logger.debug("Response headers: %s", response.headers)
+            logger.debug(
+                "Response content: %s%s",
+                response.text[:500],
+                "..." if len(response.text) > 500 else "",
+            )
+
+        if response.status_code == 200:
+            print("Upload successful!")
+
+            # Parse the response to get the actual URL
+            response_data = response.json() if response.content else {}
+            url = response_data.get("url", f"https://nostrmedia.com/{file_hash}")
+
+            logger.debug("Response URL: %s", url)
+
+            return {
+                "success": True,
+                "url": url,
+                "hash": file_hash,
+                "response": response_data,
+            }
+        else:
+            print(f"Upload failed with status code {response.status_code}")
+            return {
+                "success": False,
+                "error": f"Upload failed with status code {response.status_code}",
+                "response": response.text,
+            }
 
     except Exception as e:
         print(f"Error uploading file: {str(e)}")
         return {"success": False, "error": str(e)}
+
+
+def upload_many_to_nostrmedia(file_paths, private_key_str=None, debug=False):
+    """
+    Upload several files to nostrmedia.com, hashing ahead of the uploads
+
+    All files are hashed in parallel up front, so by the time a file's turn
+    comes its hash is usually already in the sidecar cache and the upload
+    itself only has to stream it.
+
+    Args:
+        file_paths: List of paths to the files to upload
+        private_key_str: Private key string (hex or nsec format, if None, will try to use from config)
+        debug: Whether to print detailed debug information
+
+    Returns:
+        List of upload result dictionaries, in the order of file_paths
+    """
+    results = []
+    max_workers = max(1, min(len(file_paths), os.cpu_count() or 1))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        hash_futures = [
+            pool.submit(_cached_sha256, file_path)
+            if os.path.exists(file_path)
+            else None
+            for file_path in file_paths
+        ]
+
+        for file_path, hash_future in zip(file_paths, hash_futures):
+            if hash_future is not None:
+                # Hashing errors are reported by the upload itself
+                wait([hash_future])
+            results.append(upload_to_nostrmedia(file_path, private_key_str, debug))
+
+    return results
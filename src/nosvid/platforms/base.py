@@ -0,0 +1,110 @@
+"""
+Shared platform functionality for nosvid
+"""
+
+import logging
+import os
+import traceback
+from typing import Any, Dict
+
+from ..utils.config import load_config
+from ..utils.filesystem import (
+    get_platform_dir,
+    load_json_file,
+    save_json_file,
+    video_dir_index,
+)
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+class PlatformStore:
+    """
+    Activation checks and metadata storage of a platform
+
+    The platform modules expose the methods of their store under their
+    historical function names, e.g. nostr.get_nostr_metadata.
+    """
+
+    __slots__ = ("name", "display_name")
+
+    def __init__(self, name: str, display_name: str):
+        """
+        Initialize the store
+
+        Args:
+            name: Platform name, used in the config and as directory name
+            display_name: Platform name used in messages
+        """
+        self.name = name
+        self.display_name = display_name
+
+    def is_activated(self) -> bool:
+        """
+        Check if the platform is activated in the config
+
+        Returns:
+            True if the platform is activated, False otherwise
+        """
+        # Only one flag is read, so the frozen shared config will do
+        config = load_config(shared=True)
+        return config.get(self.name, {}).get("activated", False)
+
+    def check_activated(self) -> None:
+        """
+        Check if the platform is activated and raise an exception if not
+
+        Raises:
+            ValueError: If the platform is not activated
+        """
+        if not self.is_activated():
+            error_msg = (
+                f"{self.display_name} platform is not activated. "
+                "Please activate it in your config.yaml file by setting "
+                f"{self.name}.activated = true"
+            )
+            logger.error("Platform activation check failed: %s", error_msg)
+            # Formatting the stack is expensive, only do it if it gets logged
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Stack trace: %s", "".join(traceback.format_stack()))
+            raise ValueError(error_msg)
+
+    def get_metadata_file(self, video_dir: str) -> str:
+        """
+        Get the path of the platform metadata file of a video
+
+        Args:
+            video_dir: Directory containing the video
+
+        Returns:
+            Path to the metadata file
+        """
+        return os.path.join(get_platform_dir(video_dir, self.name), "metadata.json")
+
+    def get_metadata(self, video_dir: str) -> Dict[str, Any]:
+        """
+        Get the platform metadata for a video
+
+        Args:
+            video_dir: Directory containing the video
+
+        Returns:
+            Platform metadata dictionary
+        """
+        # Don't create the platform directory just to find it empty
+        if self.name not in video_dir_index(video_dir):
+            return {}
+
+        # load_json_file returns an empty dict if the file doesn't exist
+        return load_json_file(self.get_metadata_file(video_dir))
+
+    def update_metadata(self, video_dir: str, metadata: Dict[str, Any]) -> None:
+        """
+        Update the platform metadata for a video
+
+        Args:
+            video_dir: Directory containing the video
+            metadata: Platform metadata dictionary
+        """
+        save_json_file(self.get_metadata_file(video_dir), metadata)
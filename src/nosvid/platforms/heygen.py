@@ -4,15 +4,63 @@ HeyGen platform functionality for nosvid
 
 import json
 import os
+import shutil
 import time
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
 
 from ..utils.config import read_api_key_from_yaml
 from ..utils.filesystem import get_platform_dir, load_json_file, save_json_file
 
+# Shared session so that status polls and downloads reuse connections to
+# the HeyGen API instead of doing a TLS handshake per request
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+
+# Last ETag and parsed body per API URL, used to revalidate repeated GETs
+_ETAG_CACHE: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+
+
+def _cached_get(
+    url: str, headers: Dict[str, str]
+) -> Tuple[requests.Response, Optional[Dict[str, Any]]]:
+    """
+    GET a HeyGen API URL, revalidating the last response with its ETag
+
+    Args:
+        url: API URL
+        headers: Request headers
+
+    Returns:
+        Tuple of the response and the cached parsed body if the server
+        answered 304 Not Modified, otherwise None
+    """
+    cached = _ETAG_CACHE.get(url)
+    if cached:
+        headers = {**headers, "If-None-Match": cached[0]}
+
+    response = _SESSION.get(url, headers=headers)
+    if response.status_code == 304 and cached:
+        return response, cached[1]
+    return response, None
+
+
+def _remember_etag(url: str, response: requests.Response, data: Dict[str, Any]) -> None:
+    """
+    Cache a parsed response body under its ETag, if the server sent one
+
+    Args:
+        url: API URL
+        response: Response the body was parsed from
+        data: Parsed response body
+    """
+    etag = response.headers.get("ETag")
+    if etag:
+        _ETAG_CACHE[url] = (etag, data)
+
 
 def get_heygen_metadata(video_dir: str, quality: str = "scale") -> Dict[str, Any]:
     """
@@ -34,10 +82,8 @@ def get_heygen_metadata(video_dir: str, quality: str = "scale") -> Dict[str, Any
 
     # Load HeyGen-specific metadata
     heygen_metadata_file = os.path.join(quality_dir, "metadata.json")
-    if os.path.exists(heygen_metadata_file):
-        return load_json_file(heygen_metadata_file)
-
-    return {}
+    # load_json_file returns an empty dict if the file doesn't exist
+    return load_json_file(heygen_metadata_file)
 
 
 def update_heygen_metadata(
@@ -77,7 +123,7 @@ def list_supported_languages(api_key: str) -> List[str]:
     headers = {"accept": "application/json", "x-api-key": api_key}
 
     try:
-        response = requests.get(url, headers=headers)
+        response, data = _cached_get(url, headers)
 
         # Check for 403 Forbidden specifically
         if response.status_code == 403:
@@ -129,8 +175,10 @@ def list_supported_languages(api_key: str) -> List[str]:
                 "Swahili",
             ]
 
-        response.raise_for_status()
-        data = response.json()
+        if data is None:
+            response.raise_for_status()
+            data = response.json()
+            _remember_etag(url, response, data)
 
         if data.get("error") is not None:
             print(f"Error: {data['error']}")
@@ -174,7 +222,7 @@ def translate_video(
         print(f"Sending request to HeyGen API: {json.dumps(payload, indent=2)}")
 
     try:
-        response = requests.post(url, headers=headers, json=payload)
+        response = _SESSION.post(url, headers=headers, json=payload)
 
         # Check for 403 Forbidden specifically
         if response.status_code == 403:
@@ -243,7 +291,7 @@ def check_translation_status(
     headers = {"accept": "application/json", "x-api-key": api_key}
 
     try:
-        response = requests.get(url, headers=headers)
+        response, data = _cached_get(url, headers)
 
         # Check for 403 Forbidden specifically
         if response.status_code == 403:
@@ -259,8 +307,10 @@ def check_translation_status(
                 "message": "The Video Translation API is only available on Scale and Enterprise plans",
             }
 
-        response.raise_for_status()
-        data = response.json()
+        if data is None:
+            response.raise_for_status()
+            data = response.json()
+            _remember_etag(url, response, data)
 
         if data.get("error") is not None:
             return {
@@ -270,6 +320,10 @@ def check_translation_status(
             }
 
         status_data = data["data"]
+        if status_data["status"] in ("success", "failed"):
+            # The job is finished, it won't be polled again
+            _ETAG_CACHE.pop(url, None)
+
         result = {
             "success": True,
             "video_translate_id": status_data["video_translate_id"],
@@ -314,13 +368,15 @@ def wait_for_translation(
         video_translate_id: ID of the translation job
         api_key: HeyGen API key
         timeout: Maximum time to wait in seconds (default: 1 hour)
-        check_interval: Time between status checks in seconds
+        check_interval: Maximum time between status checks in seconds; checks
+            start every 2 seconds and back off exponentially up to this
         debug: Whether to print debug information
 
     Returns:
         Dictionary with translation result
     """
     start_time = time.time()
+    delay = min(2, check_interval)
 
     while time.time() - start_time < timeout:
         status = check_translation_status(video_translate_id, api_key, debug)
@@ -341,10 +397,11 @@ def wait_for_translation(
         # Still processing, wait and check again
         if debug:
             print(
-                f"Translation in progress, status: {status['status']}. Checking again in {check_interval} seconds..."
+                f"Translation in progress, status: {status['status']}. Checking again in {delay} seconds..."
             )
 
-        time.sleep(check_interval)
+        time.sleep(delay)
+        delay = min(delay * 2, check_interval)
 
     return {
         "success": False,
@@ -399,6 +456,10 @@ LANGUAGE_TO_ISO = {
 # Reverse mapping from ISO to language name
 ISO_TO_LANGUAGE = {v: k for k, v in LANGUAGE_TO_ISO.items()}
 
+# Lowercased lookup tables for get_iso_code
+_ISO_CODES_LOWER = frozenset(code.lower() for code in ISO_TO_LANGUAGE)
+_LANGUAGE_TO_ISO_LOWER = {k.lower(): v for k, v in LANGUAGE_TO_ISO.items()}
+
 
 def get_iso_code(language: str) -> str:
     """
@@ -410,12 +471,14 @@ def get_iso_code(language: str) -> str:
     Returns:
         ISO language code or original string if not found
     """
+    lowered = language.lower()
+
     # If it's already an ISO code, return it
-    if language.lower() in [code.lower() for code in ISO_TO_LANGUAGE.keys()]:
-        return language.lower()
+    if lowered in _ISO_CODES_LOWER:
+        return lowered
 
     # Otherwise, look up the ISO code
-    return LANGUAGE_TO_ISO.get(language, language.lower())
+    return _LANGUAGE_TO_ISO_LOWER.get(lowered, lowered)
 
 
 def get_language_name(iso_code: str) -> str:
@@ -447,12 +510,14 @@ def download_translated_video(url: str, output_path: str, debug: bool = False) -
         if debug:
             print(f"Downloading translated video from {url} to {output_path}")
 
-        response = requests.get(url, stream=True)
+        response = _SESSION.get(url, stream=True)
         response.raise_for_status()
 
+        # Copy straight from the socket in large blocks, undoing any
+        # gzip/deflate transfer encoding on the way
+        response.raw.decode_content = True
         with open(output_path, "wb") as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
+            shutil.copyfileobj(response.raw, f, length=1 << 20)
 
         if debug:
             print(f"Download completed: {output_path}")
@@ -4,170 +4,112 @@ Nostr platform functionality for nosvid
 
 import logging
 import os
-import traceback
 from datetime import datetime
+from operator import attrgetter
 from typing import Any, Dict, List, Optional
 
+from ..models.video import NostrPost
 from ..nostr.upload import upload_to_nostr
-from ..utils.config import load_config
-from ..utils.filesystem import get_platform_dir, load_json_file, save_json_file
+from ..utils.filesystem import get_platform_dir, load_json_file, video_dir_index
+from .base import PlatformStore
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
 
-def is_platform_activated() -> bool:
-    """
-    Check if the Nostr platform is activated in the config
+nostr_store = PlatformStore("nostr", "Nostr")
 
-    Returns:
-        True if the platform is activated, False otherwise
-    """
-    config = load_config()
-    return config.get("nostr", {}).get("activated", False)
+# Kept as module-level functions for backward compatibility
+is_platform_activated = nostr_store.is_activated
+check_platform_activated = nostr_store.check_activated
+get_nostr_metadata = nostr_store.get_metadata
+update_nostr_metadata = nostr_store.update_metadata
 
 
-def check_platform_activated() -> None:
-    """
-    Check if the Nostr platform is activated and raise an exception if not
-
-    Raises:
-        ValueError: If the platform is not activated
+def _make_post(event_id: str, metadata: Dict[str, Any]) -> NostrPost:
     """
-    if not is_platform_activated():
-        error_msg = (
-            "Nostr platform is not activated. "
-            "Please activate it in your config.yaml file by setting nostr.activated = true"
-        )
-        logger.error(f"Platform activation check failed: {error_msg}")
-        logger.error(f"Stack trace: {traceback.format_stack()}")
-        raise ValueError(error_msg)
-
-
-def get_nostr_metadata(video_dir: str) -> Dict[str, Any]:
-    """
-    Get Nostr metadata for a video
+    Create a post from Nostr metadata
 
     Args:
-        video_dir: Directory containing the video
+        event_id: ID of the Nostr event
+        metadata: Nostr metadata dictionary
 
     Returns:
-        Nostr metadata dictionary
-    """
-    # Get the Nostr platform directory
-    nostr_dir = get_platform_dir(video_dir, "nostr")
-
-    # Load Nostr-specific metadata
-    nostr_metadata_file = os.path.join(nostr_dir, "metadata.json")
-    if os.path.exists(nostr_metadata_file):
-        return load_json_file(nostr_metadata_file)
-
-    return {}
-
-
-def update_nostr_metadata(video_dir: str, metadata: Dict[str, Any]) -> None:
+        NostrPost object
     """
-    Update Nostr metadata for a video
-
-    Args:
-        video_dir: Directory containing the video
-        metadata: Nostr metadata dictionary
-    """
-    # Get the Nostr platform directory
-    nostr_dir = get_platform_dir(video_dir, "nostr")
-
-    # Save Nostr-specific metadata
-    nostr_metadata_file = os.path.join(nostr_dir, "metadata.json")
-    save_json_file(nostr_metadata_file, metadata)
+    # Only format the current time if the metadata has no timestamp, the
+    # default of dict.get would be evaluated for every post
+    uploaded_at = metadata.get("uploaded_at")
+    if uploaded_at is None:
+        uploaded_at = datetime.now().isoformat()
+
+    return NostrPost(
+        event_id=event_id,
+        pubkey=metadata.get("pubkey", ""),
+        uploaded_at=uploaded_at,
+        nostr_uri=metadata.get("nostr_uri", ""),
+        links=metadata.get("links") or {},
+    )
 
 
 def get_nostr_posts(video_dir: str) -> List[Dict[str, Any]]:
     """
     Get all Nostr posts for a video
 
+    The posts come from the main metadata.json and from additional
+    <event_id>.json files (for multiple posts), read in one directory pass.
+
     Args:
         video_dir: Directory containing the video
 
     Returns:
         List of Nostr post dictionaries
     """
+    # Without a Nostr platform directory there are no posts
+    if "nostr" not in video_dir_index(video_dir):
+        return []
+
     # Get the Nostr platform directory
     nostr_dir = get_platform_dir(video_dir, "nostr")
 
-    posts = []
+    posts_by_event_id = {}
 
-    # Check if the nostr directory exists
-    if not os.path.exists(nostr_dir):
-        return posts
+    try:
+        with os.scandir(nostr_dir) as entries:
+            json_entries = [entry for entry in entries if entry.name.endswith(".json")]
+    except FileNotFoundError:
+        return []
 
-    # Check if the nostr metadata file exists
-    nostr_metadata_file = os.path.join(nostr_dir, "metadata.json")
-    if os.path.exists(nostr_metadata_file):
-        # Load the nostr metadata
+    for entry in json_entries:
+        is_main_file = entry.name == "metadata.json"
         try:
-            nostr_metadata = load_json_file(nostr_metadata_file)
-
-            # Check if the nostr metadata has an event_id
-            if "event_id" in nostr_metadata:
-                # Create a post entry
-                post_entry = {
-                    "event_id": nostr_metadata["event_id"],
-                    "pubkey": nostr_metadata.get("pubkey", ""),
-                    "nostr_uri": nostr_metadata.get("nostr_uri", ""),
-                    "links": nostr_metadata.get("links", {}),
-                    "uploaded_at": nostr_metadata.get(
-                        "uploaded_at", datetime.now().isoformat()
-                    ),
-                }
-
-                posts.append(post_entry)
+            metadata = load_json_file(entry.path)
         except Exception as e:
-            print(f"Error loading nostr metadata: {e}")
-
-    # Check for additional nostr metadata files (for multiple posts)
-    for item in os.listdir(nostr_dir):
-        # Skip the main metadata.json file
-        if item == "metadata.json":
+            print(f"Error loading nostr metadata {entry.name}: {e}")
             continue
 
-        # Check if it's a JSON file with an event ID as the filename
-        if not item.endswith(".json"):
+        # Additional files are named after their event ID; fall back to the
+        # event_id in the metadata if needed
+        event_id = (
+            metadata.get("event_id") if is_main_file else entry.name[:-5]
+        ) or metadata.get("event_id")
+        if not event_id:
             continue
 
-        # Extract the event ID from the filename (remove .json extension)
-        filename_event_id = item[:-5]  # Remove .json extension
-
-        # Load the additional metadata file
-        additional_metadata_file = os.path.join(nostr_dir, item)
-        try:
-            additional_metadata = load_json_file(additional_metadata_file)
-
-            # Use the event ID from the filename if available, otherwise from the metadata
-            event_id = filename_event_id
-
-            # Fallback to the event_id in the metadata if needed
-            if not event_id and "event_id" in additional_metadata:
-                event_id = additional_metadata["event_id"]
-
-            # Create a post entry
-            post_entry = {
-                "event_id": event_id,
-                "pubkey": additional_metadata.get("pubkey", ""),
-                "nostr_uri": additional_metadata.get("nostr_uri", ""),
-                "links": additional_metadata.get("links", {}),
-                "uploaded_at": additional_metadata.get(
-                    "uploaded_at", datetime.now().isoformat()
-                ),
-            }
-
-            posts.append(post_entry)
-        except Exception as e:
-            print(f"Error loading additional nostr metadata: {e}")
+        post = _make_post(event_id, metadata)
+        if is_main_file:
+            # A post's own file takes precedence over the main metadata
+            posts_by_event_id.setdefault(event_id, post)
+        else:
+            posts_by_event_id[event_id] = post
 
     # Sort posts by uploaded_at timestamp (newest first)
-    posts.sort(key=lambda post: post.get("uploaded_at", ""), reverse=True)
+    posts = sorted(
+        posts_by_event_id.values(), key=attrgetter("uploaded_at"), reverse=True
+    )
 
-    return posts
+    # Callers expect dictionaries
+    return [post.to_dict() for post in posts]
 
 
 def post_video_to_nostr(
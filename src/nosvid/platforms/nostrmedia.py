@@ -3,82 +3,23 @@ Nostrmedia platform functionality for nosvid
 """
 
 import logging
-import os
-import traceback
 from datetime import datetime
 from typing import Any, Dict, Optional
 
 from ..nostrmedia.upload import upload_to_nostrmedia
-from ..utils.config import load_config
-from ..utils.filesystem import get_platform_dir, load_json_file, save_json_file
+from .base import PlatformStore
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
 
-def is_platform_activated() -> bool:
-    """
-    Check if the Nostrmedia platform is activated in the config
-
-    Returns:
-        True if the platform is activated, False otherwise
-    """
-    config = load_config()
-    return config.get("nostrmedia", {}).get("activated", False)
-
-
-def check_platform_activated() -> None:
-    """
-    Check if the Nostrmedia platform is activated and raise an exception if not
-
-    Raises:
-        ValueError: If the platform is not activated
-    """
-    if not is_platform_activated():
-        error_msg = (
-            "Nostrmedia platform is not activated. "
-            "Please activate it in your config.yaml file by setting nostrmedia.activated = true"
-        )
-        logger.error(f"Platform activation check failed: {error_msg}")
-        logger.error(f"Stack trace: {traceback.format_stack()}")
-        raise ValueError(error_msg)
-
-
-def get_nostrmedia_metadata(video_dir: str) -> Dict[str, Any]:
-    """
-    Get Nostrmedia metadata for a video
-
-    Args:
-        video_dir: Directory containing the video
-
-    Returns:
-        Nostrmedia metadata dictionary
-    """
-    # Get the Nostrmedia platform directory
-    nostrmedia_dir = get_platform_dir(video_dir, "nostrmedia")
-
-    # Load Nostrmedia-specific metadata
-    nostrmedia_metadata_file = os.path.join(nostrmedia_dir, "metadata.json")
-    if os.path.exists(nostrmedia_metadata_file):
-        return load_json_file(nostrmedia_metadata_file)
-
-    return {}
-
-
-def update_nostrmedia_metadata(video_dir: str, metadata: Dict[str, Any]) -> None:
-    """
-    Update Nostrmedia metadata for a video
-
-    Args:
-        video_dir: Directory containing the video
-        metadata: Nostrmedia metadata dictionary
-    """
-    # Get the Nostrmedia platform directory
-    nostrmedia_dir = get_platform_dir(video_dir, "nostrmedia")
+nostrmedia_store = PlatformStore("nostrmedia", "Nostrmedia")
 
-    # Save Nostrmedia-specific metadata
-    nostrmedia_metadata_file = os.path.join(nostrmedia_dir, "metadata.json")
-    save_json_file(nostrmedia_metadata_file, metadata)
+# Kept as module-level functions for backward compatibility
+is_platform_activated = nostrmedia_store.is_activated
+check_platform_activated = nostrmedia_store.check_activated
+get_nostrmedia_metadata = nostrmedia_store.get_metadata
+update_nostrmedia_metadata = nostrmedia_store.update_metadata
 
 
 def upload_video_to_nostrmedia(
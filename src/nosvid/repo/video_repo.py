@@ -3,18 +3,101 @@ Video repository for nosvid
 """
 
 import glob
+import heapq
 import os
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from operator import attrgetter
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 from ..models.video import Video
 from ..utils.filesystem import (
+    StatCache,
+    batch_write,
     get_video_dir,
     load_json_file,
     save_json_file,
     setup_directory_structure,
 )
 
+# Video attributes that list() can sort by
+_SORT_FIELDS = ("published_at", "title", "duration")
+
+# Below this many videos, list() loads them without a thread pool
+_MIN_PARALLEL_LOADS = 8
+
+# Counters of aggregate_stats() besides total_with_metadata, in the order of
+# the tuples returned by _video_stats
+_STATS_FIELDS = (
+    "total_downloaded",
+    "total_uploaded_nm",
+    "total_posted_nostr",
+    "total_with_npubs",
+    "total_npubs",
+)
+
+# (base_dir, channel_title) -> directory structure of the channel, created
+# once per process. Module-level because the API creates a repository per
+# request.
+_dirs_cache: Dict[Tuple[str, str], Dict[str, str]] = {}
+
+# Videos listed in the channel metadata files, by channel metadata directory
+# and validated against the names and (st_mtime_ns, st_size) of those files.
+# Module-level because the API creates a repository per request.
+_channel_index_cache = StatCache(64)
+
+# What each video contributes to aggregate_stats(), keyed by the path of its
+# metadata.json and validated against (st_ino, st_mtime_ns, st_size).
+# Module-level because the API creates a repository per request.
+_video_stats_cache = StatCache(8192)
+
+
+def _video_stats(video: Video) -> Tuple[int, int, int, int, int]:
+    """
+    Count what a video contributes to the statistics of its channel
+
+    Args:
+        video: Video object
+
+    Returns:
+        Tuple of the counters in the order of _STATS_FIELDS
+    """
+    platforms = video.platforms or {}
+    youtube = platforms.get("youtube")
+    nostrmedia = platforms.get("nostrmedia")
+
+    npub_count = 0
+    if video.npubs:
+        if "chat" in video.npubs:
+            npub_count += len(video.npubs["chat"])
+        if "description" in video.npubs:
+            npub_count += len(video.npubs["description"])
+
+    return (
+        int(bool(youtube and youtube.downloaded)),
+        int(bool(nostrmedia and nostrmedia.url)),
+        int(bool(video.nostr_posts)),
+        int(npub_count > 0),
+        npub_count,
+    )
+
+
+def _sum_stats(rows: List[Tuple[int, int, int, int, int]]) -> Dict[str, int]:
+    """
+    Add up the contributions of the videos to the statistics of a channel
+
+    Args:
+        rows: Tuples returned by _video_stats, one per video
+
+    Returns:
+        Dictionary with total_with_metadata and the counters of _STATS_FIELDS
+    """
+    stats = {"total_with_metadata": len(rows)}
+    stats.update(zip(_STATS_FIELDS, map(sum, zip(*rows))))
+    for field in _STATS_FIELDS:
+        stats.setdefault(field, 0)
+    return stats
+
 
 class VideoRepo(ABC):
     """
@@ -87,20 +170,58 @@ class VideoRepo(ABC):
         """
         pass
 
+    def aggregate_stats(self, channel_title: str) -> Dict[str, int]:
+        """
+        Count the videos of a channel by their state on the platforms
+
+        Args:
+            channel_title: Title of the channel
+
+        Returns:
+            Dictionary with total_with_metadata, total_downloaded,
+            total_uploaded_nm, total_posted_nostr, total_with_npubs and
+            total_npubs
+        """
+        return _sum_stats([_video_stats(video) for video in self.list(channel_title)])
+
 
 class FileSystemVideoRepo(VideoRepo):
     """
     File system implementation of VideoRepo
     """
 
-    def __init__(self, base_dir: str):
+    def __init__(self, base_dir: str, load_workers: int = 8):
         """
         Initialize the repository
 
         Args:
             base_dir: Base directory for videos
+            load_workers: Number of threads loading video metadata in list();
+                1 loads the videos one after another
         """
         self.base_dir = base_dir
+        self.load_workers = load_workers
+
+    def _dirs(self, channel_title: str) -> Dict[str, str]:
+        """
+        Get the directory structure of a channel, creating it on first use
+
+        The methods below cope with directories that disappear later on:
+        save() recreates the video directory with its parents, and the
+        readers treat missing directories as empty.
+
+        Args:
+            channel_title: Title of the channel
+
+        Returns:
+            Dictionary with paths to different directories
+        """
+        key = (self.base_dir, channel_title)
+        dirs = _dirs_cache.get(key)
+        if dirs is None:
+            dirs = setup_directory_structure(self.base_dir, channel_title)
+            _dirs_cache[key] = dirs
+        return dirs
 
     def get_by_id(self, video_id: str, channel_title: str) -> Optional[Video]:
         """
@@ -113,43 +234,85 @@ class FileSystemVideoRepo(VideoRepo):
         Returns:
             Video object or None if not found
         """
-        dirs = setup_directory_structure(self.base_dir, channel_title)
-        video_dir = get_video_dir(dirs["videos_dir"], video_id)
-        metadata_dir = dirs["metadata_dir"]
+        dirs = self._dirs(channel_title)
 
-        # First check if the video directory exists and has metadata
-        if os.path.exists(video_dir):
-            metadata_file = os.path.join(video_dir, "metadata.json")
-            if os.path.exists(metadata_file):
-                metadata = load_json_file(metadata_file)
-                video = Video.from_dict(metadata)
-                return video
+        # First check if the video directory has metadata
+        video = self._load_video_metadata(dirs["videos_dir"], video_id)
+        if video is not None:
+            return video
 
         # If not found in the video directory, check the channel metadata files
-        channel_metadata_files = glob.glob(
-            os.path.join(metadata_dir, "channel_videos_*.json")
+        video_data = self._load_channel_index(dirs["metadata_dir"]).get(video_id)
+        if video_data is not None:
+            return self._video_from_channel_data(video_id, video_data)
+
+        return None
+
+    def _load_channel_index(self, metadata_dir: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Index the videos listed in the channel metadata files by video ID
+
+        The index is cached until a channel metadata file is added, removed
+        or modified. It is shared between callers, so don't modify it.
+
+        Args:
+            metadata_dir: Channel metadata directory
+
+        Returns:
+            Dictionary mapping video ID to the video's channel metadata
+        """
+        channel_metadata_files = sorted(
+            glob.glob(os.path.join(metadata_dir, "channel_videos_*.json"))
         )
+        signature = []
         for channel_file in channel_metadata_files:
+            try:
+                stat = os.stat(channel_file)
+            except FileNotFoundError:
+                continue
+            signature.append((channel_file, stat.st_mtime_ns, stat.st_size))
+        signature = tuple(signature)
+
+        index = _channel_index_cache.get(metadata_dir, signature)
+        if index is not None:
+            return index
+
+        index = {}
+        for channel_file, _, _ in signature:
             try:
                 channel_data = load_json_file(channel_file)
-                if "videos" in channel_data:
-                    for video_data in channel_data["videos"]:
-                        if video_data.get("video_id") == video_id:
-                            # Create a minimal Video object from channel metadata
-                            return Video(
-                                video_id=video_id,
-                                title=video_data.get("title", ""),
-                                published_at=video_data.get("published_at", ""),
-                                duration=video_data.get("duration", 0),
-                                platforms={},
-                                nostr_posts=[],
-                                npubs={},
-                            )
+                for video_data in channel_data.get("videos", []):
+                    # The first file listing a video wins
+                    index.setdefault(video_data.get("video_id"), video_data)
             except Exception as e:
                 print(f"Error reading channel metadata file {channel_file}: {e}")
                 continue
 
-        return None
+        _channel_index_cache.put(metadata_dir, signature, index)
+        return index
+
+    def _video_from_channel_data(
+        self, video_id: str, video_data: Dict[str, Any]
+    ) -> Video:
+        """
+        Create a minimal Video object from channel metadata
+
+        Args:
+            video_id: ID of the video
+            video_data: The video's entry in a channel metadata file
+
+        Returns:
+            Video object
+        """
+        return Video(
+            video_id=video_id,
+            title=video_data.get("title", ""),
+            published_at=video_data.get("published_at", ""),
+            duration=video_data.get("duration", 0),
+            platforms={},
+            nostr_posts=[],
+            npubs={},
+        )
 
     def list(
         self,
@@ -172,37 +335,31 @@ class FileSystemVideoRepo(VideoRepo):
         Returns:
             List of Video objects
         """
-        dirs = setup_directory_structure(self.base_dir, channel_title)
+        dirs = self._dirs(channel_title)
         videos_dir = dirs["videos_dir"]
 
         # Check if the videos directory exists
         if not os.path.exists(videos_dir):
             return []
 
-        # Get all video directories
-        video_dirs = [
-            d
-            for d in os.listdir(videos_dir)
-            if os.path.isdir(os.path.join(videos_dir, d))
-        ]
-
-        # Load metadata for each video
-        videos = []
-        for video_id in video_dirs:
-            video = self.get_by_id(video_id, channel_title)
-            if video:
-                videos.append(video)
-            else:
-                print(f"  Failed to load video {video_id}")
+        # Videos are loaded lazily, so a paginated listing only keeps the
+        # videos it may return in memory
+        videos = self._iter_videos(dirs)
 
         # Sort videos
         reverse = sort_order.lower() == "desc"
-        if sort_by == "published_at":
-            videos.sort(key=lambda v: v.published_at, reverse=reverse)
-        elif sort_by == "title":
-            videos.sort(key=lambda v: v.title, reverse=reverse)
-        elif sort_by == "duration":
-            videos.sort(key=lambda v: v.duration, reverse=reverse)
+        if sort_by in _SORT_FIELDS:
+            key = attrgetter(sort_by)
+            if limit is not None and limit > 0:
+                # Only the first offset + limit videos are returned, so select
+                # them with a heap instead of sorting everything. Like sort(),
+                # nlargest/nsmallest keep equal videos in their original order.
+                select = heapq.nlargest if reverse else heapq.nsmallest
+                videos = select(max(offset or 0, 0) + limit, videos, key=key)
+            else:
+                videos = sorted(videos, key=key, reverse=reverse)
+        else:
+            videos = list(videos)
 
         # Apply pagination
         if offset is not None and offset > 0:
@@ -213,6 +370,170 @@ class FileSystemVideoRepo(VideoRepo):
 
         return videos
 
+    def _iter_video_ids(self, videos_dir: str) -> Iterator[str]:
+        """
+        Iterate over the IDs of the video directories
+
+        Args:
+            videos_dir: Directory containing all videos
+
+        Yields:
+            Video IDs
+        """
+        with os.scandir(videos_dir) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    yield entry.name
+
+    def _iter_videos(self, dirs: Dict[str, str]) -> Iterator[Video]:
+        """
+        Iterate over the videos of a channel, loading each one on demand
+
+        This resolves the videos directly rather than through get_by_id, so
+        the channel metadata files are read once instead of per video.
+
+        Args:
+            dirs: Directory structure from setup_directory_structure
+
+        Yields:
+            Video objects
+        """
+        videos_dir = dirs["videos_dir"]
+        video_ids = list(self._iter_video_ids(videos_dir))
+        channel_index = None
+
+        for video_id, video in zip(video_ids, self._load_videos(videos_dir, video_ids)):
+            if video is not None:
+                yield video
+                continue
+
+            # No metadata.json, fall back to the channel metadata
+            if channel_index is None:
+                channel_index = self._load_channel_index(dirs["metadata_dir"])
+            video_data = channel_index.get(video_id)
+            if video_data is not None:
+                yield self._video_from_channel_data(video_id, video_data)
+            else:
+                print(f"  Failed to load video {video_id}")
+
+    def _load_videos(
+        self, videos_dir: str, video_ids: List[str]
+    ) -> Iterator[Optional[Video]]:
+        """
+        Load the metadata.json of each video, overlapping the reads in threads
+
+        Args:
+            videos_dir: Directory containing all videos
+            video_ids: IDs of the videos to load
+
+        Yields:
+            Video object, or None if the video has no metadata.json, in the
+            order of video_ids
+        """
+        if self.load_workers <= 1 or len(video_ids) < _MIN_PARALLEL_LOADS:
+            for video_id in video_ids:
+                yield self._load_video_metadata(videos_dir, video_id)
+            return
+
+        # Submit in batches so that only a bounded number of loaded videos
+        # wait for the consumer at any time
+        batch_size = self.load_workers * 4
+        with ThreadPoolExecutor(max_workers=self.load_workers) as executor:
+            for start in range(0, len(video_ids), batch_size):
+                batch = video_ids[start : start + batch_size]
+                yield from executor.map(
+                    lambda video_id: self._load_video_metadata(videos_dir, video_id),
+                    batch,
+                )
+
+    def aggregate_stats(self, channel_title: str) -> Dict[str, int]:
+        """
+        Count the videos of a channel by their state on the platforms
+
+        Unlike list(), this reuses what each video contributed last time
+        while its metadata.json is unchanged, so counting an unchanged
+        channel takes a stat per video and no parsing.
+
+        Args:
+            channel_title: Title of the channel
+
+        Returns:
+            Dictionary with total_with_metadata, total_downloaded,
+            total_uploaded_nm, total_posted_nostr, total_with_npubs and
+            total_npubs
+        """
+        dirs = self._dirs(channel_title)
+        videos_dir = dirs["videos_dir"]
+
+        # Check if the videos directory exists
+        if not os.path.exists(videos_dir):
+            return _sum_stats([])
+
+        rows = []
+        channel_index = None
+        for video_id in self._iter_video_ids(videos_dir):
+            row = self._load_video_stats(videos_dir, video_id)
+            if row is None:
+                # No metadata.json, fall back to the channel metadata
+                if channel_index is None:
+                    channel_index = self._load_channel_index(dirs["metadata_dir"])
+                video_data = channel_index.get(video_id)
+                if video_data is None:
+                    continue
+                row = _video_stats(self._video_from_channel_data(video_id, video_data))
+            rows.append(row)
+
+        return _sum_stats(rows)
+
+    def _load_video_stats(
+        self, videos_dir: str, video_id: str
+    ) -> Optional[Tuple[int, int, int, int, int]]:
+        """
+        Count what a video contributes to the statistics, from its metadata.json
+
+        Args:
+            videos_dir: Directory containing all videos
+            video_id: ID of the video
+
+        Returns:
+            Tuple returned by _video_stats, or None if the video has no
+            metadata.json
+        """
+        metadata_file = os.path.join(
+            get_video_dir(videos_dir, video_id), "metadata.json"
+        )
+        try:
+            stat = os.stat(metadata_file)
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+
+        signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        row = _video_stats_cache.get(metadata_file, signature)
+        if row is None:
+            row = _video_stats(Video.from_dict(load_json_file(metadata_file)))
+            _video_stats_cache.put(metadata_file, signature, row)
+
+        return row
+
+    def _load_video_metadata(self, videos_dir: str, video_id: str) -> Optional[Video]:
+        """
+        Load a video from its metadata.json
+
+        Args:
+            videos_dir: Directory containing all videos
+            video_id: ID of the video
+
+        Returns:
+            Video object, or None if the video has no metadata.json
+        """
+        # This is False as well if the video directory itself doesn't exist
+        metadata_file = os.path.join(
+            get_video_dir(videos_dir, video_id), "metadata.json"
+        )
+        if not os.path.exists(metadata_file):
+            return None
+        return Video.from_dict(load_json_file(metadata_file))
+
     def save(self, video: Video, channel_title: str) -> bool:
         """
         Save a video
@@ -225,7 +546,7 @@ class FileSystemVideoRepo(VideoRepo):
             True if successful, False otherwise
         """
         try:
-            dirs = setup_directory_structure(self.base_dir, channel_title)
+            dirs = self._dirs(channel_title)
             video_dir = get_video_dir(dirs["videos_dir"], video.video_id)
 
             # Create the video directory if it doesn't exist
@@ -240,6 +561,20 @@ class FileSystemVideoRepo(VideoRepo):
             print(f"Error saving video: {e}")
             return False
 
+    def save_many(self, videos: List[Video], channel_title: str) -> int:
+        """
+        Save several videos, flushing them to disk together at the end
+
+        Args:
+            videos: Video objects to save
+            channel_title: Title of the channel
+
+        Returns:
+            Number of videos saved successfully
+        """
+        with batch_write():
+            return sum(self.save(video, channel_title) for video in videos)
+
     def delete(self, video_id: str, channel_title: str) -> bool:
         """
         Delete a video
@@ -252,19 +587,55 @@ class FileSystemVideoRepo(VideoRepo):
             True if successful, False otherwise
         """
         try:
-            dirs = setup_directory_structure(self.base_dir, channel_title)
+            dirs = self._dirs(channel_title)
             video_dir = get_video_dir(dirs["videos_dir"], video_id)
 
-            # Check if the video directory exists
-            if not os.path.exists(video_dir):
-                return False
-
             # Delete the video directory
-            import shutil
-
-            shutil.rmtree(video_dir)
+            _fast_rmtree(video_dir)
 
             return True
+        except FileNotFoundError:
+            # The video directory doesn't exist
+            return False
         except Exception as e:
             print(f"Error deleting video: {e}")
             return False
+
+
+def _fast_rmtree(path: str) -> None:
+    """
+    Delete a directory tree
+
+    Video directories only hold a few files and platform subdirectories,
+    so one scandir pass per directory is enough to tell files from
+    directories without further stat calls. Symlinks are removed, not
+    followed.
+
+    Args:
+        path: Directory to delete
+
+    Raises:
+        FileNotFoundError: If the directory doesn't exist
+    """
+    # Directories are removed after their content, in reverse discovery order
+    directories = [path]
+    pending = [path]
+    while pending:
+        with os.scandir(pending.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    directories.append(entry.path)
+                    pending.append(entry.path)
+                    continue
+                try:
+                    os.unlink(entry.path)
+                except FileNotFoundError:
+                    # Already removed by someone else
+                    pass
+
+    for directory in reversed(directories):
+        try:
+            os.rmdir(directory)
+        except FileNotFoundError:
+            if directory == path:
+                raise
@@ -2,11 +2,114 @@
 Configuration service for nosvid
 """
 
+import json
 import os
-from typing import Any, Dict, Optional
+import tempfile
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple
 
 import yaml
 
+from ..utils.config import SAFE_DUMPER, clear_config_cache, load_config, unfreeze_config
+
+# Marks a missing key in get(), where None is a valid value
+_MISSING = object()
+
+# Types of the nested dictionaries: frozen ones from the shared config cache
+# and plain ones that set() created
+_DICT_TYPES = (dict, MappingProxyType)
+
+# Paths of the keys read by the fixed accessors
+_OUTPUT_DIR_PATH = ("defaults", "output_dir")
+_CHANNEL_TITLE_PATH = ("channel", "title")
+
+
+@lru_cache(maxsize=256)
+def _split_key(key: str) -> Tuple[str, ...]:
+    """
+    Split a dot-separated configuration key into its path
+
+    Args:
+        key: Configuration key
+
+    Returns:
+        Tuple of the nested keys
+    """
+    return tuple(key.split("."))
+
+
+def _flatten(config: Mapping[str, Any]) -> Dict[str, Any]:
+    """
+    Map every dot-separated key of a configuration to its value
+
+    Nested dictionaries are included as well, so that their keys map to
+    the whole subtree. Keys that aren't strings or contain a dot can't be
+    looked up with a dot-separated key and are left out.
+
+    Args:
+        config: Configuration dictionary
+
+    Returns:
+        Dictionary mapping dot-separated keys to values
+    """
+    flat = {}
+    pending = [("", config)]
+    while pending:
+        prefix, node = pending.pop()
+        for k, value in node.items():
+            if type(k) is not str or "." in k:
+                continue
+            key = prefix + k
+            flat[key] = value
+            if type(value) in _DICT_TYPES:
+                pending.append((key + ".", value))
+    return flat
+
+
+def _is_json_safe(value: Any) -> bool:
+    """
+    Check if a configuration value reads back the same from JSON as YAML
+
+    Args:
+        value: Configuration value
+
+    Returns:
+        True if the value can be written as JSON
+    """
+    if value is None or type(value) in (str, bool, int):
+        return True
+    if type(value) is float:
+        # PyYAML implements YAML 1.1, which reads exponents without a dot
+        # ("1e+20") as strings and has no JSON spelling for inf and nan
+        text = repr(value)
+        return "." in text and "e" not in text
+    if type(value) in _DICT_TYPES:
+        # JSON would turn other keys into strings
+        return all(type(k) is str and _is_json_safe(v) for k, v in value.items())
+    if type(value) in (list, tuple):
+        return all(_is_json_safe(v) for v in value)
+    return False
+
+
+def _dump_config(config: Mapping[str, Any]) -> str:
+    """
+    Serialize a configuration for config.yaml
+
+    JSON is a subset of YAML and the json module is far faster than the
+    YAML emitter, so plain configurations are written as indented JSON.
+
+    Args:
+        config: Configuration
+
+    Returns:
+        Configuration file content
+    """
+    config = unfreeze_config(config)
+    if _is_json_safe(config):
+        return json.dumps(config, indent=2, ensure_ascii=False, sort_keys=True) + "\n"
+    return yaml.dump(config, Dumper=SAFE_DUMPER, default_flow_style=False)
+
 
 class ConfigService:
     """
@@ -21,19 +124,44 @@ class ConfigService:
             config_file: Path to the configuration file
         """
         self.config_file = config_file
-        self.config = self._load_config()
+        # Loaded on first use, see the config property
+        self._config: Optional[Dict[str, Any]] = None
+        # Every dotted key of the config mapped to its value, built on the
+        # first get() and dropped by set()
+        self._flat: Optional[Dict[str, Any]] = None
+        # Whether the config was set() or assigned since it was loaded or
+        # saved
+        self._dirty = False
+
+    @property
+    def config(self) -> Mapping[str, Any]:
+        """
+        Configuration, loaded from the file on first access
+
+        The loaded configuration is the frozen one shared through the config
+        cache. set() copies the dictionaries along the path it writes to.
+        """
+        if self._config is None:
+            self._config = self._load_config()
+        return self._config
+
+    @config.setter
+    def config(self, config: Mapping[str, Any]) -> None:
+        self._config = config
+        self._flat = None
+        self._dirty = True
 
-    def _load_config(self) -> Dict[str, Any]:
+    def _load_config(self) -> Mapping[str, Any]:
         """
         Load configuration from file
 
         Returns:
-            Configuration dictionary
+            Frozen configuration
         """
-        if os.path.exists(self.config_file):
-            with open(self.config_file, "r") as f:
-                return yaml.safe_load(f) or {}
-        return {}
+        # load_config caches the parsed file while it is unchanged, so
+        # creating a service per request doesn't parse the YAML every time.
+        # The shared config is frozen, so no copy is needed either.
+        return load_config(self.config_file, shared=True) or MappingProxyType({})
 
     def get(self, key: str, default: Any = None) -> Any:
         """
@@ -46,15 +174,40 @@ class ConfigService:
         Returns:
             Configuration value
         """
-        keys = key.split(".")
-        value = self.config
+        if "." not in key:
+            # A top-level key needs neither a walk nor the flat index
+            value = self.config.get(key, _MISSING)
+        else:
+            flat = self._flat
+            if flat is None:
+                flat = self._flat = _flatten(self.config)
+            value = flat.get(key, _MISSING)
 
-        for k in keys:
-            if isinstance(value, dict) and k in value:
-                value = value[k]
-            else:
-                return default
+        if value is _MISSING:
+            return default
+        if isinstance(value, (dict, MappingProxyType, list, tuple)):
+            # Hand out a plain, modifiable copy of the frozen subtree
+            return unfreeze_config(value)
+        return value
+
+    def _get_path(self, path: Tuple[str, ...], default: Any = None) -> Any:
+        """
+        Get the configuration value at a path of nested keys
+
+        Args:
+            path: Nested keys leading to the value
+            default: Default value if the path is not found
 
+        Returns:
+            Configuration value
+        """
+        value = self.config
+        for k in path:
+            if type(value) not in _DICT_TYPES:
+                return default
+            value = value.get(k, _MISSING)
+            if value is _MISSING:
+                return default
         return value
 
     def set(self, key: str, value: Any) -> None:
@@ -65,30 +218,69 @@ class ConfigService:
             key: Configuration key (dot-separated for nested keys)
             value: Configuration value
         """
-        keys = key.split(".")
-        config = self.config
+        keys = _split_key(key)
 
-        # Handle simple case
-        if len(keys) == 1:
-            config[keys[0]] = value
-            return
+        # Copy on write: the dictionaries along the path are copied once,
+        # the rest of the config stays shared
+        config = self.config
+        if type(config) is not dict:
+            config = dict(config)
+        # Marks the config as changed
+        self.config = config
 
-        # Handle nested case
         for k in keys[:-1]:
-            if k not in config:
-                config[k] = {}
-            elif not isinstance(config[k], dict):
-                config[k] = {}
-            config = config[k]
+            child = config.get(k)
+            if type(child) is MappingProxyType:
+                child = dict(child)
+            elif type(child) is not dict:
+                child = {}
+            config[k] = child
+            config = child
 
         config[keys[-1]] = value
 
     def save(self) -> None:
         """
         Save configuration to file
+
+        Nothing is written if the configuration hasn't changed since it was
+        loaded or last saved, so callers can set() several values and save
+        once. The file is replaced atomically.
         """
-        with open(self.config_file, "w") as f:
-            yaml.dump(self.config, f, default_flow_style=False)
+        if not self._dirty:
+            return
+
+        text = _dump_config(self.config)
+        # A unique temporary file, so concurrent saves don't write into
+        # each other's
+        fd, tmp_file = tempfile.mkstemp(
+            dir=os.path.dirname(self.config_file) or ".",
+            prefix=os.path.basename(self.config_file) + ".",
+            suffix=".tmp",
+        )
+        try:
+            # mkstemp creates the file readable by the owner only, keep the
+            # permissions of the file being replaced instead
+            try:
+                mode = os.stat(self.config_file).st_mode & 0o777
+            except FileNotFoundError:
+                mode = 0o644
+            os.fchmod(fd, mode)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(text)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.config_file)
+        except Exception:
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
+            raise
+
+        self._dirty = False
+        clear_config_cache(self.config_file)
+
+    # Saving is a no-op unless something changed, so flushing is the same
+    flush = save
 
     def get_api_key(self, service: str) -> Optional[str]:
         """
@@ -100,7 +292,7 @@ class ConfigService:
         Returns:
             API key or None if not found
         """
-        return self.get(f"{service}.api_key")
+        return self._get_path((service, "api_key"))
 
     def get_nostr_key(self, key_type: str) -> Optional[str]:
         """
@@ -112,7 +304,7 @@ class ConfigService:
         Returns:
             Nostr key or None if not found
         """
-        return self.get(f"nostr.{key_type}")
+        return self._get_path(("nostr", key_type))
 
     def get_output_dir(self) -> str:
         """
@@ -121,7 +313,7 @@ class ConfigService:
         Returns:
             Output directory
         """
-        output_dir = self.get("defaults.output_dir")
+        output_dir = self._get_path(_OUTPUT_DIR_PATH)
         if output_dir is None:
             return "./repository"
         return output_dir
@@ -133,7 +325,7 @@ class ConfigService:
         Returns:
             Channel title
         """
-        channel_title = self.get("channel.title")
+        channel_title = self._get_path(_CHANNEL_TITLE_PATH)
         if channel_title is None:
             return "Einundzwanzig"
         return channel_title
@@ -4,9 +4,41 @@ Platform service for nosvid
 This service manages platform activation and provides methods to check if a platform is activated.
 """
 
-from typing import Dict, Optional
+import importlib
+import sys
+from functools import lru_cache
+from typing import Callable, Dict, Mapping, Optional
 
-from ..utils.config import load_config
+from ..utils.config import load_config, unfreeze_config
+
+# Modules with a platform-specific activation check, by platform name
+_PLATFORM_MODULES = {
+    "youtube": "..platforms.youtube",
+    "nostrmedia": "..platforms.nostrmedia",
+    "nostr": "..platforms.nostr",
+}
+
+
+@lru_cache(maxsize=None)
+def _get_checker(platform_name: str) -> Optional[Callable[[], None]]:
+    """
+    Get the activation check of a platform, importing its module once
+
+    Args:
+        platform_name: Name of the platform
+
+    Returns:
+        The platform's check_platform_activated function, or None if the
+        platform has no module or it can't be imported
+    """
+    module_name = _PLATFORM_MODULES.get(platform_name)
+    if module_name is None:
+        return None
+    try:
+        module = importlib.import_module(module_name, __package__)
+    except ImportError:
+        return None
+    return module.check_platform_activated
 
 
 class PlatformService:
@@ -21,7 +53,20 @@ class PlatformService:
         Args:
             config: Configuration dictionary (optional, will load from config.yaml if not provided)
         """
-        self.config = config or load_config()
+        # The service only reads the config, so share the cached, frozen
+        # parse of config.yaml instead of copying it for every instance
+        self.config = config or load_config(shared=True) or {}
+        # The config doesn't change during the service's lifetime, so resolve
+        # the activated platforms once. The names are interned like the
+        # platform name literals callers pass in, so lookups match on identity
+        # instead of comparing characters.
+        self._active = frozenset(
+            sys.intern(name)
+            for name, platform_config in self.config.items()
+            if isinstance(name, str)
+            and isinstance(platform_config, Mapping)
+            and platform_config.get("activated", False)
+        )
 
     def is_platform_activated(self, platform_name: str) -> bool:
         """
@@ -33,16 +78,7 @@ class PlatformService:
         Returns:
             True if the platform is activated, False otherwise
         """
-        # Check if the platform section exists in the config
-        if platform_name not in self.config:
-            return False
-
-        # Check if the platform has an 'activated' key
-        if "activated" not in self.config[platform_name]:
-            return False
-
-        # Return the activation status
-        return self.config[platform_name]["activated"]
+        return platform_name in self._active
 
     def check_platform_activated(self, platform_name: str) -> None:
         """
@@ -54,24 +90,18 @@ class PlatformService:
         Raises:
             ValueError: If the platform is not activated
         """
-        # Import the appropriate platform module based on the platform name
-        if platform_name == "youtube":
-            from ..platforms.youtube import check_platform_activated
-        elif platform_name == "nostrmedia":
-            from ..platforms.nostrmedia import check_platform_activated
-        elif platform_name == "nostr":
-            from ..platforms.nostr import check_platform_activated
-        else:
-            # For unknown platforms, use the default check
-            if not self.is_platform_activated(platform_name):
-                raise ValueError(
-                    f"Platform '{platform_name}' is not activated. "
-                    f"Please activate it in your config.yaml file by setting {platform_name}.activated = true"
-                )
+        # Use the platform-specific check if there is one
+        platform_check = _get_checker(platform_name)
+        if platform_check is not None:
+            platform_check()
             return
 
-        # Call the platform-specific check
-        check_platform_activated()
+        # For unknown platforms, use the default check
+        if not self.is_platform_activated(platform_name):
+            raise ValueError(
+                f"Platform '{platform_name}' is not activated. "
+                f"Please activate it in your config.yaml file by setting {platform_name}.activated = true"
+            )
 
     def get_platform_config(self, platform_name: str) -> Dict:
         """
@@ -86,5 +116,5 @@ class PlatformService:
         # Check if the platform is activated
         self.check_platform_activated(platform_name)
 
-        # Return the platform configuration
-        return self.config.get(platform_name, {})
+        # Return a modifiable copy, the shared config is frozen
+        return unfreeze_config(self.config.get(platform_name, {}))
@@ -2,19 +2,25 @@
 Scheduler service for nosvid with hardcoded scheduled tasks
 """
 
+import heapq
+import itertools
 import logging
 import os
 import os.path
-from datetime import datetime
-from typing import Any, Dict, List, Optional
+import re
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Union
 
-from apscheduler.jobstores.memory import MemoryJobStore
-from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
 
 from ..download.video import download_video
 
 # Import the functions we want to call directly
+from ..metadata.list import list_videos
 from ..metadata.sync import sync_metadata
 from ..nostr.upload import post_to_nostr
 from ..nostrmedia.upload import upload_to_nostrmedia
@@ -25,6 +31,7 @@ from ..utils.config import (
     get_youtube_api_key,
     load_config,
 )
+from ..utils.filesystem import load_json_file, save_json_file
 
 # We're using list_videos instead of these helper functions
 # from ..utils.find_oldest import find_oldest_video_without_download, find_oldest_video_without_nostr_post, find_oldest_video_without_nostrmedia
@@ -33,34 +40,664 @@ from ..utils.config import (
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# How long a scan of the videos directory is shared between jobs, in seconds
+_SCAN_MAX_AGE = 60
 
-class SchedulerService:
+# Thread pools of the scheduler and their sizes: "default" for the quick
+# sync jobs, "io_heavy" for downloads and uploads, which take minutes and
+# shouldn't hold up the others
+_EXECUTORS = {"default": 4, "io_heavy": 2}
+
+# Seconds a job may start late before its run is skipped
+_MISFIRE_GRACE_TIME = 60
+
+# Number of videos the download jobs download at the same time.
+# Downloads mostly wait on the network, but YouTube throttles clients that
+# open too many connections.
+_DOWNLOAD_WORKERS = 3
+
+
+def _ceil_to_minute(moment: datetime) -> datetime:
     """
-    Service for managing hardcoded scheduled jobs
+    Round a time up to a whole minute
+
+    Args:
+        moment: Time to round
+
+    Returns:
+        The time itself if it is a whole minute, the next minute otherwise
+    """
+    minute = moment.replace(second=0, microsecond=0)
+    if minute < moment:
+        minute += timedelta(minutes=1)
+    return minute
+
+
+def _next_every_n_minutes(start: datetime, n: int) -> datetime:
+    """
+    Get the first run of a "*/n * * * *" schedule at or after a time
+
+    Args:
+        start: Local time, a whole minute
+        n: Interval in minutes, a divisor of 60
+
+    Returns:
+        Local time of the run
+    """
+    return start + timedelta(minutes=-start.minute % n)
+
+
+def _next_hourly(start: datetime, minute: int) -> datetime:
+    """
+    Get the first run of a "minute * * * *" schedule at or after a time
+
+    Args:
+        start: Local time, a whole minute
+        minute: Minute of the hour
+
+    Returns:
+        Local time of the run
+    """
+    run = start.replace(minute=minute)
+    if run < start:
+        run += timedelta(hours=1)
+    return run
+
+
+def _next_daily_at(start: datetime, minute: int, hour: int) -> datetime:
     """
+    Get the first run of a "minute hour * * *" schedule at or after a time
 
-    _instance = None
+    Args:
+        start: Local time, a whole minute
+        minute: Minute of the hour
+        hour: Hour of the day
 
-    def __new__(cls):
+    Returns:
+        Local time of the run
+    """
+    run = start.replace(hour=hour, minute=minute)
+    if run < start:
+        run += timedelta(days=1)
+    return run
+
+
+def _next_weekly_at(
+    start: datetime, minute: int, hour: int, day_of_week: int
+) -> datetime:
+    """
+    Get the first run of a "minute hour * * day_of_week" schedule at or
+    after a time
+
+    Args:
+        start: Local time, a whole minute
+        minute: Minute of the hour
+        hour: Hour of the day
+        day_of_week: Day of the week, 0 is Monday
+
+    Returns:
+        Local time of the run
+    """
+    days = (day_of_week - start.weekday()) % 7
+    run = start.replace(hour=hour, minute=minute) + timedelta(days=days)
+    if run < start:
+        run += timedelta(days=7)
+    return run
+
+
+# Crontab expressions simple enough for SimpleCronTrigger: pattern, function
+# computing the next run from the captured fields, and the upper bound of
+# each field. Days of the week are numbered like CronTrigger.from_crontab
+# does, which counts from Monday = 0 unlike crontab.
+_SIMPLE_SCHEDULES = (
+    (re.compile(r"\*/(\d+) \* \* \* \*"), _next_every_n_minutes, (60,)),
+    (re.compile(r"(\d+) \* \* \* \*"), _next_hourly, (59,)),
+    (re.compile(r"(\d+) (\d+) \* \* \*"), _next_daily_at, (59, 23)),
+    (re.compile(r"(\d+) (\d+) \* \* (\d)"), _next_weekly_at, (59, 23, 6)),
+)
+
+
+class SimpleCronTrigger:
+    """
+    Trigger for crontab schedules that run every n minutes, hourly, daily
+    or weekly
+
+    The next run time is computed with a few datetime operations, instead
+    of CronTrigger's search field by field. The CronTrigger of the same
+    expression provides the timezone, and computes the runs across daylight
+    saving time changes, which wall clock arithmetic gets wrong.
+    """
+
+    __slots__ = ("cron", "next_run", "fields")
+
+    def __init__(
+        self,
+        cron: CronTrigger,
+        next_run: Callable[..., datetime],
+        fields: tuple,
+    ):
+        """
+        Initialize the trigger
+
+        Args:
+            cron: CronTrigger of the same expression
+            next_run: Function computing the next run from a local time
+            fields: Values of the crontab fields passed to next_run
         """
-        Singleton pattern to ensure only one scheduler instance
+        self.cron = cron
+        self.next_run = next_run
+        self.fields = fields
+
+    @classmethod
+    def from_crontab(
+        cls, cron_expression: str
+    ) -> Union["SimpleCronTrigger", CronTrigger]:
         """
-        if cls._instance is None:
-            cls._instance = super(SchedulerService, cls).__new__(cls)
-            cls._instance._initialized = False
-        return cls._instance
+        Create a trigger from a crontab expression
 
-    def __init__(self):
+        Args:
+            cron_expression: Crontab expression, e.g. "*/5 * * * *"
+
+        Returns:
+            SimpleCronTrigger, or a CronTrigger for other expressions
         """
-        Initialize the scheduler service
+        cron = CronTrigger.from_crontab(cron_expression)
+        for pattern, next_run, bounds in _SIMPLE_SCHEDULES:
+            match = pattern.fullmatch(cron_expression.strip())
+            if match is None:
+                continue
+            fields = tuple(int(value) for value in match.groups())
+            if any(value > bound for value, bound in zip(fields, bounds)):
+                break
+            if next_run is _next_every_n_minutes and (fields[0] == 0 or 60 % fields[0]):
+                break
+            return cls(cron, next_run, fields)
+        return cron
+
+    @property
+    def timezone(self):
         """
-        if self._initialized:
+        Timezone of the schedule
+        """
+        return self.cron.timezone
+
+    def get_next_fire_time(
+        self, previous_fire_time: Optional[datetime], now: datetime
+    ) -> Optional[datetime]:
+        """
+        Get the next run time, like CronTrigger.get_next_fire_time
+
+        Args:
+            previous_fire_time: Previous run time, if any
+            now: Current time
+
+        Returns:
+            Next run time in the timezone of the schedule
+        """
+        start = now
+        if previous_fire_time is not None:
+            # Added in UTC: aware arithmetic in a zoneinfo timezone works on
+            # the wall clock and drops fold, moving a time in the repeated
+            # hour of a daylight saving time change back by an hour
+            start = min(
+                now,
+                previous_fire_time.astimezone(timezone.utc) + timedelta(microseconds=1),
+            )
+        start = start.astimezone(self.cron.timezone)
+        if start.fold:
+            # The wall clock arithmetic below drops fold as well
+            return self.cron.get_next_fire_time(previous_fire_time, now)
+        run = self.next_run(_ceil_to_minute(start), *self.fields)
+
+        # Wall clock arithmetic is only right if the UTC offset stays the same
+        # and the run isn't skipped by a daylight saving time change
+        offset = start.utcoffset()
+        if (
+            run.utcoffset() != offset
+            or run.astimezone(timezone.utc).astimezone(run.tzinfo).utcoffset() != offset
+        ):
+            return self.cron.get_next_fire_time(previous_fire_time, now)
+        return run
+
+
+# Parsed cron expressions. The job schedules are fixed and several jobs share
+# one, and triggers hold no per-job state, so each expression is parsed once.
+_TRIGGERS: Dict[str, Union[SimpleCronTrigger, CronTrigger]] = {}
+
+
+def _trigger(cron_expression: str) -> Union[SimpleCronTrigger, CronTrigger]:
+    """
+    Get the trigger for a crontab expression
+
+    Args:
+        cron_expression: Crontab expression, e.g. "*/5 * * * *"
+
+    Returns:
+        Trigger for the expression
+    """
+    trigger = _TRIGGERS.get(cron_expression)
+    if trigger is None:
+        trigger = _TRIGGERS[cron_expression] = SimpleCronTrigger.from_crontab(
+            cron_expression
+        )
+    return trigger
+
+
+# A hardcoded job: its ID, crontab schedule, name of the SchedulerService
+# method that runs it, the CLI command and arguments it corresponds to,
+# whether it runs as a phase of the five-minute tick, and the scheduler
+# executor it runs in
+JobSpec = namedtuple(
+    "JobSpec",
+    "id cron handler command args description tick executor",
+    defaults=(False, "default"),
+)
+
+# The jobs that run every five minutes are one scheduler job, which runs them
+# one after the other, so they share a wakeup and the scan of the videos
+_TICK_JOB_ID = "five_minute_tick"
+_TICK_CRON = "*/5 * * * *"
+
+JOB_SPECS = (
+    JobSpec(
+        "hourly_sync",
+        "0 * * * *",  # Every hour at minute 0
+        "_run_sync_job",
+        "sync",
+        ("--force-refresh", "--max-videos", "5"),
+        "Sync metadata for new videos every hour",
+    ),
+    JobSpec(
+        "regular_sync",
+        "*/5 * * * *",  # Every 5 minutes
+        "_run_regular_sync_job",
+        "sync",
+        ("--max-videos", "10"),
+        "Sync metadata for new videos every 5 minutes",
+        tick=True,
+    ),
+    JobSpec(
+        "daily_download",
+        "0 2 * * *",  # Every day at 2 AM
+        "_run_download_job",
+        "download",
+        ("--oldest",),
+        "Download the oldest pending video every day",
+        executor="io_heavy",
+    ),
+    JobSpec(
+        "regular_download",
+        "*/5 * * * *",  # Every 5 minutes
+        "_run_regular_download_job",
+        "download",
+        ("--max-videos", "5"),
+        "Download 5 pending videos every 5 minutes",
+        tick=True,
+        executor="io_heavy",
+    ),
+    JobSpec(
+        "weekly_nostr",
+        "0 3 * * 0",  # Every Sunday at 3 AM
+        "_run_nostr_job",
+        "nostr",
+        ("--oldest",),
+        "Post the oldest pending video to Nostr every week",
+    ),
+    JobSpec(
+        "regular_nostrmedia",
+        "*/5 * * * *",  # Every 5 minutes
+        "_run_regular_nostrmedia_job",
+        "nostrmedia",
+        ("--oldest",),
+        "Upload pending videos to nostrmedia every 5 minutes",
+        tick=True,
+        executor="io_heavy",
+    ),
+)
+
+_JOB_SPECS_BY_ID = {spec.id: spec for spec in JOB_SPECS}
+
+
+def _scheduler_job_id(job_id: str) -> str:
+    """
+    Get the ID of the scheduler job that runs a job
+
+    Args:
+        job_id: ID of the job
+
+    Returns:
+        ID of the job itself, or of the five-minute tick for its phases
+    """
+    spec = _JOB_SPECS_BY_ID.get(job_id)
+    if spec is not None and spec.tick:
+        return _TICK_JOB_ID
+    return job_id
+
+
+# IDs of the jobs each scheduler job runs
+_JOB_IDS_BY_SCHEDULER_JOB: Dict[str, List[str]] = {}
+for _spec in JOB_SPECS:
+    _JOB_IDS_BY_SCHEDULER_JOB.setdefault(_scheduler_job_id(_spec.id), []).append(
+        _spec.id
+    )
+del _spec
+
+
+class ScheduledJob:
+    """
+    A job of the JobScheduler
+    """
+
+    __slots__ = ("id", "func", "trigger", "executor", "next_run_time", "running")
+
+    def __init__(
+        self, job_id: str, func: Callable[[], Any], trigger: Any, executor: str
+    ):
+        """
+        Initialize the job
+
+        Args:
+            job_id: ID of the job
+            func: Function to run
+            trigger: Trigger that determines when the job runs
+            executor: Name of the executor the job runs in
+        """
+        self.id = job_id
+        self.func = func
+        self.trigger = trigger
+        self.executor = executor
+        # None while the job is paused
+        self.next_run_time: Optional[datetime] = None
+        self.running = False
+
+
+class JobScheduler:
+    """
+    Runs a handful of cron jobs in a background thread
+
+    The jobs are kept in a heap ordered by their next run time, so the
+    thread sleeps until the earliest one is due and wakes up only to run
+    jobs or when the jobs change. A job that is still running when it is
+    due again is skipped, and missed runs are coalesced into the next one,
+    like APScheduler's coalesce=True and max_instances=1. A run that comes
+    up more than misfire_grace_time seconds late, e.g. after the machine
+    was suspended, is skipped as well.
+    """
+
+    def __init__(
+        self,
+        executors: Optional[Dict[str, int]] = None,
+        misfire_grace_time: Optional[float] = _MISFIRE_GRACE_TIME,
+    ):
+        """
+        Initialize the scheduler
+
+        Args:
+            executors: Names of the thread pools the jobs run in, mapped to
+                their number of threads; there must be a "default" one
+            misfire_grace_time: Seconds a run may be late, None for no limit
+        """
+        self.executors = dict(_EXECUTORS if executors is None else executors)
+        self.misfire_grace_time = misfire_grace_time
+        self.running = False
+        self._jobs: Dict[str, ScheduledJob] = {}
+        # (timestamp, sequence number, job); entries of jobs that were
+        # paused, rescheduled or replaced are skipped when they come up
+        self._heap = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._thread = None
+        self._executors: Dict[str, ThreadPoolExecutor] = {}
+        self._listeners: List[Callable[[ScheduledJob], Any]] = []
+
+    def start(self):
+        """
+        Start running the jobs in a background thread
+        """
+        with self._condition:
+            if self.running:
+                return
+            self.running = True
+            self._executors = {
+                name: ThreadPoolExecutor(
+                    max_workers=size, thread_name_prefix=f"nosvid-{name}"
+                )
+                for name, size in self.executors.items()
+            }
+            self._thread = threading.Thread(
+                target=self._run, name="nosvid-scheduler", daemon=True
+            )
+            self._thread.start()
+
+    def shutdown(self, wait: bool = True):
+        """
+        Stop the background thread
+
+        Args:
+            wait: Wait for running jobs to finish
+        """
+        with self._condition:
+            if not self.running:
+                return
+            self.running = False
+            self._condition.notify()
+        self._thread.join()
+        for executor in self._executors.values():
+            executor.shutdown(wait=wait)
+
+    def add_listener(self, callback: Callable[[ScheduledJob], Any]):
+        """
+        Call a function whenever a job's next run time is computed
+
+        The callback runs in the scheduler's lock, so it must be quick and
+        mustn't call back into the scheduler.
+
+        Args:
+            callback: Function called with the job
+        """
+        with self._condition:
+            self._listeners.append(callback)
+
+    def submit(self, func: Callable[[], Any], executor: str = "default") -> Future:
+        """
+        Run a function in one of the scheduler's executors
+
+        Args:
+            func: Function to run
+            executor: Name of the executor
+
+        Returns:
+            Future of the function's result
+        """
+        return self._executors[executor].submit(func)
+
+    def add_job(
+        self,
+        func: Callable[[], Any],
+        trigger: Any,
+        id: str,
+        replace_existing: bool = False,
+        executor: str = "default",
+    ) -> ScheduledJob:
+        """
+        Add a job
+
+        Args:
+            func: Function to run
+            trigger: Trigger that determines when the job runs
+            id: ID of the job
+            replace_existing: Replace a job with the same ID
+            executor: Name of the executor the job runs in
+
+        Returns:
+            The added job
+
+        Raises:
+            ValueError: If a job with the ID exists and replace_existing is
+                False
+        """
+        with self._condition:
+            if id in self._jobs and not replace_existing:
+                raise ValueError(f"Job {id} already exists")
+            if executor not in self.executors:
+                raise ValueError(f"Unknown executor {executor}")
+            job = self._jobs[id] = ScheduledJob(id, func, trigger, executor)
+            self._schedule(job)
+        return job
+
+    def get_job(self, job_id: str) -> Optional[ScheduledJob]:
+        """
+        Get a job by ID
+
+        Args:
+            job_id: ID of the job
+
+        Returns:
+            The job or None if not found
+        """
+        return self._jobs.get(job_id)
+
+    def pause_job(self, job_id: str):
+        """
+        Stop running a job until it is resumed
+
+        Args:
+            job_id: ID of the job
+
+        Raises:
+            KeyError: If the job doesn't exist
+        """
+        with self._condition:
+            self._jobs[job_id].next_run_time = None
+
+    def resume_job(self, job_id: str):
+        """
+        Run a paused job again
+
+        Args:
+            job_id: ID of the job
+
+        Raises:
+            KeyError: If the job doesn't exist
+        """
+        with self._condition:
+            job = self._jobs[job_id]
+            if job.next_run_time is None:
+                self._schedule(job)
+
+    def _schedule(self, job: ScheduledJob):
+        """
+        Compute the next run time of a job and queue it
+
+        Must be called with the condition held.
+
+        Args:
+            job: Job to schedule
+        """
+        # Without a previous run time the trigger returns the first run time
+        # after now, so runs missed while the process was busy are dropped
+        job.next_run_time = job.trigger.get_next_fire_time(
+            None, datetime.now(timezone.utc)
+        )
+        for callback in self._listeners:
+            try:
+                callback(job)
+            except Exception:
+                logger.exception(f"Error in listener for job {job.id}")
+        if job.next_run_time is None:
             return
+        heapq.heappush(
+            self._heap,
+            (job.next_run_time.timestamp(), next(self._sequence), job),
+        )
+        # The new job may be due before the one the thread is waiting for
+        self._condition.notify()
 
-        self._initialized = True
-        self.scheduler = BackgroundScheduler(
-            jobstores={"default": MemoryJobStore()}, timezone="UTC"
+    def _run(self):
+        """
+        Run due jobs until the scheduler is shut down
+        """
+        heap = self._heap
+        with self._condition:
+            while self.running:
+                # Drop the entries of paused, rescheduled and replaced jobs
+                while heap:
+                    timestamp, _, job = heap[0]
+                    if (
+                        self._jobs.get(job.id) is job
+                        and job.next_run_time is not None
+                        and job.next_run_time.timestamp() == timestamp
+                    ):
+                        break
+                    heapq.heappop(heap)
+
+                if not heap:
+                    self._condition.wait()
+                    continue
+
+                delay = heap[0][0] - time.time()
+                if delay > 0:
+                    self._condition.wait(delay)
+                    continue
+
+                job = heapq.heappop(heap)[2]
+                if (
+                    self.misfire_grace_time is not None
+                    and -delay > self.misfire_grace_time
+                ):
+                    logger.warning(
+                        f"Skipping job {job.id}, its run is {-delay:.0f}s late"
+                    )
+                elif job.running:
+                    logger.warning(f"Skipping job {job.id}, it is still running")
+                else:
+                    job.running = True
+                    self._executors[job.executor].submit(self._run_job, job)
+                self._schedule(job)
+
+    def _run_job(self, job: ScheduledJob):
+        """
+        Run a job in a worker thread
+
+        Args:
+            job: Job to run
+        """
+        try:
+            job.func()
+        except Exception:
+            logger.exception(f"Error running job {job.id}")
+        finally:
+            job.running = False
+
+
+class SchedulerService:
+    """
+    Service for managing hardcoded scheduled jobs
+
+    Use get_scheduler() to get the service shared by the process; every
+    instance starts its own scheduler.
+    """
+
+    def __init__(self):
+        """
+        Initialize the scheduler service
+        """
+        self._load_config()
+        # (time of the scan, videos), see _scan_videos
+        self._scan_cache = (0.0, None)
+        # Set by the hourly sync for the next regular sync
+        self._force_sync = False
+        # Downloads and uploads of the last tick, see _run_five_minute_tick
+        self._tick_io_future = None
+        # Shared by the download jobs, see _download_videos
+        self._download_pool = ThreadPoolExecutor(
+            max_workers=_DOWNLOAD_WORKERS, thread_name_prefix="nosvid-dl"
         )
+        # IDs of the videos being downloaded
+        self._downloading = set()
+        self._downloads_lock = threading.Lock()
+        self.scheduler = JobScheduler()
+        self.scheduler.add_listener(self._on_job_scheduled)
         self.jobs = {}
 
         # Start the scheduler
@@ -71,135 +708,202 @@ class SchedulerService:
             # Set up hardcoded jobs
             self._setup_hardcoded_jobs()
 
-    def _setup_hardcoded_jobs(self):
+    def _load_config(self):
         """
-        Set up hardcoded scheduled jobs
-        """
-        # 1. Hourly sync job with force refresh - runs every hour at minute 0
-        self._add_hourly_sync_job()
+        Look up the configuration the jobs need
 
-        # 2. Regular sync job - runs every 5 minutes
-        self._add_regular_sync_job()
+        The jobs run every few minutes for the lifetime of the process, so
+        the values and the paths derived from them are resolved once here.
+        """
+        self._channel_id = get_channel_id()
+        self._api_key = get_youtube_api_key()
+        self._quality = get_default_video_quality()
+        self._repository_dir = get_repository_dir()
+        self._channel_dir = os.path.join(self._repository_dir, "Einundzwanzig")
+        self._videos_dir = os.path.join(self._channel_dir, "videos")
+
+    def _scan_videos(self, max_age: float = _SCAN_MAX_AGE) -> List[Dict[str, Any]]:
+        """
+        List all videos of the channel, sharing recent scans between jobs
 
-        # 3. Daily download job - runs every day at 2 AM
-        self._add_daily_download_job()
+        Several jobs fire on the same minute and each needs the video list,
+        so a scan is reused for max_age seconds. Jobs that change a video
+        drop the scan with _invalidate_scan.
 
-        # 4. Regular download job - runs every 5 minutes, downloads 5 videos
-        self._add_regular_download_job()
+        Args:
+            max_age: Maximum age of a reused scan in seconds
 
-        # 5. Weekly nostr posting job - runs every Sunday at 3 AM
-        self._add_weekly_nostr_job()
+        Returns:
+            List of video dictionaries, oldest first
+        """
+        scanned_at, videos = self._scan_cache
+        now = time.monotonic()
+        if videos is None or now - scanned_at >= max_age:
+            videos, _ = list_videos(self._videos_dir)
+            self._scan_cache = (now, videos)
+        return videos
+
+    def _invalidate_scan(self):
+        """
+        Drop the shared scan of the videos directory
+        """
+        self._scan_cache = (0.0, None)
 
-        # 6. Regular nostrmedia upload job - runs every 5 minutes
-        self._add_regular_nostrmedia_job()
+    def _setup_hardcoded_jobs(self):
+        """
+        Set up hardcoded scheduled jobs
+        """
+        for spec in JOB_SPECS:
+            self._register_job(spec)
 
         # Log all scheduled jobs
         self._log_job_schedule()
 
-    def _add_hourly_sync_job(self):
-        """
-        Add hourly sync job to the scheduler
+    def _register_job(self, spec: JobSpec):
         """
-        job_id = "hourly_sync"
-        cron_expression = "0 * * * *"  # Every hour at minute 0
-        description = "Sync metadata for new videos every hour"
+        Add a job to the scheduler and record its metadata
 
+        Args:
+            spec: Specification of the job
+        """
         try:
-            # Add the job to the scheduler
-            job = self.scheduler.add_job(
-                self._run_sync_job,
-                trigger=CronTrigger.from_crontab(cron_expression),
-                id=job_id,
-                replace_existing=True,
-            )
+            if spec.tick:
+                # The phases of the tick share its scheduler job
+                job = self._add_tick_job()
+            else:
+                # Add the job to the scheduler
+                job = self.scheduler.add_job(
+                    getattr(self, spec.handler),
+                    trigger=_trigger(spec.cron),
+                    id=spec.id,
+                    replace_existing=True,
+                    executor=spec.executor,
+                )
 
             # Store job metadata
-            self.jobs[job_id] = {
-                "id": job_id,
-                "command": "sync",
-                "args": ["--force-refresh", "--max-videos", "5"],
-                "schedule": cron_expression,
+            self.jobs[spec.id] = {
+                "id": spec.id,
+                "command": spec.command,
+                "args": list(spec.args),
+                "schedule": spec.cron,
                 "enabled": True,
-                "description": description,
-                "next_run": job.next_run_time.isoformat()
-                if job.next_run_time
-                else None,
+                "description": spec.description,
+                "next_run": None,
             }
+            # The scheduler reported the next run time before the metadata
+            # existed, or, for the tick's later phases, not at all
+            self._on_job_scheduled(job)
 
-            logger.info(f"Added job {job_id} with schedule {cron_expression}")
+            logger.info(f"Added job {spec.id} with schedule {spec.cron}")
         except Exception as e:
-            logger.error(f"Error adding job {job_id}: {str(e)}")
+            logger.error(f"Error adding job {spec.id}: {str(e)}")
 
-    def _add_daily_download_job(self):
-        """
-        Add daily download job to the scheduler
+    def _add_tick_job(self):
         """
-        job_id = "daily_download"
-        cron_expression = "0 2 * * *"  # Every day at 2 AM
-        description = "Download the oldest pending video every day"
+        Add the five-minute tick to the scheduler unless it is there already
 
-        try:
-            # Add the job to the scheduler
+        Returns:
+            The scheduler job of the tick
+        """
+        job = self.scheduler.get_job(_TICK_JOB_ID)
+        if job is None:
             job = self.scheduler.add_job(
-                self._run_download_job,
-                trigger=CronTrigger.from_crontab(cron_expression),
-                id=job_id,
+                self._run_five_minute_tick,
+                trigger=_trigger(_TICK_CRON),
+                id=_TICK_JOB_ID,
                 replace_existing=True,
             )
+        return job
 
-            # Store job metadata
-            self.jobs[job_id] = {
-                "id": job_id,
-                "command": "download",
-                "args": ["--oldest"],
-                "schedule": cron_expression,
-                "enabled": True,
-                "description": description,
-                "next_run": job.next_run_time.isoformat()
-                if job.next_run_time
-                else None,
-            }
+    def _run_five_minute_tick(self):
+        """
+        Run the enabled five-minute jobs one after the other
 
-            logger.info(f"Added job {job_id} with schedule {cron_expression}")
-        except Exception as e:
-            logger.error(f"Error adding job {job_id}: {str(e)}")
+        The sync goes first so that the downloads see new videos, and the
+        downloads before the nostrmedia upload so that it sees the downloaded
+        ones. Each phase reports to its own entry in self.jobs.
+
+        The phases of the io_heavy executor are handed to it together, so
+        the tick doesn't wait for them, and a long download doesn't make the
+        scheduler skip the next ticks' syncs. They are skipped while the
+        previous tick's are still running.
+        """
+        heavy = []
+        for spec in JOB_SPECS:
+            if not spec.tick or not self.jobs.get(spec.id, {}).get("enabled"):
+                continue
+            if spec.executor == "default":
+                getattr(self, spec.handler)()
+            else:
+                heavy.append(getattr(self, spec.handler))
+
+        if not heavy:
+            return
+        if self._tick_io_future is not None and not self._tick_io_future.done():
+            logger.warning("Skipping downloads and uploads, they are still running")
+            return
+
+        def run_heavy():
+            for handler in heavy:
+                handler()
+
+        self._tick_io_future = self.scheduler.submit(run_heavy, "io_heavy")
+
+    def _on_job_scheduled(self, job: ScheduledJob):
+        """
+        Copy the next run time of a scheduler job to the jobs it runs
+
+        The scheduler calls this whenever it computes a next run time, so
+        the metadata is up to date without asking the scheduler on reads.
+
+        Args:
+            job: Scheduler job that was scheduled
+        """
+        if job.next_run_time is None:
+            return
+        next_run = job.next_run_time.isoformat()
+        for job_id in _JOB_IDS_BY_SCHEDULER_JOB.get(job.id, ()):
+            job_info = self.jobs.get(job_id)
+            if job_info is not None:
+                job_info["next_run"] = next_run
 
     def _run_sync_job(self):
         """
         Run the sync job - directly calling the sync_metadata function
+
+        While the regular sync is enabled, this only asks it to refresh the
+        video list from the API on its next run.
         """
         try:
             logger.info("Executing hourly sync job")
 
-            # Get the channel ID and other required parameters
-            channel_id = get_channel_id()
-            api_key = get_youtube_api_key()
-            repository_dir = get_repository_dir()
-
-            if not api_key:
+            if not self._api_key:
                 logger.error("No YouTube API key found in config")
                 return
 
+            if self.jobs.get("regular_sync", {}).get("enabled"):
+                # The regular sync runs every five minutes anyway, so let it
+                # do the refresh rather than syncing the channel twice
+                self._force_sync = True
+                logger.info("Hourly sync job deferred the refresh to the regular sync")
+                return
+
             # Call the sync_metadata function directly
             result = sync_metadata(
-                api_key=api_key,
-                channel_id=channel_id,
+                api_key=self._api_key,
+                channel_id=self._channel_id,
                 channel_title="Einundzwanzig",
-                output_dir=repository_dir,
+                output_dir=self._repository_dir,
                 max_videos=5,
                 force_refresh=True,
             )
 
             if result:
                 logger.info("Hourly sync job completed successfully")
+                self._invalidate_scan()
             else:
                 logger.error("Hourly sync job failed")
 
-            # Update next run time
-            job = self.scheduler.get_job("hourly_sync")
-            if job and job.next_run_time:
-                self.jobs["hourly_sync"]["next_run"] = job.next_run_time.isoformat()
-
         except Exception as e:
             logger.error(f"Error executing hourly sync job: {str(e)}")
 
@@ -210,82 +914,72 @@ class SchedulerService:
         try:
             logger.info("Executing daily download job")
 
-            # Get the channel ID and other required parameters
-            channel_id = get_channel_id()
-            repository_dir = get_repository_dir()
-
-            # Get the videos directory for this channel
-            videos_dir = os.path.join(repository_dir, "Einundzwanzig", "videos")
-
             # Find the oldest video without download
-            from ..metadata.list import list_videos
-
-            videos, _ = list_videos(
-                videos_dir, show_downloaded=False, show_not_downloaded=True
-            )
+            videos = [v for v in self._scan_videos() if not v.get("downloaded")]
 
             if not videos:
                 logger.info("No pending videos to download")
                 return
 
-            # Get the first (oldest) video
-            video = videos[0]
-            video_id = video["video_id"]
-
-            # Get the default video quality
-            quality = get_default_video_quality()
-
-            # Call the download_video function directly
-            result = download_video(
-                video_id=video_id, videos_dir=videos_dir, quality=quality
-            )
-
-            if result:
-                logger.info(f"Downloaded video {video_id} successfully")
-            else:
-                logger.error(f"Failed to download video {video_id}")
-
-            # Update next run time
-            job = self.scheduler.get_job("daily_download")
-            if job and job.next_run_time:
-                self.jobs["daily_download"]["next_run"] = job.next_run_time.isoformat()
+            # Download the first (oldest) video
+            self._download_videos([videos[0]["video_id"]])
 
         except Exception as e:
             logger.error(f"Error executing daily download job: {str(e)}")
 
-    def _add_weekly_nostr_job(self):
-        """
-        Add weekly nostr posting job to the scheduler
+    def _download_videos(self, video_ids: List[str]) -> int:
         """
-        job_id = "weekly_nostr"
-        cron_expression = "0 3 * * 0"  # Every Sunday at 3 AM
-        description = "Post the oldest pending video to Nostr every week"
+        Download videos in the shared download pool
 
-        try:
-            # Add the job to the scheduler
-            job = self.scheduler.add_job(
-                self._run_nostr_job,
-                trigger=CronTrigger.from_crontab(cron_expression),
-                id=job_id,
-                replace_existing=True,
-            )
+        All download jobs go through here, so together they never run more
+        than _DOWNLOAD_WORKERS downloads at a time, and a video that another
+        job is downloading isn't downloaded a second time.
 
-            # Store job metadata
-            self.jobs[job_id] = {
-                "id": job_id,
-                "command": "nostr",
-                "args": ["--oldest"],
-                "schedule": cron_expression,
-                "enabled": True,
-                "description": description,
-                "next_run": job.next_run_time.isoformat()
-                if job.next_run_time
-                else None,
+        Args:
+            video_ids: IDs of the videos to download
+
+        Returns:
+            Number of videos downloaded
+        """
+        with self._downloads_lock:
+            busy = [v for v in video_ids if v in self._downloading]
+            video_ids = [v for v in video_ids if v not in self._downloading]
+            self._downloading.update(video_ids)
+        for video_id in busy:
+            logger.info(f"Video {video_id} is already being downloaded")
+
+        videos_downloaded = 0
+        try:
+            # Call the download_video function directly, a few at a time
+            futures = {
+                self._download_pool.submit(
+                    download_video,
+                    video_id=video_id,
+                    videos_dir=self._videos_dir,
+                    quality=self._quality,
+                ): video_id
+                for video_id in video_ids
             }
 
-            logger.info(f"Added job {job_id} with schedule {cron_expression}")
-        except Exception as e:
-            logger.error(f"Error adding job {job_id}: {str(e)}")
+            for future in as_completed(futures):
+                video_id = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.error(f"Error downloading video {video_id}: {str(e)}")
+                    result = False
+
+                if result:
+                    logger.info(f"Downloaded video {video_id} successfully")
+                    self._invalidate_scan()
+                    videos_downloaded += 1
+                else:
+                    logger.error(f"Failed to download video {video_id}")
+        finally:
+            with self._downloads_lock:
+                self._downloading.difference_update(video_ids)
+
+        return videos_downloaded
 
     def _run_nostr_job(self):
         """
@@ -294,97 +988,42 @@ class SchedulerService:
         try:
             logger.info("Executing weekly nostr posting job")
 
-            # Get the required parameters
-            repository_dir = get_repository_dir()
-
-            # Get the videos directory for this channel
-            videos_dir = os.path.join(repository_dir, "Einundzwanzig", "videos")
-
             # Find videos that have been downloaded but not posted to Nostr
-            from ..metadata.list import list_videos
-
-            videos, _ = list_videos(videos_dir)
-
-            # Filter for videos that are downloaded but don't have Nostr posts
-            pending_videos = []
-            for video in videos:
-                if video.get("downloaded"):
-                    # Check if the video has been posted to Nostr
-                    has_nostr = False
-                    if "platforms" in video and "nostr" in video.get("platforms", {}):
-                        # Check if there are any posts in the nostr platform
-                        nostr_data = video["platforms"]["nostr"]
-                        if "posts" in nostr_data and len(nostr_data["posts"]) > 0:
-                            has_nostr = True
-                        # For backward compatibility with old metadata format
-                        elif "event_id" in nostr_data:
-                            has_nostr = True
-
-                    if not has_nostr:
-                        pending_videos.append(video)
-
-            if not pending_videos:
+            videos = self._scan_videos()
+
+            # Get the first (oldest) video that is downloaded but doesn't have
+            # Nostr posts; list_videos reports their count, not the platforms
+            video = next(
+                (
+                    v
+                    for v in videos
+                    if v.get("downloaded") and not v.get("nostr_post_count")
+                ),
+                None,
+            )
+
+            if video is None:
                 logger.info("No pending videos to post to Nostr")
                 return
 
-            # Get the first (oldest) video
-            video = pending_videos[0]
             video_id = video["video_id"]
 
             # Call the post_to_nostr function directly
             result = post_to_nostr(
                 video_id=video_id,
-                channel_id="UCxSRxq14XIoMbFDEjMOPU5Q",  # Hardcoded channel ID
+                channel_id=self._channel_id,
                 debug=False,
             )
 
             if result:
                 logger.info(f"Posted video {video_id} to Nostr successfully")
+                self._invalidate_scan()
             else:
                 logger.error(f"Failed to post video {video_id} to Nostr")
 
-            # Update next run time
-            job = self.scheduler.get_job("weekly_nostr")
-            if job and job.next_run_time:
-                self.jobs["weekly_nostr"]["next_run"] = job.next_run_time.isoformat()
-
         except Exception as e:
             logger.error(f"Error executing weekly nostr posting job: {str(e)}")
 
-    def _add_regular_sync_job(self):
-        """
-        Add regular sync job to the scheduler (every 5 minutes)
-        """
-        job_id = "regular_sync"
-        cron_expression = "*/5 * * * *"  # Every 5 minutes
-        description = "Sync metadata for new videos every 5 minutes"
-
-        try:
-            # Add the job to the scheduler
-            job = self.scheduler.add_job(
-                self._run_regular_sync_job,
-                trigger=CronTrigger.from_crontab(cron_expression),
-                id=job_id,
-                replace_existing=True,
-            )
-
-            # Store job metadata
-            self.jobs[job_id] = {
-                "id": job_id,
-                "command": "sync",
-                "args": ["--max-videos", "10"],
-                "schedule": cron_expression,
-                "enabled": True,
-                "description": description,
-                "next_run": job.next_run_time.isoformat()
-                if job.next_run_time
-                else None,
-            }
-
-            logger.info(f"Added job {job_id} with schedule {cron_expression}")
-        except Exception as e:
-            logger.error(f"Error adding job {job_id}: {str(e)}")
-
     def _run_regular_sync_job(self):
         """
         Run the regular sync job - directly calling the sync_metadata function
@@ -392,72 +1031,38 @@ class SchedulerService:
         try:
             logger.info("Executing regular sync job")
 
-            # Get the channel ID and other required parameters
-            channel_id = get_channel_id()
-            api_key = get_youtube_api_key()
-            repository_dir = get_repository_dir()
-
-            if not api_key:
+            if not self._api_key:
                 logger.error("No YouTube API key found in config")
                 return
 
+            # Refresh the video list from the API if the hourly sync asked
+            # for it, otherwise the cached list is used
+            force_refresh, self._force_sync = self._force_sync, False
+
             # Call the sync_metadata function directly
-            result = sync_metadata(
-                api_key=api_key,
-                channel_id=channel_id,
-                channel_title="Einundzwanzig",
-                output_dir=repository_dir,
-                max_videos=10,
-                force_refresh=False,  # Regular sync without force refresh
-            )
+            try:
+                result = sync_metadata(
+                    api_key=self._api_key,
+                    channel_id=self._channel_id,
+                    channel_title="Einundzwanzig",
+                    output_dir=self._repository_dir,
+                    max_videos=10,
+                    force_refresh=force_refresh,
+                )
+            except Exception:
+                # Try the refresh again next time
+                self._force_sync = self._force_sync or force_refresh
+                raise
 
             if result:
                 logger.info("Regular sync job completed successfully")
+                self._invalidate_scan()
             else:
                 logger.error("Regular sync job failed")
 
-            # Update next run time
-            job = self.scheduler.get_job("regular_sync")
-            if job and job.next_run_time:
-                self.jobs["regular_sync"]["next_run"] = job.next_run_time.isoformat()
-
         except Exception as e:
             logger.error(f"Error executing regular sync job: {str(e)}")
 
-    def _add_regular_download_job(self):
-        """
-        Add regular download job to the scheduler (every 5 minutes)
-        """
-        job_id = "regular_download"
-        cron_expression = "*/5 * * * *"  # Every 5 minutes
-        description = "Download 5 pending videos every 5 minutes"
-
-        try:
-            # Add the job to the scheduler
-            job = self.scheduler.add_job(
-                self._run_regular_download_job,
-                trigger=CronTrigger.from_crontab(cron_expression),
-                id=job_id,
-                replace_existing=True,
-            )
-
-            # Store job metadata
-            self.jobs[job_id] = {
-                "id": job_id,
-                "command": "download",
-                "args": ["--max-videos", "5"],
-                "schedule": cron_expression,
-                "enabled": True,
-                "description": description,
-                "next_run": job.next_run_time.isoformat()
-                if job.next_run_time
-                else None,
-            }
-
-            logger.info(f"Added job {job_id} with schedule {cron_expression}")
-        except Exception as e:
-            logger.error(f"Error adding job {job_id}: {str(e)}")
-
     def _run_regular_download_job(self):
         """
         Run the regular download job - download up to 5 videos
@@ -465,93 +1070,26 @@ class SchedulerService:
         try:
             logger.info("Executing regular download job")
 
-            # Get the required parameters
-            repository_dir = get_repository_dir()
-
-            # Get the videos directory for this channel
-            videos_dir = os.path.join(repository_dir, "Einundzwanzig", "videos")
-
-            # Get the default video quality
-            quality = get_default_video_quality()
-
             # Find videos that need to be downloaded
-            from ..metadata.list import list_videos
-
-            videos, _ = list_videos(
-                videos_dir, show_downloaded=False, show_not_downloaded=True
-            )
+            videos = [v for v in self._scan_videos() if not v.get("downloaded")]
 
             if not videos:
                 logger.info("No pending videos to download")
                 return
 
             # Download up to 5 videos
-            videos_downloaded = 0
             max_videos = 5
-
-            for i in range(min(max_videos, len(videos))):
-                video = videos[i]
-                video_id = video["video_id"]
-
-                # Call the download_video function directly
-                result = download_video(
-                    video_id=video_id, videos_dir=videos_dir, quality=quality
-                )
-
-                if result:
-                    logger.info(f"Downloaded video {video_id} successfully")
-                    videos_downloaded += 1
-                else:
-                    logger.error(f"Failed to download video {video_id}")
+            videos_downloaded = self._download_videos(
+                [video["video_id"] for video in videos[:max_videos]]
+            )
 
             logger.info(
                 f"Regular download job completed: {videos_downloaded} videos downloaded"
             )
 
-            # Update next run time
-            job = self.scheduler.get_job("regular_download")
-            if job and job.next_run_time:
-                self.jobs["regular_download"][
-                    "next_run"
-                ] = job.next_run_time.isoformat()
-
         except Exception as e:
             logger.error(f"Error executing regular download job: {str(e)}")
 
-    def _add_regular_nostrmedia_job(self):
-        """
-        Add regular nostrmedia upload job to the scheduler (every 5 minutes)
-        """
-        job_id = "regular_nostrmedia"
-        cron_expression = "*/5 * * * *"  # Every 5 minutes
-        description = "Upload pending videos to nostrmedia every 5 minutes"
-
-        try:
-            # Add the job to the scheduler
-            job = self.scheduler.add_job(
-                self._run_regular_nostrmedia_job,
-                trigger=CronTrigger.from_crontab(cron_expression),
-                id=job_id,
-                replace_existing=True,
-            )
-
-            # Store job metadata
-            self.jobs[job_id] = {
-                "id": job_id,
-                "command": "nostrmedia",
-                "args": ["--oldest"],
-                "schedule": cron_expression,
-                "enabled": True,
-                "description": description,
-                "next_run": job.next_run_time.isoformat()
-                if job.next_run_time
-                else None,
-            }
-
-            logger.info(f"Added job {job_id} with schedule {cron_expression}")
-        except Exception as e:
-            logger.error(f"Error adding job {job_id}: {str(e)}")
-
     def _run_regular_nostrmedia_job(self):
         """
         Run the regular nostrmedia upload job
@@ -559,83 +1097,75 @@ class SchedulerService:
         try:
             logger.info("Executing regular nostrmedia upload job")
 
-            # Get the required parameters
-            repository_dir = get_repository_dir()
-
-            # Get the videos directory for this channel
-            videos_dir = os.path.join(repository_dir, "Einundzwanzig", "videos")
-
             # Find videos that have been downloaded but not uploaded to nostrmedia
-            from ..metadata.list import list_videos
-
-            videos, _ = list_videos(videos_dir)
-
-            # Filter for videos that are downloaded but don't have nostrmedia URL
-            pending_videos = []
-            for video in videos:
-                if video.get("downloaded") and not video.get("platforms", {}).get(
-                    "nostrmedia", {}
-                ).get("url"):
-                    pending_videos.append(video)
+            videos = self._scan_videos()
+
+            # Get the first (oldest) video that is downloaded but doesn't have
+            # a nostrmedia URL
+            video = next(
+                (
+                    v
+                    for v in videos
+                    if v.get("downloaded") and not v.get("nostrmedia_url")
+                ),
+                None,
+            )
 
-            if not pending_videos:
+            if video is None:
                 logger.info("No pending videos to upload to nostrmedia")
                 return
 
-            # Get the first (oldest) video
-            video = pending_videos[0]
             video_id = video["video_id"]
 
             # Get the video file path
-            video_dir = os.path.join(videos_dir, video_id)
+            video_dir = os.path.join(self._videos_dir, video_id)
             youtube_dir = os.path.join(video_dir, "youtube")
 
-            # Find the video file
-            video_files = (
-                [f for f in os.listdir(youtube_dir) if f.endswith(".mp4")]
-                if os.path.exists(youtube_dir)
-                else []
-            )
-
-            if not video_files:
+            # Find the video file, stopping at the first one
+            try:
+                with os.scandir(youtube_dir) as entries:
+                    video_path = next(
+                        (
+                            entry.path
+                            for entry in entries
+                            if entry.name.endswith(".mp4") and entry.is_file()
+                        ),
+                        None,
+                    )
+            except (FileNotFoundError, NotADirectoryError):
+                video_path = None
+
+            if video_path is None:
                 logger.error(f"No video files found for {video_id}")
                 return
 
-            video_path = os.path.join(youtube_dir, video_files[0])
-
             # Call the upload_to_nostrmedia function directly
             result = upload_to_nostrmedia(file_path=video_path, debug=False)
 
             if result and result.get("success"):
                 logger.info(f"Uploaded video {video_id} to nostrmedia successfully")
 
-                # Update the metadata
+                # Update the metadata with the nostrmedia URL, unless it is
+                # there already; save_json_file replaces the file atomically
                 metadata_path = os.path.join(video_dir, "metadata.json")
-                if os.path.exists(metadata_path):
-                    from ..utils.filesystem import load_json_file, save_json_file
-
-                    metadata = load_json_file(metadata_path)
-
-                    # Update the metadata with nostrmedia URL
-                    metadata["platforms"] = metadata.get("platforms", {})
-                    metadata["platforms"]["nostrmedia"] = {
+                metadata = load_json_file(metadata_path)
+                platforms = metadata.get("platforms", {})
+                current_url = platforms.get("nostrmedia", {}).get("url")
+                if metadata and current_url != result.get("url"):
+                    metadata["platforms"] = platforms
+                    platforms["nostrmedia"] = {
                         "url": result.get("url"),
                         "uploaded_at": datetime.now().isoformat(),
                     }
                     save_json_file(metadata_path, metadata)
+
+                self._invalidate_scan()
             else:
                 error_msg = result.get("error") if result else "Unknown error"
                 logger.error(
                     f"Failed to upload video {video_id} to nostrmedia: {error_msg}"
                 )
 
-            # Update next run time
-            job = self.scheduler.get_job("regular_nostrmedia")
-            if job and job.next_run_time:
-                self.jobs["regular_nostrmedia"][
-                    "next_run"
-                ] = job.next_run_time.isoformat()
-
         except Exception as e:
             logger.error(f"Error executing regular nostrmedia upload job: {str(e)}")
 
@@ -661,13 +1191,7 @@ class SchedulerService:
         Returns:
             List of job metadata
         """
-        # Update next run times before returning
-        for job_id in self.jobs:
-            job = self.scheduler.get_job(job_id)
-            if job and job.next_run_time:
-                self.jobs[job_id]["next_run"] = job.next_run_time.isoformat()
-
-        return list(self.jobs.values())
+        return [dict(job_info) for job_info in self.jobs.values()]
 
     def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -679,13 +1203,8 @@ class SchedulerService:
         Returns:
             Job metadata or None if not found
         """
-        # Update next run time before returning
-        if job_id in self.jobs:
-            job = self.scheduler.get_job(job_id)
-            if job and job.next_run_time:
-                self.jobs[job_id]["next_run"] = job.next_run_time.isoformat()
-
-        return self.jobs.get(job_id)
+        job_info = self.jobs.get(job_id)
+        return dict(job_info) if job_info is not None else None
 
     def enable_job(self, job_id: str) -> bool:
         """
@@ -704,47 +1223,30 @@ class SchedulerService:
 
             # Get the job info
             job_info = self.jobs[job_id]
+            spec = _JOB_SPECS_BY_ID.get(job_id)
+            if spec is None:
+                logger.error(f"Unknown job: {job_id}")
+                return False
 
-            # Resume the job if it exists
-            job = self.scheduler.get_job(job_id)
-            if job:
+            if spec.tick:
+                # The tick runs the phase again once it is enabled
+                self._add_tick_job()
+            elif self.scheduler.get_job(job_id):
+                # Resume the job if it exists
                 self.scheduler.resume_job(job_id)
             else:
                 # Re-add the job if it doesn't exist
-                cron_expression = job_info["schedule"]
-                command = job_info["command"]
-
-                # Determine which function to call based on the command
-                if command == "sync":
-                    if "force-refresh" in job_info["args"]:
-                        func = self._run_sync_job
-                    else:
-                        func = self._run_regular_sync_job
-                elif command == "download":
-                    if "--oldest" in job_info["args"]:
-                        func = self._run_download_job
-                    else:
-                        func = self._run_regular_download_job
-                elif command == "nostr":
-                    func = self._run_nostr_job
-                elif command == "nostrmedia":
-                    func = self._run_regular_nostrmedia_job
-                else:
-                    logger.error(f"Unknown command: {command}")
-                    return False
-
-                # Add the job to the scheduler
-                job = self.scheduler.add_job(
-                    func,
-                    trigger=CronTrigger.from_crontab(cron_expression),
+                self.scheduler.add_job(
+                    getattr(self, spec.handler),
+                    trigger=_trigger(job_info["schedule"]),
                     id=job_id,
                     replace_existing=True,
+                    executor=spec.executor,
                 )
 
-            # Update the job info
+            # Update the job info; the next run time is kept current by
+            # _on_job_scheduled, even while a tick phase is disabled
             self.jobs[job_id]["enabled"] = True
-            if job and job.next_run_time:
-                self.jobs[job_id]["next_run"] = job.next_run_time.isoformat()
 
             logger.info(f"Enabled job {job_id}")
             return True
@@ -767,8 +1269,9 @@ class SchedulerService:
                 logger.error(f"Job {job_id} not found")
                 return False
 
-            # Pause the job
-            self.scheduler.pause_job(job_id)
+            # Pause the job, the tick skips its disabled phases instead
+            if _scheduler_job_id(job_id) == job_id:
+                self.scheduler.pause_job(job_id)
 
             # Update the job info
             self.jobs[job_id]["enabled"] = False
@@ -785,4 +1288,26 @@ class SchedulerService:
         """
         if self.scheduler.running:
             self.scheduler.shutdown()
+            self._download_pool.shutdown()
             logger.info("Scheduler shutdown")
+
+
+# The scheduler service of the process, created by get_scheduler
+_INSTANCE: Optional[SchedulerService] = None
+_INSTANCE_LOCK = threading.Lock()
+
+
+def get_scheduler() -> SchedulerService:
+    """
+    Get the scheduler service, creating and starting it on first use
+
+    Returns:
+        The process-wide scheduler service
+    """
+    global _INSTANCE
+
+    if _INSTANCE is None:
+        with _INSTANCE_LOCK:
+            if _INSTANCE is None:
+                _INSTANCE = SchedulerService()
+    return _INSTANCE
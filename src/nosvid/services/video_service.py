@@ -2,11 +2,12 @@
 Video service for nosvid
 """
 
-import json
 import os
 import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from ..download.video import download_video as download_video_func
 from ..models.result import Result
@@ -15,18 +16,94 @@ from ..platforms.nostrmedia import update_nostrmedia_metadata
 from ..platforms.nostrmedia import upload_video_to_nostrmedia as upload_nostrmedia_func
 from ..platforms.youtube import find_youtube_video_file
 from ..repo.video_repo import VideoRepo
-from ..utils.filesystem import get_platform_dir, get_video_dir
+from ..utils.filesystem import get_platform_dir, get_video_dir, load_json_file
 
-# Global download lock to prevent concurrent downloads
-download_lock = threading.Lock()
+# Number of videos downloaded at the same time; further downloads wait for
+# a free worker
+DOWNLOAD_WORKERS = int(os.environ.get("NOSVID_DOWNLOAD_WORKERS", "5"))
+_download_pool = ThreadPoolExecutor(
+    max_workers=DOWNLOAD_WORKERS, thread_name_prefix="nosvid-video-dl"
+)
 
-# Global download status
-download_status = {
-    "in_progress": False,
-    "video_id": None,
-    "started_at": None,
-    "user": None,
-}
+# Status of the downloads in progress, keyed by video ID, in the order they
+# started. A video is downloaded by one request at a time. Writers hold the
+# lock and replace the dict instead of modifying it, so readers get a
+# consistent snapshot from a single read without taking the lock.
+_downloads: Dict[str, Dict[str, Any]] = {}
+_downloads_lock = threading.Lock()
+
+
+def _start_download(video_id: str, user: str) -> bool:
+    """
+    Record that a video is being downloaded
+
+    Args:
+        video_id: ID of the video
+        user: Identifier for the user initiating the download
+
+    Returns:
+        True if recorded, False if the video is already being downloaded
+    """
+    global _downloads
+
+    with _downloads_lock:
+        if video_id in _downloads:
+            return False
+        status = {
+            "video_id": video_id,
+            "started_at": datetime.now().isoformat(),
+            "user": user,
+        }
+        _downloads = {**_downloads, video_id: status}
+    return True
+
+
+def _finish_download(video_id: str) -> None:
+    """
+    Drop the status of a finished download
+
+    Args:
+        video_id: ID of the video
+    """
+    global _downloads
+
+    with _downloads_lock:
+        downloads = dict(_downloads)
+        del downloads[video_id]
+        _downloads = downloads
+
+
+# Seconds get_cache_statistics reuses its result; writes through the service
+# drop it earlier, the TTL bounds how long other writers go unnoticed
+STATISTICS_TTL = 30
+
+# Results of get_cache_statistics, keyed by (repository base dir, channel
+# title), with the time.monotonic() they were computed at. Module-level
+# because the API creates a VideoService per request.
+_stats_cache: Dict[Tuple[str, str], Tuple[float, Dict[str, Any]]] = {}
+_stats_lock = threading.Lock()
+
+
+def download_status() -> Dict[str, Any]:
+    """
+    Get the status of the downloads in progress
+
+    Returns:
+        Dictionary with in_progress and the video_id, started_at and user of
+        the earliest running download, and all running downloads under
+        'downloads'
+    """
+    # The snapshot is never modified, only replaced
+    downloads = [dict(status) for status in _downloads.values()]
+
+    first = downloads[0] if downloads else {}
+    return {
+        "in_progress": bool(downloads),
+        "video_id": first.get("video_id"),
+        "started_at": first.get("started_at"),
+        "user": first.get("user"),
+        "downloads": downloads,
+    }
 
 
 class VideoService:
@@ -112,19 +189,14 @@ class VideoService:
         Returns:
             Result indicating success or failure
         """
-        # Check if a download is already in progress
-        if not download_lock.acquire(blocking=False):
+        # Check if the video is already being downloaded, and if not, record
+        # that it is
+        if not _start_download(video_id, user):
             return Result.failure(
-                f"Another download is already in progress for video {download_status['video_id']}. Please wait and try again."
+                f"A download is already in progress for video {video_id}. Please wait and try again."
             )
 
         try:
-            # Update download status
-            download_status["in_progress"] = True
-            download_status["video_id"] = video_id
-            download_status["started_at"] = datetime.now().isoformat()
-            download_status["user"] = user
-
             # Get the video
             video_result = self.get_video(video_id, channel_title)
             if not video_result.success:
@@ -134,18 +206,20 @@ class VideoService:
             if not video:
                 return Result.failure(f"Video not found: {video_id}")
 
-            # Download the video
-            download_result = download_video_func(
+            # Download the video in the shared pool, which bounds the
+            # number of downloads running at the same time
+            download_result = _download_pool.submit(
+                download_video_func,
                 video_id=video_id,
                 videos_dir=f"./repository/{channel_title}/videos",
                 quality=quality,
-            )
+            ).result()
 
             if not download_result:
                 return Result.failure(f"Failed to download video: Unknown error")
 
             # Update the video metadata
-            if "platforms" not in video.to_dict():
+            if video.platforms is None:
                 video.platforms = {}
 
             if "youtube" not in video.platforms:
@@ -156,21 +230,21 @@ class VideoService:
             video.platforms["youtube"].downloaded = True
             video.platforms["youtube"].downloaded_at = datetime.now().isoformat()
 
-            # Save the updated video
+            # Save the updated video. The pool worker is free again by now
+            # and only this video is still marked as in progress, so the
+            # save isn't deferred; that way a failed save is reported and
+            # the video isn't downloaded again before it is marked
             save_result = self.video_repository.save(video, channel_title)
             if not save_result:
                 return Result.failure("Failed to save video metadata")
+            self._invalidate_statistics(channel_title)
 
             return Result.success(True)
         except Exception as e:
             return Result.failure(str(e))
         finally:
-            # Always reset download status and release the lock when done
-            download_status["in_progress"] = False
-            download_status["video_id"] = None
-            download_status["started_at"] = None
-            download_status["user"] = None
-            download_lock.release()
+            # Always drop the download status when done
+            _finish_download(video_id)
 
     def get_cache_statistics(self, channel_title: str) -> Result[Dict[str, Any]]:
         """
@@ -186,6 +260,14 @@ class VideoService:
             # Get the base directory from the repository
             base_dir = self.video_repository.base_dir
 
+            # Reuse recent statistics, the count looks at every video
+            cache_key = (base_dir, channel_title)
+            with _stats_lock:
+                cached = _stats_cache.get(cache_key)
+            if cached is not None and time.monotonic() - cached[0] < STATISTICS_TTL:
+                return Result.success(dict(cached[1]))
+            computed_at = time.monotonic()
+
             # Set up paths
             channel_dir = os.path.join(base_dir, channel_title)
             metadata_dir = os.path.join(channel_dir, "metadata")
@@ -205,60 +287,33 @@ class VideoService:
             # Get the channel ID (hardcoded for now)
             channel_id = "UCxSRxq14XIoMbFDEjMOPU5Q"  # Einundzwanzig Podcast
 
-            # Check if cache file exists
+            # Read the video count from the cache file; load_json_file
+            # reuses the file's bytes while it is unchanged and parses them
+            # with orjson
             cache_file = os.path.join(metadata_dir, f"channel_videos_{channel_id}.json")
-            if os.path.exists(cache_file):
-                try:
-                    with open(cache_file, "r", encoding="utf-8") as f:
-                        cache_data = json.load(f)
-                    stats["total_in_cache"] = cache_data.get("video_count", 0)
-                except Exception as e:
-                    print(f"Error reading cache: {e}")
-
-            # Get list of videos with metadata
-            videos = self.video_repository.list(channel_title)
-            stats["total_with_metadata"] = len(videos)
+            cache_data = load_json_file(cache_file)
+            if isinstance(cache_data, dict):
+                stats["total_in_cache"] = cache_data.get("video_count", 0)
 
             # Count downloaded, uploaded, and posted videos
-            for video in videos:
-                # Check if downloaded
-                if (
-                    video.platforms
-                    and "youtube" in video.platforms
-                    and video.platforms["youtube"].downloaded
-                ):
-                    stats["total_downloaded"] += 1
-                    print(f"  Counted as downloaded: {video.video_id}")
-
-                # Check if uploaded to Nostrmedia
-                if (
-                    video.platforms
-                    and "nostrmedia" in video.platforms
-                    and video.platforms["nostrmedia"].url
-                ):
-                    stats["total_uploaded_nm"] += 1
-                    print(f"  Counted as uploaded to nostrmedia: {video.video_id}")
-
-                # Check if posted to Nostr
-                if video.nostr_posts and len(video.nostr_posts) > 0:
-                    stats["total_posted_nostr"] += 1
-
-                # Count npubs
-                if video.npubs:
-                    npub_count = 0
-                    if "chat" in video.npubs:
-                        npub_count += len(video.npubs["chat"])
-                    if "description" in video.npubs:
-                        npub_count += len(video.npubs["description"])
-
-                    if npub_count > 0:
-                        stats["total_with_npubs"] += 1
-                        stats["total_npubs"] += npub_count
-
-            return Result.success(stats)
+            stats.update(self.video_repository.aggregate_stats(channel_title))
+
+            with _stats_lock:
+                _stats_cache[cache_key] = (computed_at, stats)
+            return Result.success(dict(stats))
         except Exception as e:
             return Result.failure(str(e))
 
+    def _invalidate_statistics(self, channel_title: str) -> None:
+        """
+        Drop the cached statistics of a channel after a change to its videos
+
+        Args:
+            channel_title: Title of the channel
+        """
+        with _stats_lock:
+            _stats_cache.pop((self.video_repository.base_dir, channel_title), None)
+
     def save_video(self, video: Video, channel_title: str) -> Result[bool]:
         """
         Save a video
@@ -273,6 +328,7 @@ class VideoService:
         try:
             result = self.video_repository.save(video, channel_title)
             if result:
+                self._invalidate_statistics(channel_title)
                 return Result.success(True)
             else:
                 return Result.failure("Failed to save video")
@@ -335,11 +391,14 @@ class VideoService:
                     f"Failed to upload to nostrmedia: {result.get('error', 'Unknown error')}"
                 )
 
+            # One upload time for both metadata files
+            uploaded_at = result.get("uploaded_at") or datetime.now().isoformat()
+
             # Create nostrmedia-specific metadata
             nostrmedia_metadata = {
                 "url": result["url"],
                 "hash": result["hash"],
-                "uploaded_at": result.get("uploaded_at", datetime.now().isoformat()),
+                "uploaded_at": uploaded_at,
             }
 
             # Save nostrmedia-specific metadata
@@ -354,9 +413,7 @@ class VideoService:
                 )
 
             video.platforms["nostrmedia"].uploaded = True
-            video.platforms["nostrmedia"].uploaded_at = result.get(
-                "uploaded_at", datetime.now().isoformat()
-            )
+            video.platforms["nostrmedia"].uploaded_at = uploaded_at
 
             # Save the updated video
             save_result = self.save_video(video, channel_title)
@@ -400,11 +457,14 @@ class VideoService:
             if not video:
                 return Result.failure(f"Video not found: {video_id}")
 
+            # One upload time for both metadata files
+            uploaded_at = uploaded_at or datetime.now().isoformat()
+
             # Create nostrmedia-specific metadata
             nostrmedia_metadata = {
                 "url": url,
                 "hash": hash_value,
-                "uploaded_at": uploaded_at or datetime.now().isoformat(),
+                "uploaded_at": uploaded_at,
             }
 
             # Save nostrmedia-specific metadata
@@ -421,9 +481,7 @@ class VideoService:
                 video.platforms["nostrmedia"] = Platform(name="nostrmedia", url=url)
 
             video.platforms["nostrmedia"].uploaded = True
-            video.platforms["nostrmedia"].uploaded_at = (
-                uploaded_at or datetime.now().isoformat()
-            )
+            video.platforms["nostrmedia"].uploaded_at = uploaded_at
 
             # Save the updated video
             save_result = self.save_video(video, channel_title)
@@ -492,6 +550,7 @@ class VideoService:
                 result = self.video_repository.save(video, channel_title)
                 if not result:
                     return Result.failure("Failed to save new video metadata")
+                self._invalidate_statistics(channel_title)
 
                 return Result.success(True)
         except Exception as e:
@@ -521,6 +580,9 @@ class VideoService:
             if not video:
                 return Result.failure(f"Video not found: {video_id}")
 
+            # Time of this update, for synced_at and posts without a time
+            now = datetime.now().isoformat()
+
             # Update basic metadata if missing locally
             if "title" in metadata and not video.title:
                 video.title = metadata["title"]
@@ -606,9 +668,7 @@ class VideoService:
                         new_post = NostrPost(
                             event_id=post_data["event_id"],
                             pubkey=post_data.get("pubkey", ""),
-                            uploaded_at=post_data.get(
-                                "uploaded_at", datetime.now().isoformat()
-                            ),
+                            uploaded_at=post_data.get("uploaded_at", now),
                         )
                         video.nostr_posts.append(new_post)
                         existing_event_ids.add(post_data["event_id"])
@@ -626,7 +686,7 @@ class VideoService:
                     video.npubs[source] = list(set(video.npubs[source] + npubs))
 
             # Update synced_at timestamp
-            video.synced_at = datetime.now().isoformat()
+            video.synced_at = now
 
             # Save the updated video
             save_result = self.save_video(video, channel_title)
@@ -722,6 +782,7 @@ class VideoService:
         try:
             result = self.video_repository.delete(video_id, channel_title)
             if result:
+                self._invalidate_statistics(channel_title)
                 return Result.success(True)
             else:
                 return Result.failure(f"Failed to delete video: {video_id}")
@@ -2,34 +2,136 @@
 Configuration utilities for nosvid
 """
 
+import logging
 import os
+from types import MappingProxyType
 
 import yaml
 
+from .filesystem import StatCache
 
-def load_config(config_path=None):
+logger = logging.getLogger(__name__)
+
+# The LibYAML based loader and dumper are several times faster than the pure
+# Python ones, but PyYAML may have been built without LibYAML
+SAFE_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+SAFE_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+if not yaml.__with_libyaml__:
+    logger.debug("LibYAML is not available, YAML is parsed in pure Python")
+
+# Parsed config files, validated against (st_mtime_ns, st_size) so that
+# edits are picked up without a restart. The configs are stored frozen, see
+# freeze_config.
+_config_cache = StatCache(100)
+
+
+def get_config_path():
+    """
+    Get the path of the configuration file
+
+    Returns:
+        Path from the NOSVID_CONFIG_PATH environment variable, or 'config.yaml'
+    """
+    return os.environ.get("NOSVID_CONFIG_PATH", "config.yaml")
+
+
+def freeze_config(value):
+    """
+    Make a read-only view of a configuration value
+
+    Dictionaries become MappingProxyType views and lists become tuples, so
+    the result can be shared without defensive copies.
+
+    Args:
+        value: Configuration value
+
+    Returns:
+        Frozen configuration value
+    """
+    if isinstance(value, dict):
+        return MappingProxyType({k: freeze_config(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze_config(v) for v in value)
+    return value
+
+
+def unfreeze_config(value):
+    """
+    Make a modifiable copy of a (frozen) configuration value
+
+    Args:
+        value: Configuration value, possibly frozen with freeze_config
+
+    Returns:
+        Configuration value made of plain dictionaries and lists
+    """
+    if isinstance(value, (dict, MappingProxyType)):
+        return {k: unfreeze_config(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [unfreeze_config(v) for v in value]
+    return value
+
+
+def load_config(config_path=None, shared=False):
     """
     Load configuration from YAML file
 
     Args:
         config_path: Path to the configuration file (optional)
+        shared: Return the cached, frozen configuration (see freeze_config)
+            instead of a modifiable copy
 
     Returns:
         Configuration dictionary
     """
     # Check for config path in environment variable
     if config_path is None:
-        config_path = os.environ.get("NOSVID_CONFIG_PATH", "config.yaml")
+        config_path = get_config_path()
 
-    # Try to load from the config file
     try:
-        with open(config_path, "r") as f:
-            config = yaml.safe_load(f)
-            return config
-    except (FileNotFoundError, yaml.YAMLError):
-        # Return empty config if file not found or invalid
+        stat = os.stat(config_path)
+    except OSError:
+        # Return empty config if file not found
         return {}
 
+    # Reuse the parsed config while the file is unchanged; a stat is much
+    # cheaper than parsing YAML, and almost every get_* helper lands here
+    signature = (stat.st_mtime_ns, stat.st_size)
+    config = _config_cache.get(config_path, signature)
+
+    if config is None:
+        # Try to load from the config file
+        try:
+            # The C loader works best on one contiguous buffer, and it
+            # decodes the UTF-8 itself, so skip the text layer
+            with open(config_path, "rb") as f:
+                config = freeze_config(yaml.load(f.read(), Loader=SAFE_LOADER))
+        except (FileNotFoundError, yaml.YAMLError):
+            # Return empty config if file not found or invalid
+            return {}
+        # Parsed outside the cache's lock; if another thread parsed the file
+        # at the same time, either copy will do
+        _config_cache.put(config_path, signature, config)
+
+    if shared:
+        return config
+
+    # Callers are free to modify what they get back
+    return unfreeze_config(config)
+
+
+def clear_config_cache(config_path):
+    """
+    Drop a configuration file from the parse cache
+
+    Writers call this so that the next load doesn't rely on the mtime
+    alone, which may be too coarse to notice a quick rewrite.
+
+    Args:
+        config_path: Path to the configuration file
+    """
+    _config_cache.invalidate(config_path)
+
 
 def read_api_key_from_yaml(service_name, key_name=None):
     """
@@ -52,8 +154,8 @@ def read_api_key_from_yaml(service_name, key_name=None):
 
     # Try to read from secrets.yaml for backward compatibility
     try:
-        with open("secrets.yaml", "r") as f:
-            secrets = yaml.safe_load(f)
+        with open("secrets.yaml", "rb") as f:
+            secrets = yaml.load(f.read(), Loader=SAFE_LOADER)
             if service_name in secrets and "api_key" in secrets[service_name]:
                 return secrets[service_name]["api_key"]
     except (FileNotFoundError, yaml.YAMLError):
@@ -4,6 +4,107 @@ Filesystem utilities for nosvid
 
 import json
 import os
+import tempfile
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import lru_cache
+
+import orjson
+
+
+class StatCache:
+    """
+    Bounded LRU cache of values derived from files
+
+    Entries are keyed by absolute path and hold the stat signature of the
+    file they were derived from; a lookup with a different signature
+    misses. Safe to share between threads.
+    """
+
+    __slots__ = ("maxsize", "_entries", "_lock")
+
+    def __init__(self, maxsize):
+        """
+        Initialize the cache
+
+        Args:
+            maxsize: Number of files to keep, least recently used first out
+        """
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path, signature):
+        """
+        Get the value cached for a file
+
+        Args:
+            path: Path of the file
+            signature: Current stat signature of the file
+
+        Returns:
+            Cached value, or None if there is none for this signature
+        """
+        key = os.path.abspath(path)
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is None or cached[0] != signature:
+                return None
+            self._entries.move_to_end(key)
+            return cached[1]
+
+    def put(self, path, signature, value):
+        """
+        Cache the value derived from a file
+
+        Args:
+            path: Path of the file
+            signature: Stat signature of the file the value was derived from
+            value: Value to cache, not None
+        """
+        key = os.path.abspath(path)
+        with self._lock:
+            self._entries[key] = (signature, value)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, path):
+        """
+        Drop the value cached for a file
+
+        Writers call this when the signature may be too coarse to show
+        their change.
+
+        Args:
+            path: Path of the file
+        """
+        with self._lock:
+            self._entries.pop(os.path.abspath(path), None)
+
+
+# Raw bytes of recently read JSON files, validated against (st_mtime_ns,
+# st_size). The bytes rather than the parsed object are cached because
+# callers freely mutate what load_json_file returns.
+_json_bytes_cache = StatCache(4096)
+
+# orjson options used by save_json_file; non-string keys are allowed like
+# they were with the json module
+_JSON_DUMP_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+
+# Names of the subdirectories of recently inspected video directories,
+# validated against the directory's st_mtime_ns, which changes whenever an
+# entry is added or removed
+_video_dir_index_cache = StatCache(4096)
+
+# Permissions of the files written by save_json_file, as open() would
+# create them with the usual umask
+_NEW_FILE_MODE = 0o644
+
+# Per-thread list of files whose fsync is deferred by batch_write(), or None
+# outside of a batch
+_fsync_state = threading.local()
 
 
 def setup_directory_structure(base_dir, channel_title):
@@ -49,14 +150,37 @@ def load_json_file(file_path, default=None):
     if default is None:
         default = {}
 
-    if os.path.exists(file_path):
-        try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except json.JSONDecodeError:
-            return default
+    try:
+        # The cache lookup stats the file anyway, so let it report a missing
+        # file instead of checking with os.path.exists first
+        return orjson.loads(_read_json_bytes(file_path))
+    except (FileNotFoundError, NotADirectoryError, json.JSONDecodeError):
+        return default
 
-    return default
+
+def _read_json_bytes(file_path):
+    """
+    Read a JSON file's bytes, reusing the cached copy if the file is unchanged
+
+    Args:
+        file_path: Path to JSON file
+
+    Returns:
+        File content as bytes
+    """
+    stat = os.stat(file_path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+
+    content = _json_bytes_cache.get(file_path, signature)
+    if content is not None:
+        return content
+
+    # orjson parses UTF-8 bytes directly, so skip decoding to str
+    with open(file_path, "rb") as f:
+        content = f.read()
+
+    _json_bytes_cache.put(file_path, signature, content)
+    return content
 
 
 def save_json_file(file_path, data):
@@ -96,11 +220,67 @@ def get_platform_dir(video_dir, platform):
     Returns:
         Path to the platform directory
     """
-    platform_dir = os.path.join(video_dir, platform)
-    os.makedirs(platform_dir, exist_ok=True)
+    platform_dir = _platform_dir_path(video_dir, platform)
+    # Not cached: the video directory may have been deleted in the meantime
+    try:
+        os.mkdir(platform_dir)
+    except FileExistsError:
+        return platform_dir
+    except FileNotFoundError:
+        os.makedirs(platform_dir, exist_ok=True)
+    # The directory's mtime may be too coarse to show the new entry
+    _video_dir_index_cache.invalidate(video_dir)
     return platform_dir
 
 
+def video_dir_index(video_dir):
+    """
+    Get the names of the subdirectories of a video directory
+
+    This tells which platform directories exist with a single stat for
+    an unchanged directory, instead of one existence check per platform.
+
+    Args:
+        video_dir: Directory for a specific video
+
+    Returns:
+        Frozenset of subdirectory names, empty if the video directory
+        doesn't exist
+    """
+    try:
+        mtime_ns = os.stat(video_dir).st_mtime_ns
+    except (FileNotFoundError, NotADirectoryError):
+        return frozenset()
+
+    names = _video_dir_index_cache.get(video_dir, mtime_ns)
+    if names is not None:
+        return names
+
+    try:
+        with os.scandir(video_dir) as entries:
+            names = frozenset(entry.name for entry in entries if entry.is_dir())
+    except (FileNotFoundError, NotADirectoryError):
+        return frozenset()
+
+    _video_dir_index_cache.put(video_dir, mtime_ns, names)
+    return names
+
+
+@lru_cache(maxsize=4096)
+def _platform_dir_path(video_dir, platform):
+    """
+    Join a video directory and a platform name, caching the result
+
+    Args:
+        video_dir: Directory for a specific video
+        platform: Platform name
+
+    Returns:
+        Path to the platform directory
+    """
+    return os.path.join(video_dir, platform)
+
+
 def create_safe_filename(title):
     """
     Create a safe filename from a title
@@ -172,6 +352,9 @@ def save_json_file(file_path, data):
     """
     Save JSON data to file
 
+    The data is written to a temporary file next to the target and then
+    renamed over it, so readers never see a partially written file.
+
     Args:
         file_path: Path to JSON file
         data: Data to save
@@ -179,13 +362,95 @@ def save_json_file(file_path, data):
     Returns:
         True if successful, False otherwise
     """
+    tmp_path = None
+    pending_fsyncs = getattr(_fsync_state, "pending", None)
     try:
         # Create directory if it doesn't exist
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
-
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
+        directory = os.path.dirname(file_path)
+        os.makedirs(directory, exist_ok=True)
+
+        # A unique temporary file, so concurrent writers of the same file
+        # don't write into each other's
+        fd, tmp_path = tempfile.mkstemp(
+            dir=directory or ".",
+            prefix=os.path.basename(file_path) + ".",
+            suffix=".tmp",
+        )
+        # mkstemp creates the file readable by the owner only
+        os.fchmod(fd, _NEW_FILE_MODE)
+        with os.fdopen(fd, "wb") as f:
+            f.write(orjson.dumps(data, option=_JSON_DUMP_OPTIONS))
+            if pending_fsyncs is None:
+                # Make sure the content is on disk before the rename, so a
+                # crash can't leave an empty file behind
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, file_path)
+        if pending_fsyncs is not None:
+            pending_fsyncs.append(file_path)
+        # Don't rely on the mtime alone, it may be too coarse to notice
+        # two writes in quick succession
+        _json_bytes_cache.invalidate(file_path)
         return True
     except Exception as e:
         print(f"Error saving JSON file {file_path}: {e}")
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
         return False
+
+
+@contextmanager
+def batch_write():
+    """
+    Defer the fsync of files saved with save_json_file until the block exits
+
+    Saving many files one after another otherwise waits for the disk after
+    each of them. The files are still replaced atomically, but until the
+    block exits a crash may lose their new content.
+    """
+    if getattr(_fsync_state, "pending", None) is not None:
+        # Nested batch, the outermost one syncs
+        yield
+        return
+
+    _fsync_state.pending = []
+    try:
+        yield
+    finally:
+        pending, _fsync_state.pending = _fsync_state.pending, None
+        _fsync_files(pending)
+
+
+def _fsync_files(file_paths):
+    """
+    Flush files and their directories to disk
+
+    Args:
+        file_paths: Paths of the files to flush
+    """
+    directories = set()
+    for file_path in dict.fromkeys(file_paths):
+        try:
+            fd = os.open(file_path, os.O_RDONLY)
+        except FileNotFoundError:
+            # Replaced or deleted again within the batch
+            continue
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        directories.add(os.path.dirname(file_path) or ".")
+
+    # Persist the renames as well
+    for directory in directories:
+        try:
+            fd = os.open(directory, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.fsync(fd)
+        except OSError:
+            # Not every platform can fsync a directory
+            pass
+        finally:
+            os.close(fd)
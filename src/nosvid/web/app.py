@@ -13,7 +13,7 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
 from ..api.app import app as api_app
-from ..services.scheduler_service import SchedulerService
+from ..services.scheduler_service import get_scheduler
 
 # Configure logging
 logging.basicConfig(
@@ -91,7 +91,7 @@ def run(port=8000, with_cronjobs=False):
 
     if with_cronjobs:
         # Initialize and start the scheduler service
-        scheduler = SchedulerService()
+        scheduler = get_scheduler()
         logger.info("Initializing scheduler service")
 
         # Log all scheduled jobs
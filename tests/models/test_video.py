@@ -41,6 +41,11 @@ class TestPlatform(unittest.TestCase):
         self.assertTrue(platform.uploaded)
         self.assertEqual(platform.uploaded_at, "2023-01-02T12:00:00")
 
+    def test_platform_from_dict_with_name(self):
+        """Test that an explicit name overrides the one in the dictionary"""
+        platform = Platform.from_dict({"url": "https://example.com"}, name="nostr")
+        self.assertEqual(platform.name, "nostr")
+
     def test_platform_to_dict(self):
         """Test converting a Platform to a dictionary"""
         platform = Platform(
@@ -75,7 +80,7 @@ class TestNostrPost(unittest.TestCase):
         self.assertEqual(post.pubkey, "abc")
         self.assertEqual(post.uploaded_at, "2023-01-01T12:00:00")
         self.assertIsNone(post.nostr_uri)
-        self.assertEqual(post.links, {})
+        self.assertEqual(post.links, ())
 
     def test_nostr_post_from_dict(self):
         """Test creating a NostrPost from a dictionary"""
@@ -93,7 +98,7 @@ class TestNostrPost(unittest.TestCase):
         self.assertEqual(post.pubkey, "abc")
         self.assertEqual(post.uploaded_at, "2023-01-01T12:00:00")
         self.assertEqual(post.nostr_uri, "nostr:123")
-        self.assertEqual(post.links, {"snort": "https://snort.social/e/123"})
+        self.assertEqual(post.links, (("snort", "https://snort.social/e/123"),))
 
     def test_nostr_post_to_dict(self):
         """Test converting a NostrPost to a dictionary"""
@@ -113,6 +118,14 @@ class TestNostrPost(unittest.TestCase):
         self.assertEqual(data["nostr_uri"], "nostr:123")
         self.assertEqual(data["links"], {"snort": "https://snort.social/e/123"})
 
+    def test_nostr_post_has_no_instance_dict(self):
+        """Test that NostrPost uses slots instead of a per-instance __dict__"""
+        post = NostrPost(
+            event_id="123", pubkey="abc", uploaded_at="2023-01-01T12:00:00"
+        )
+
+        self.assertFalse(hasattr(post, "__dict__"))
+
 
 class TestVideo(unittest.TestCase):
     """Tests for the Video class"""
@@ -191,6 +204,21 @@ class TestVideo(unittest.TestCase):
 
         self.assertEqual(video.synced_at, "2023-01-03T12:00:00")
 
+    def test_video_from_dict_does_not_modify_input(self):
+        """Test that creating a Video leaves the source dictionary untouched"""
+        data = {
+            "video_id": "123",
+            "title": "Test Video",
+            "published_at": "2023-01-01T12:00:00",
+            "platforms": {"youtube": {"url": "https://youtube.com/watch?v=123"}},
+        }
+
+        video = Video.from_dict(data)
+
+        self.assertEqual(video.platforms["youtube"].name, "youtube")
+        self.assertNotIn("name", data["platforms"]["youtube"])
+        self.assertEqual(video.nostr_posts, [])
+
     def test_video_to_dict(self):
         """Test converting a Video to a dictionary"""
         # Create platforms
@@ -0,0 +1,100 @@
+"""
+Tests for the Nostr upload module
+"""
+
+import os
+import tempfile
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from nostr_sdk import Keys
+
+from src.nosvid.nostr import upload
+
+
+def _mock_client(send_side_effect=None):
+    """Create a mock nostr-sdk Client whose coroutine methods can be awaited"""
+    client = MagicMock()
+    for name in ("add_relay", "connect", "disconnect", "send_event", "publish_event"):
+        setattr(client, name, AsyncMock())
+    client.send_event.side_effect = send_side_effect
+    client.publish_event.side_effect = send_side_effect
+    return client
+
+
+class TestUploadManyToNostr(unittest.TestCase):
+    """Tests for publishing several events over one relay session"""
+
+    def setUp(self):
+        """Create two video files and a private key"""
+        # Import nostr-sdk before the client gets patched
+        self.assertTrue(upload._nostr_sdk_available())
+
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.files = []
+        for name in ("a.mp4", "b.mp4"):
+            path = os.path.join(self.temp_dir.name, name)
+            with open(path, "wb") as f:
+                f.write(b"video")
+            self.files.append(path)
+        self.private_key = Keys.generate().secret_key().to_hex()
+
+    def tearDown(self):
+        """Clean up the test environment"""
+        self.temp_dir.cleanup()
+
+    def _upload(self, client, uploads):
+        with patch.object(upload, "Client", return_value=client), patch.object(
+            upload, "get_nostr_relays", return_value=["wss://relay.example"]
+        ), patch.object(upload.time, "sleep"):
+            return upload.upload_many_to_nostr(
+                uploads, private_key_str=self.private_key
+            )
+
+    def test_single_session_for_all_uploads(self):
+        """Test that all events are published over one connection"""
+        client = _mock_client()
+        uploads = [(path, {"title": path, "video_id": "id"}) for path in self.files]
+
+        results = self._upload(client, uploads)
+
+        self.assertEqual([r["success"] for r in results], [True, True])
+        self.assertNotEqual(results[0]["event_id"], results[1]["event_id"])
+        client.connect.assert_called_once()
+        client.disconnect.assert_called_once()
+        publish = (
+            client.publish_event if upload._HAS_PUBLISH_EVENT else client.send_event
+        )
+        self.assertEqual(publish.call_count, 2)
+
+    def test_failures_are_reported_per_upload(self):
+        """Test that a missing file or failed publish only affects its own upload"""
+        client = _mock_client(send_side_effect=[None, RuntimeError("relay down")])
+        uploads = [
+            (self.files[0], {"title": "Ok"}),
+            (os.path.join(self.temp_dir.name, "missing.mp4"), {"title": "Missing"}),
+            (self.files[1], {"title": "Fails"}),
+        ]
+
+        results = self._upload(client, uploads)
+
+        self.assertTrue(results[0]["success"])
+        self.assertFalse(results[1]["success"])
+        self.assertIn("File not found", results[1]["error"])
+        self.assertFalse(results[2]["success"])
+        self.assertEqual(results[2]["error"], "relay down")
+
+    def test_invalid_key(self):
+        """Test that an invalid key fails every upload"""
+        results = upload.upload_many_to_nostr(
+            [(path, {}) for path in self.files], private_key_str="not-a-key"
+        )
+
+        self.assertEqual(len(results), 2)
+        for result in results:
+            self.assertFalse(result["success"])
+            self.assertIn("Invalid private key format", result["error"])
+
+
+if __name__ == "__main__":
+    unittest.main()
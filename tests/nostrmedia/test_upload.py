@@ -0,0 +1,296 @@
+"""
+Tests for the nostrmedia upload functionality
+"""
+
+import base64
+import hashlib
+import io
+import json
+import logging
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+from src.nosvid.nostrmedia import upload
+
+
+class TestComputeSha256(unittest.TestCase):
+    """Tests for compute_sha256"""
+
+    def setUp(self):
+        """Create a file spanning several read chunks"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.temp_dir.name, "video.mp4")
+        self.content = os.urandom((3 << 20) + 123)
+        with open(self.file_path, "wb") as f:
+            f.write(self.content)
+        self.expected = hashlib.sha256(self.content).hexdigest()
+
+    def tearDown(self):
+        """Clean up the test environment"""
+        self.temp_dir.cleanup()
+
+    def test_compute_sha256(self):
+        """Test that the digest matches hashing the whole content"""
+        self.assertEqual(upload.compute_sha256(self.file_path), self.expected)
+
+    def test_compute_sha256_unmappable_file(self):
+        """Test that files which cannot be mapped are read instead"""
+        with patch.object(upload.mmap, "mmap", side_effect=OSError):
+            self.assertEqual(upload.compute_sha256(self.file_path), self.expected)
+
+    def test_compute_sha256_without_file_digest(self):
+        """Test the chunked fallback used before Python 3.11"""
+        with patch.object(upload.mmap, "mmap", side_effect=OSError), patch.object(
+            upload, "hashlib", spec=["sha256"]
+        ) as mock_hashlib:
+            mock_hashlib.sha256 = hashlib.sha256
+            self.assertEqual(upload.compute_sha256(self.file_path), self.expected)
+
+    def test_compute_sha256_empty_file(self):
+        """Test hashing an empty file"""
+        empty_path = os.path.join(self.temp_dir.name, "empty.mp4")
+        open(empty_path, "wb").close()
+
+        self.assertEqual(
+            upload.compute_sha256(empty_path), hashlib.sha256(b"").hexdigest()
+        )
+
+
+class TestCachedSha256(unittest.TestCase):
+    """Tests for the sidecar-cached SHA-256"""
+
+    def setUp(self):
+        """Set up the test environment"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.temp_dir.name, "video.mp4")
+        with open(self.file_path, "wb") as f:
+            f.write(b"video content")
+
+    def tearDown(self):
+        """Clean up the test environment"""
+        self.temp_dir.cleanup()
+
+    def test_hash_is_reused(self):
+        """Test that an unchanged file is not hashed again"""
+        expected = hashlib.sha256(b"video content").hexdigest()
+        self.assertEqual(upload._cached_sha256(self.file_path), expected)
+        self.assertTrue(os.path.exists(self.file_path + ".sha256"))
+        # No temporary file is left behind
+        self.assertEqual(
+            sorted(os.listdir(self.temp_dir.name)), ["video.mp4", "video.mp4.sha256"]
+        )
+
+        with patch.object(upload, "compute_sha256") as mock_compute:
+            self.assertEqual(upload._cached_sha256(self.file_path), expected)
+        mock_compute.assert_not_called()
+
+    def test_changed_file_is_rehashed(self):
+        """Test that a modified file invalidates the sidecar"""
+        upload._cached_sha256(self.file_path)
+
+        with open(self.file_path, "wb") as f:
+            f.write(b"new video content")
+
+        self.assertEqual(
+            upload._cached_sha256(self.file_path),
+            hashlib.sha256(b"new video content").hexdigest(),
+        )
+
+
+@unittest.skipUnless(upload._nostr_sdk_available(), "nostr-sdk not installed")
+class TestUploadToNostrmedia(unittest.TestCase):
+    """Tests for upload_to_nostrmedia"""
+
+    def setUp(self):
+        """Set up a video file and a private key"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.temp_dir.name, "video.mp4")
+        with open(self.file_path, "wb") as f:
+            f.write(b"video content")
+        self.file_hash = hashlib.sha256(b"video content").hexdigest()
+        self.private_key = upload.Keys.generate().secret_key().to_hex()
+
+    def tearDown(self):
+        """Clean up the test environment"""
+        self.temp_dir.cleanup()
+
+    @patch("src.nosvid.nostrmedia.upload._SESSION.post")
+    def test_upload_success(self, mock_post):
+        """Test a successful upload returns the URL and the file hash"""
+        mock_post.return_value = MagicMock(
+            status_code=200,
+            content=b"{}",
+            json=lambda: {"url": "https://nostrmedia.com/abc.mp4"},
+        )
+
+        result = upload.upload_to_nostrmedia(self.file_path, self.private_key)
+
+        self.assertTrue(result["success"])
+        self.assertEqual(result["url"], "https://nostrmedia.com/abc.mp4")
+        self.assertEqual(result["hash"], self.file_hash)
+        headers = mock_post.call_args.kwargs["headers"]
+        self.assertTrue(headers["Authorization"].startswith("Nostr "))
+        event = json.loads(base64.b64decode(headers["Authorization"][6:]))
+        self.assertIn(["x", self.file_hash], event["tags"])
+        self.assertIn(["ext", "mp4"], event["tags"])
+        self.assertTrue(headers["Content-Type"].startswith("multipart/form-data"))
+        self.assertEqual(
+            mock_post.call_args.kwargs["data"].fields["file"][2], "video/mp4"
+        )
+
+    @patch("src.nosvid.nostrmedia.upload._SESSION.post")
+    def test_upload_guesses_other_mime_types(self, mock_post):
+        """Test that extensions outside the video table still get a MIME type"""
+        mock_post.return_value = MagicMock(status_code=200, content=b"")
+        image_path = os.path.join(self.temp_dir.name, "thumbnail.png")
+        with open(image_path, "wb") as f:
+            f.write(b"image content")
+
+        upload.upload_to_nostrmedia(image_path, self.private_key)
+
+        self.assertEqual(
+            mock_post.call_args.kwargs["data"].fields["file"][2], "image/png"
+        )
+
+    @patch("src.nosvid.nostrmedia.upload._SESSION.post")
+    def test_upload_debug_output_is_logged(self, mock_post):
+        """Test that the event JSON is only logged in debug mode"""
+        mock_post.return_value = MagicMock(status_code=200, content=b"")
+
+        with patch("sys.stdout", new_callable=io.StringIO) as stdout:
+            upload.upload_to_nostrmedia(self.file_path, self.private_key)
+        self.assertNotIn("Event JSON", stdout.getvalue())
+
+        with self.assertLogs(upload.logger, logging.DEBUG) as logs:
+            upload.upload_to_nostrmedia(self.file_path, self.private_key, debug=True)
+        self.assertTrue(any("Event JSON" in line for line in logs.output))
+
+    @patch("src.nosvid.nostrmedia.upload._SESSION.post")
+    def test_upload_opens_file_once(self, mock_post):
+        """Test that the file is hashed and uploaded through one open"""
+        uploaded = []
+
+        def post(url, headers, data):
+            # Read the body while the file is still open
+            uploaded.append(data.to_string())
+            return MagicMock(status_code=200, content=b"")
+
+        mock_post.side_effect = post
+
+        with patch("builtins.open", wraps=open) as mock_open:
+            result = upload.upload_to_nostrmedia(self.file_path, self.private_key)
+
+        self.assertEqual(result["hash"], self.file_hash)
+        video_opens = [
+            c for c in mock_open.call_args_list if c.args[0] == self.file_path
+        ]
+        self.assertEqual(len(video_opens), 1)
+        self.assertIn(b"video content", uploaded[0])
+
+    @patch("src.nosvid.nostrmedia.upload._SESSION.post")
+    def test_upload_failure(self, mock_post):
+        """Test that a non-200 response is reported as a failure"""
+        mock_post.return_value = MagicMock(status_code=413, text="Too large")
+
+        result = upload.upload_to_nostrmedia(self.file_path, self.private_key)
+
+        self.assertFalse(result["success"])
+        self.assertEqual(result["response"], "Too large")
+
+    def test_create_signed_event(self):
+        """Test signing with and without the synchronous signer API"""
+        keys = upload.Keys.parse(self.private_key)
+
+        for sign_with_keys in (True, False):
+            with patch.object(upload, "_SIGN_WITH_KEYS", sign_with_keys):
+                event = upload.create_signed_event(keys, self.file_hash, "mp4")
+
+            self.assertTrue(event.verify())
+            self.assertEqual(event.author().to_hex(), keys.public_key().to_hex())
+
+    @patch("src.nosvid.nostrmedia.upload._SESSION.post")
+    def test_upload_many(self, mock_post):
+        """Test uploading several files returns a result per file in order"""
+        mock_post.return_value = MagicMock(status_code=200, content=b"")
+        other_path = os.path.join(self.temp_dir.name, "other.mp4")
+        with open(other_path, "wb") as f:
+            f.write(b"other content")
+        missing_path = os.path.join(self.temp_dir.name, "missing.mp4")
+
+        results = upload.upload_many_to_nostrmedia(
+            [self.file_path, missing_path, other_path], self.private_key
+        )
+
+        self.assertEqual(results[0]["hash"], self.file_hash)
+        self.assertFalse(results[1]["success"])
+        self.assertEqual(
+            results[2]["hash"], hashlib.sha256(b"other content").hexdigest()
+        )
+        self.assertEqual(mock_post.call_count, 2)
+
+    def test_invalid_private_key(self):
+        """Test that an invalid private key is rejected"""
+        result = upload.upload_to_nostrmedia(self.file_path, "not-a-key")
+
+        self.assertFalse(result["success"])
+        self.assertIn("Invalid private key", result["error"])
+
+
+class TestGetLoop(unittest.TestCase):
+    """Tests for the signing event loop"""
+
+    def test_loop_per_thread(self):
+        """Test that each thread reuses its own event loop"""
+        loop = upload._get_loop()
+        self.assertIs(upload._get_loop(), loop)
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            other = executor.submit(upload._get_loop).result()
+        self.assertIsNot(other, loop)
+        other.close()
+
+
+class TestConfigNsec(unittest.TestCase):
+    """Tests for reading the nsec from the config"""
+
+    def setUp(self):
+        """Point the config path at a temporary file"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.config_path = os.path.join(self.temp_dir.name, "config.yaml")
+        self.env = patch.dict(os.environ, {"NOSVID_CONFIG_PATH": self.config_path})
+        self.env.start()
+        upload._CONFIG_NSEC = None
+
+    def tearDown(self):
+        """Clean up the test environment"""
+        upload._CONFIG_NSEC = None
+        self.env.stop()
+        self.temp_dir.cleanup()
+
+    def test_config_is_read_once(self):
+        """Test that an unchanged config is not parsed again"""
+        with open(self.config_path, "w") as f:
+            f.write("nostr:\n  nsec: nsec1first\n")
+
+        self.assertEqual(upload._config_nsec(), "nsec1first")
+        with patch.object(upload, "get_nostr_key") as mock_get_key:
+            self.assertEqual(upload._config_nsec(), "nsec1first")
+        mock_get_key.assert_not_called()
+
+    def test_config_change_is_picked_up(self):
+        """Test that editing the config invalidates the cached nsec"""
+        with open(self.config_path, "w") as f:
+            f.write("nostr:\n  nsec: nsec1first\n")
+        upload._config_nsec()
+
+        with open(self.config_path, "w") as f:
+            f.write("nostr:\n  nsec: nsec1second\n")
+
+        self.assertEqual(upload._config_nsec(), "nsec1second")
+
+
+if __name__ == "__main__":
+    unittest.main()
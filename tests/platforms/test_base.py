@@ -0,0 +1,80 @@
+"""
+Tests for the shared platform functionality
+"""
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from src.nosvid.platforms import nostrmedia, youtube
+from src.nosvid.platforms.base import PlatformStore
+
+
+class TestPlatformStore(unittest.TestCase):
+    """Tests for PlatformStore"""
+
+    def test_is_activated(self):
+        """Test reading the activation flag of the platform"""
+        store = PlatformStore("youtube", "YouTube")
+        with patch(
+            "src.nosvid.platforms.base.load_config",
+            return_value={"youtube": {"activated": True}},
+        ) as mock_load:
+            self.assertTrue(store.is_activated())
+        # The flag is read from the shared config, without copying it
+        mock_load.assert_called_once_with(shared=True)
+
+        with patch("src.nosvid.platforms.base.load_config", return_value={}):
+            self.assertFalse(store.is_activated())
+
+    def test_check_activated_raises(self):
+        """Test that an inactive platform raises with the platform name"""
+        store = PlatformStore("nostrmedia", "Nostrmedia")
+        with patch("src.nosvid.platforms.base.load_config", return_value={}):
+            with self.assertRaisesRegex(ValueError, "nostrmedia.activated = true"):
+                store.check_activated()
+
+    def test_check_activated_stack_trace_only_at_debug(self):
+        """Test that the stack is only formatted if debug logging is enabled"""
+        store = PlatformStore("nostr", "Nostr")
+        with patch("src.nosvid.platforms.base.load_config", return_value={}), patch(
+            "src.nosvid.platforms.base.traceback.format_stack"
+        ) as mock_format_stack:
+            with self.assertLogs("src.nosvid.platforms.base", "ERROR"):
+                with self.assertRaises(ValueError):
+                    store.check_activated()
+            mock_format_stack.assert_not_called()
+
+            mock_format_stack.return_value = []
+            with self.assertLogs("src.nosvid.platforms.base", "DEBUG"):
+                with self.assertRaises(ValueError):
+                    store.check_activated()
+            mock_format_stack.assert_called_once()
+
+    def test_get_metadata_after_update_with_unchanged_mtime(self):
+        """Test that a new platform directory is seen despite a coarse mtime"""
+        store = PlatformStore("nostr", "Nostr")
+        with tempfile.TemporaryDirectory() as video_dir:
+            self.assertEqual(store.get_metadata(video_dir), {})
+
+            stat = os.stat(video_dir)
+            store.update_metadata(video_dir, {"posts": []})
+            # Pretend the filesystem didn't notice the new entry
+            os.utime(video_dir, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+            self.assertEqual(store.get_metadata(video_dir), {"posts": []})
+
+    def test_module_functions_use_store(self):
+        """Test that the platform modules keep their function names"""
+        self.assertEqual(
+            youtube.get_youtube_metadata, youtube.youtube_store.get_metadata
+        )
+        self.assertEqual(
+            nostrmedia.check_platform_activated,
+            nostrmedia.nostrmedia_store.check_activated,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
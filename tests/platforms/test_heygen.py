@@ -0,0 +1,105 @@
+"""
+Tests for the HeyGen platform module
+"""
+
+import io
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from src.nosvid.platforms import heygen
+
+
+class TestHeygenPlatform(unittest.TestCase):
+    """Tests for the HeyGen platform module"""
+
+    def setUp(self):
+        """Set up the test environment"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.output_path = os.path.join(self.temp_dir.name, "translated.mp4")
+
+    def tearDown(self):
+        """Clean up the test environment"""
+        heygen._ETAG_CACHE.clear()
+        self.temp_dir.cleanup()
+
+    @patch("src.nosvid.platforms.heygen._SESSION.get")
+    def test_download_translated_video(self, mock_get):
+        """Test that the response body is written to the output file"""
+        content = os.urandom((1 << 20) + 17)
+        mock_get.return_value = MagicMock(raw=io.BytesIO(content))
+
+        self.assertTrue(
+            heygen.download_translated_video(
+                "https://example.com/video.mp4", self.output_path
+            )
+        )
+
+        with open(self.output_path, "rb") as f:
+            self.assertEqual(f.read(), content)
+        self.assertTrue(mock_get.return_value.raw.decode_content)
+
+    @patch("src.nosvid.platforms.heygen._SESSION.get")
+    def test_download_translated_video_error(self, mock_get):
+        """Test that HTTP errors are reported as a failed download"""
+        mock_get.return_value.raise_for_status.side_effect = Exception("404")
+
+        self.assertFalse(
+            heygen.download_translated_video(
+                "https://example.com/video.mp4", self.output_path
+            )
+        )
+        self.assertFalse(os.path.exists(self.output_path))
+
+    @patch("src.nosvid.platforms.heygen.time.sleep")
+    @patch("src.nosvid.platforms.heygen.check_translation_status")
+    def test_wait_for_translation_backs_off(self, mock_check, mock_sleep):
+        """Test that status checks back off exponentially up to check_interval"""
+        pending = {"success": True, "status": "processing"}
+        done = {"success": True, "status": "success", "url": "https://x/y.mp4"}
+        mock_check.side_effect = [pending] * 6 + [done]
+
+        result = heygen.wait_for_translation("abc", "key", check_interval=30)
+
+        self.assertEqual(result, done)
+        self.assertEqual(
+            [c.args[0] for c in mock_sleep.call_args_list], [2, 4, 8, 16, 30, 30]
+        )
+
+    def test_get_iso_code(self):
+        """Test mapping language names and codes to ISO codes"""
+        self.assertEqual(heygen.get_iso_code("Spanish"), "es")
+        self.assertEqual(heygen.get_iso_code("spanish"), "es")
+        self.assertEqual(heygen.get_iso_code("DE"), "de")
+        self.assertEqual(heygen.get_iso_code("Klingon"), "klingon")
+
+    @patch("src.nosvid.platforms.heygen._SESSION.get")
+    def test_check_translation_status_revalidates(self, mock_get):
+        """Test that a repeated status check reuses the body on 304"""
+        body = {
+            "error": None,
+            "data": {
+                "video_translate_id": "abc",
+                "title": "Title",
+                "status": "processing",
+            },
+        }
+        mock_get.side_effect = [
+            MagicMock(status_code=200, headers={"ETag": '"v1"'}, json=lambda: body),
+            MagicMock(status_code=304, headers={}),
+        ]
+
+        first = heygen.check_translation_status("abc", "key")
+        second = heygen.check_translation_status("abc", "key")
+
+        self.assertEqual(second["status"], "processing")
+        self.assertEqual(second["title"], first["title"])
+        self.assertNotIn("If-None-Match", mock_get.call_args_list[0].kwargs["headers"])
+        self.assertEqual(
+            mock_get.call_args_list[1].kwargs["headers"]["If-None-Match"], '"v1"'
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -22,7 +22,7 @@ class TestNostrPlatform(unittest.TestCase):
         self.video_dir = self.temp_dir.name
 
         # Create a nostr platform directory
-        self.nostr_dir = os.path.join(self.video_dir, "platforms", "nostr")
+        self.nostr_dir = os.path.join(self.video_dir, "nostr")
         os.makedirs(self.nostr_dir, exist_ok=True)
 
         # Create test metadata
@@ -50,9 +50,9 @@ class TestNostrPlatform(unittest.TestCase):
     def test_get_nostr_metadata_empty(self):
         """Test getting Nostr metadata when no metadata exists"""
         # Mock the filesystem functions
-        with patch(
-            "src.nosvid.platforms.nostr.get_platform_dir"
-        ) as mock_get_dir, patch("os.path.exists", return_value=False):
+        with patch("src.nosvid.platforms.base.get_platform_dir") as mock_get_dir, patch(
+            "os.path.exists", return_value=False
+        ):
             # Set up the mock return value
             mock_get_dir.return_value = self.nostr_dir
 
@@ -63,11 +63,9 @@ class TestNostrPlatform(unittest.TestCase):
     def test_get_nostr_metadata(self):
         """Test getting Nostr metadata"""
         # Mock the filesystem functions
-        with patch(
-            "src.nosvid.platforms.nostr.get_platform_dir"
-        ) as mock_get_dir, patch("os.path.exists", return_value=True), patch(
-            "src.nosvid.platforms.nostr.load_json_file"
-        ) as mock_load:
+        with patch("src.nosvid.platforms.base.get_platform_dir") as mock_get_dir, patch(
+            "os.path.exists", return_value=True
+        ), patch("src.nosvid.platforms.base.load_json_file") as mock_load:
             # Set up the mock return values
             mock_get_dir.return_value = self.nostr_dir
             mock_load.return_value = self.test_metadata
@@ -85,10 +83,8 @@ class TestNostrPlatform(unittest.TestCase):
     def test_update_nostr_metadata(self):
         """Test updating Nostr metadata"""
         # Mock the filesystem functions
-        with patch(
-            "src.nosvid.platforms.nostr.get_platform_dir"
-        ) as mock_get_dir, patch(
-            "src.nosvid.platforms.nostr.save_json_file"
+        with patch("src.nosvid.platforms.base.get_platform_dir") as mock_get_dir, patch(
+            "src.nosvid.platforms.base.save_json_file"
         ) as mock_save:
             # Set up the mock return value
             mock_get_dir.return_value = self.nostr_dir
@@ -117,14 +113,15 @@ class TestNostrPlatform(unittest.TestCase):
 
     def test_get_nostr_posts_with_metadata(self):
         """Test getting Nostr posts with metadata"""
+        # Create the metadata file; its content comes from the mock below
+        open(os.path.join(self.nostr_dir, "metadata.json"), "w").close()
+
         # Mock the filesystem functions
         with patch(
             "src.nosvid.platforms.nostr.get_platform_dir"
-        ) as mock_get_dir, patch("os.path.exists", return_value=True), patch(
+        ) as mock_get_dir, patch(
             "src.nosvid.platforms.nostr.load_json_file"
-        ) as mock_load, patch(
-            "os.listdir", return_value=["metadata.json"]
-        ):
+        ) as mock_load:
             # Set up the mock return values
             mock_get_dir.return_value = self.nostr_dir
             mock_load.return_value = self.test_metadata
@@ -140,14 +137,16 @@ class TestNostrPlatform(unittest.TestCase):
 
     def test_get_nostr_posts_with_additional_files(self):
         """Test getting Nostr posts with additional metadata files"""
+        # Create the metadata files; their content comes from the mock below
+        for filename in ("metadata.json", "additional_event_id.json"):
+            open(os.path.join(self.nostr_dir, filename), "w").close()
+
         # Mock the filesystem functions
         with patch(
             "src.nosvid.platforms.nostr.get_platform_dir"
-        ) as mock_get_dir, patch("os.path.exists", return_value=True), patch(
+        ) as mock_get_dir, patch(
             "src.nosvid.platforms.nostr.load_json_file"
-        ) as mock_load, patch(
-            "os.listdir", return_value=["metadata.json", "additional_event_id.json"]
-        ):
+        ) as mock_load:
             # Set up the mock return values
             mock_get_dir.return_value = self.nostr_dir
 
@@ -169,16 +168,35 @@ class TestNostrPlatform(unittest.TestCase):
             self.assertEqual(posts[0]["event_id"], "additional_event_id")
             self.assertEqual(posts[1]["event_id"], self.test_metadata["event_id"])
 
+    def test_get_nostr_posts_deduplicates_event_ids(self):
+        """Test that a post in both metadata files is returned once"""
+        for filename, metadata in (
+            ("metadata.json", self.test_metadata),
+            ("test_event_id.json", dict(self.test_metadata, pubkey="own_file")),
+        ):
+            with open(os.path.join(self.nostr_dir, filename), "w") as f:
+                json.dump(metadata, f)
+
+        with patch(
+            "src.nosvid.platforms.nostr.get_platform_dir",
+            return_value=self.nostr_dir,
+        ):
+            posts = nostr.get_nostr_posts(self.video_dir)
+
+        self.assertEqual(len(posts), 1)
+        self.assertEqual(posts[0]["pubkey"], "own_file")
+
     def test_get_nostr_posts_with_error(self):
         """Test getting Nostr posts with an error loading metadata"""
+        # Create the metadata file; loading it fails through the mock below
+        open(os.path.join(self.nostr_dir, "metadata.json"), "w").close()
+
         # Mock the filesystem functions
         with patch(
             "src.nosvid.platforms.nostr.get_platform_dir"
-        ) as mock_get_dir, patch("os.path.exists", return_value=True), patch(
+        ) as mock_get_dir, patch(
             "src.nosvid.platforms.nostr.load_json_file"
-        ) as mock_load, patch(
-            "os.listdir", return_value=["metadata.json"]
-        ):
+        ) as mock_load:
             # Set up the mock return values
             mock_get_dir.return_value = self.nostr_dir
             mock_load.side_effect = Exception("Test exception")
@@ -189,14 +207,16 @@ class TestNostrPlatform(unittest.TestCase):
 
     def test_get_nostr_posts_with_additional_file_error(self):
         """Test getting Nostr posts with an error loading additional metadata"""
+        # Create the metadata files; their content comes from the mock below
+        for filename in ("metadata.json", "additional_event_id.json"):
+            open(os.path.join(self.nostr_dir, filename), "w").close()
+
         # Mock the filesystem functions
         with patch(
             "src.nosvid.platforms.nostr.get_platform_dir"
-        ) as mock_get_dir, patch("os.path.exists", return_value=True), patch(
+        ) as mock_get_dir, patch(
             "src.nosvid.platforms.nostr.load_json_file"
-        ) as mock_load, patch(
-            "os.listdir", return_value=["metadata.json", "additional_event_id.json"]
-        ):
+        ) as mock_load:
             # Set up the mock return values
             mock_get_dir.return_value = self.nostr_dir
 
@@ -6,9 +6,12 @@ import os
 import shutil
 import tempfile
 import unittest
+from unittest.mock import patch
 
 from src.nosvid.models.video import Platform, Video
+from src.nosvid.repo import video_repo
 from src.nosvid.repo.video_repo import FileSystemVideoRepo
+from src.nosvid.utils.filesystem import save_json_file
 
 
 class TestFileSystemVideoRepo(unittest.TestCase):
@@ -64,6 +67,30 @@ class TestFileSystemVideoRepo(unittest.TestCase):
         self.assertEqual(video.published_at, self.video1.published_at)
         self.assertEqual(video.duration, self.video1.duration)
 
+    def test_save_many(self):
+        """Test saving several videos at once"""
+        saved = self.repo.save_many(
+            [self.video1, self.video2, self.video3], self.channel_title
+        )
+        self.assertEqual(saved, 3)
+        self.assertEqual(len(self.repo.list(self.channel_title)), 3)
+
+    def test_directory_structure_is_set_up_once(self):
+        """Test that the channel directories are only set up on first use"""
+        with patch.object(
+            video_repo,
+            "setup_directory_structure",
+            wraps=video_repo.setup_directory_structure,
+        ) as setup:
+            self.repo.save(self.video1, self.channel_title)
+            self.repo.get_by_id("video1", self.channel_title)
+            self.repo.list(self.channel_title)
+            self.repo.delete("video1", self.channel_title)
+            # Also across repositories, as the API creates one per request
+            FileSystemVideoRepo(self.temp_dir).list(self.channel_title)
+
+        setup.assert_called_once_with(self.temp_dir, self.channel_title)
+
     def test_get_by_id_not_found(self):
         """Test retrieving a video by ID that doesn't exist"""
         video = self.repo.get_by_id("nonexistent", self.channel_title)
@@ -122,6 +149,18 @@ class TestFileSystemVideoRepo(unittest.TestCase):
         self.assertEqual(len(videos), 1)
         self.assertEqual(videos[0].video_id, self.video2.video_id)
 
+    def test_list_with_pagination_ascending(self):
+        """Test paginating videos sorted in ascending order"""
+        self.repo.save(self.video1, self.channel_title)
+        self.repo.save(self.video2, self.channel_title)
+        self.repo.save(self.video3, self.channel_title)
+
+        videos = self.repo.list(
+            self.channel_title, limit=2, offset=1, sort_by="duration", sort_order="asc"
+        )
+
+        self.assertEqual([v.video_id for v in videos], ["video2", "video3"])
+
     def test_list_with_sorting(self):
         """Test listing videos with sorting"""
         # Save some videos
@@ -160,6 +199,123 @@ class TestFileSystemVideoRepo(unittest.TestCase):
         self.assertEqual(videos[1].video_id, self.video2.video_id)
         self.assertEqual(videos[2].video_id, self.video3.video_id)
 
+    def test_list_loads_in_parallel(self):
+        """Test that loading many videos in threads keeps the same result"""
+        for i in range(20):
+            self.repo.save(
+                Video(
+                    video_id=f"video{i:02}",
+                    title=f"Video {i % 3}",
+                    published_at=f"2023-01-{i + 1:02}T12:00:00",
+                    duration=i,
+                ),
+                self.channel_title,
+            )
+        serial_repo = FileSystemVideoRepo(self.temp_dir, load_workers=1)
+
+        for kwargs in ({}, {"sort_by": "title", "limit": 5, "offset": 3}):
+            self.assertEqual(
+                [v.video_id for v in self.repo.list(self.channel_title, **kwargs)],
+                [v.video_id for v in serial_repo.list(self.channel_title, **kwargs)],
+            )
+        self.assertEqual(len(self.repo.list(self.channel_title)), 20)
+
+    def test_list_falls_back_to_channel_metadata(self):
+        """Test that videos without metadata.json are listed from channel metadata"""
+        self.repo.save(self.video1, self.channel_title)
+        channel_dir = os.path.join(self.temp_dir, self.channel_title)
+        for video_id in ("video2", "video3"):
+            os.makedirs(os.path.join(channel_dir, "videos", video_id))
+        save_json_file(
+            os.path.join(channel_dir, "metadata", "channel_videos_1.json"),
+            {
+                "videos": [
+                    {"video_id": "video2", "title": "From channel 2"},
+                    {"video_id": "video3", "title": "From channel 3"},
+                ]
+            },
+        )
+
+        with patch.object(video_repo.glob, "glob", wraps=video_repo.glob.glob) as g:
+            videos = self.repo.list(self.channel_title, sort_by="title")
+
+        self.assertEqual(
+            [v.title for v in videos],
+            ["Test Video 1", "From channel 3", "From channel 2"],
+        )
+        # The channel metadata is scanned once, not once per video
+        self.assertEqual(g.call_count, 1)
+
+    def test_aggregate_stats(self):
+        """Test counting videos, reusing the counts of unchanged videos"""
+        self.video1.platforms["youtube"] = Platform(
+            name="youtube", url="yt/1", downloaded=True
+        )
+        self.video1.platforms["nostrmedia"] = Platform(name="nostrmedia", url="nm/1")
+        self.video2.npubs = {"chat": ["npub1", "npub2"], "description": ["npub3"]}
+        for video in (self.video1, self.video2):
+            self.repo.save(video, self.channel_title)
+        channel_dir = os.path.join(self.temp_dir, self.channel_title)
+        os.makedirs(os.path.join(channel_dir, "videos", "video3"))
+        save_json_file(
+            os.path.join(channel_dir, "metadata", "channel_videos_1.json"),
+            {"videos": [{"video_id": "video3", "title": "From channel 3"}]},
+        )
+
+        expected = {
+            "total_with_metadata": 3,
+            "total_downloaded": 1,
+            "total_uploaded_nm": 1,
+            "total_posted_nostr": 0,
+            "total_with_npubs": 1,
+            "total_npubs": 3,
+        }
+        self.assertEqual(self.repo.aggregate_stats(self.channel_title), expected)
+        # The same as counting the listed videos
+        self.assertEqual(
+            video_repo.VideoRepo.aggregate_stats(self.repo, self.channel_title),
+            expected,
+        )
+
+        with patch.object(
+            video_repo, "load_json_file", wraps=video_repo.load_json_file
+        ) as mock_load:
+            # A new repository, as the API creates per request, reads nothing
+            FileSystemVideoRepo(self.temp_dir).aggregate_stats(self.channel_title)
+            mock_load.assert_not_called()
+
+            self.repo.delete("video2", self.channel_title)
+            stats = self.repo.aggregate_stats(self.channel_title)
+        self.assertEqual(stats["total_with_metadata"], 2)
+        self.assertEqual(stats["total_npubs"], 0)
+
+    def test_get_by_id_caches_channel_metadata(self):
+        """Test that the channel metadata is only re-read after it changes"""
+        channel_file = os.path.join(
+            self.temp_dir, self.channel_title, "metadata", "channel_videos_1.json"
+        )
+        save_json_file(
+            channel_file, {"videos": [{"video_id": "video2", "title": "Old"}]}
+        )
+
+        with patch.object(
+            video_repo, "load_json_file", wraps=video_repo.load_json_file
+        ) as load:
+            self.assertEqual(
+                self.repo.get_by_id("video2", self.channel_title).title, "Old"
+            )
+            # Also across repositories, as the API creates one per request
+            repo = FileSystemVideoRepo(self.temp_dir)
+            self.assertIsNone(repo.get_by_id("missing", self.channel_title))
+            self.assertEqual(load.call_count, 1)
+
+        save_json_file(
+            channel_file, {"videos": [{"video_id": "video2", "title": "Newer"}]}
+        )
+        self.assertEqual(
+            self.repo.get_by_id("video2", self.channel_title).title, "Newer"
+        )
+
     def test_delete(self):
         """Test deleting a video"""
         # Save a video
@@ -177,6 +333,25 @@ class TestFileSystemVideoRepo(unittest.TestCase):
         video = self.repo.get_by_id(self.video1.video_id, self.channel_title)
         self.assertIsNone(video)
 
+    def test_delete_platform_files(self):
+        """Test deleting a video with platform files, keeping symlink targets"""
+        self.repo.save(self.video1, self.channel_title)
+        video_dir = os.path.join(
+            self.temp_dir, self.channel_title, "videos", self.video1.video_id
+        )
+        os.makedirs(os.path.join(video_dir, "youtube", "subtitles"))
+        open(os.path.join(video_dir, "youtube", "video.mp4"), "w").close()
+        open(os.path.join(video_dir, "youtube", "subtitles", "en.vtt"), "w").close()
+        outside_dir = os.path.join(self.temp_dir, "outside")
+        os.makedirs(outside_dir)
+        open(os.path.join(outside_dir, "keep.txt"), "w").close()
+        os.symlink(outside_dir, os.path.join(video_dir, "link"))
+
+        self.assertTrue(self.repo.delete(self.video1.video_id, self.channel_title))
+
+        self.assertFalse(os.path.exists(video_dir))
+        self.assertTrue(os.path.exists(os.path.join(outside_dir, "keep.txt")))
+
     def test_delete_not_found(self):
         """Test deleting a video that doesn't exist"""
         result = self.repo.delete("nonexistent", self.channel_title)
@@ -2,13 +2,16 @@
 Tests for the ConfigService
 """
 
+import glob
 import os
 import tempfile
 import unittest
+from unittest.mock import patch
 
 import yaml
 
 from src.nosvid.services.config_service import ConfigService
+from src.nosvid.utils.config import load_config
 
 
 class TestConfigService(unittest.TestCase):
@@ -56,6 +59,15 @@ class TestConfigService(unittest.TestCase):
         # Test getting a value that doesn't exist with a default
         self.assertEqual(self.config_service.get("nonexistent", "default"), "default")
 
+    def test_get_top_level_key_skips_flat_index(self):
+        """Test that top-level keys are looked up without the flat index"""
+        with patch("src.nosvid.services.config_service._flatten") as mock_flatten:
+            self.assertEqual(
+                self.config_service.get("channel"), {"title": "TestChannel"}
+            )
+            self.assertEqual(self.config_service.get("missing", 1), 1)
+        mock_flatten.assert_not_called()
+
     def test_set(self):
         """Test setting a configuration value"""
         # Test setting a top-level value
@@ -70,6 +82,17 @@ class TestConfigService(unittest.TestCase):
         self.config_service.set("youtube.api_key", "new_api_key")
         self.assertEqual(self.config_service.get("youtube.api_key"), "new_api_key")
 
+    def test_get_cache_invalidated_by_set(self):
+        """Test that cached lookups, including misses, see later set() calls"""
+        self.assertIsNone(self.config_service.get("test.nested"))
+        self.assertEqual(self.config_service.get("youtube.api_key"), "test_api_key")
+
+        self.config_service.set("test.nested", "nested_value")
+        self.config_service.set("youtube.api_key", "new_api_key")
+
+        self.assertEqual(self.config_service.get("test.nested"), "nested_value")
+        self.assertEqual(self.config_service.get("youtube.api_key"), "new_api_key")
+
     def test_save(self):
         """Test saving configuration to file"""
         # Set a new value
@@ -85,6 +108,96 @@ class TestConfigService(unittest.TestCase):
         # Check that the new value was saved
         self.assertEqual(config["test"], "value")
 
+    def test_config_is_parsed_once(self):
+        """Test that services for an unchanged file share the parsed config"""
+        self.config_service.get_channel_title()
+
+        with patch("src.nosvid.utils.config.yaml.load") as mock_load:
+            other = ConfigService(self.temp_file.name)
+            other.get_channel_title()
+        mock_load.assert_not_called()
+
+        # Each service still gets its own copy
+        other.set("channel.title", "Other")
+        self.assertEqual(self.config_service.get_channel_title(), "TestChannel")
+
+    def test_set_copies_on_write(self):
+        """Test that set() leaves the shared config and other subtrees alone"""
+        shared = load_config(self.temp_file.name, shared=True)
+        self.config_service.set("nostr.nsec", "changed")
+
+        self.assertEqual(shared["nostr"]["nsec"], "test_nsec")
+        self.assertEqual(self.config_service.get("nostr.nsec"), "changed")
+        self.assertEqual(self.config_service.get("nostr.npub"), "test_npub")
+        # The untouched subtree is still the shared one
+        self.assertIs(self.config_service.config["youtube"], shared["youtube"])
+
+    def test_get_subtree_is_plain_dict(self):
+        """Test that subtrees are returned as modifiable dictionaries"""
+        subtree = self.config_service.get("youtube")
+        self.assertIs(type(subtree), dict)
+        subtree["api_key"] = "modified"
+        self.assertEqual(self.config_service.get_api_key("youtube"), "test_api_key")
+
+    def test_save_is_seen_by_new_services(self):
+        """Test that a saved config is loaded by services created afterwards"""
+        self.config_service.set("channel.title", "Saved")
+        self.config_service.save()
+
+        self.assertEqual(
+            ConfigService(self.temp_file.name).get_channel_title(), "Saved"
+        )
+
+    def test_save_round_trip(self):
+        """Test that saved configs load back unchanged, JSON or YAML"""
+        for value in ("Zürich", 1.5, 1e20, [1, None, True], {"nested": "x"}):
+            self.config_service.set("test.value", value)
+            self.config_service.save()
+
+            self.assertEqual(
+                ConfigService(self.temp_file.name).get("test.value"), value
+            )
+        self.assertEqual(
+            ConfigService(self.temp_file.name).get("youtube.api_key"), "test_api_key"
+        )
+
+    def test_save_without_changes_does_not_write(self):
+        """Test that saving an unchanged config leaves the file alone"""
+        with patch(
+            "src.nosvid.services.config_service._dump_config", return_value=""
+        ) as mock_dump:
+            self.config_service.save()
+            mock_dump.assert_not_called()
+
+            self.config_service.set("test", "value")
+            self.config_service.save()
+            self.config_service.save()
+            mock_dump.assert_called_once()
+
+        # Only the config file is left behind
+        self.assertEqual(glob.glob(self.temp_file.name + ".*.tmp"), [])
+
+    def test_save_after_assigning_config(self):
+        """Test that an assigned config is written by save"""
+        self.config_service.config = {"channel": {"title": "Assigned"}}
+        self.config_service.save()
+
+        with open(self.temp_file.name) as f:
+            self.assertEqual(yaml.safe_load(f), {"channel": {"title": "Assigned"}})
+
+    def test_config_is_loaded_lazily(self):
+        """Test that the config file is only read when a value is needed"""
+        with patch(
+            "src.nosvid.services.config_service.load_config",
+            return_value={"channel": {"title": "Lazy"}},
+        ) as mock_load:
+            service = ConfigService(self.temp_file.name)
+            mock_load.assert_not_called()
+
+            self.assertEqual(service.get_channel_title(), "Lazy")
+            self.assertEqual(service.get("channel.title"), "Lazy")
+        mock_load.assert_called_once()
+
     def test_get_api_key(self):
         """Test getting an API key"""
         self.assertEqual(self.config_service.get_api_key("youtube"), "test_api_key")
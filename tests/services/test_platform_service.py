@@ -0,0 +1,58 @@
+"""
+Tests for the PlatformService
+"""
+
+import unittest
+from unittest.mock import MagicMock, patch
+
+from src.nosvid.services import platform_service
+from src.nosvid.services.platform_service import PlatformService
+
+
+class TestPlatformService(unittest.TestCase):
+    """Tests for the PlatformService"""
+
+    def setUp(self):
+        """Set up the test environment"""
+        self.service = PlatformService(
+            {
+                "youtube": {"activated": True},
+                "nostr": {"activated": False},
+                "heygen": {"api_key": "key"},
+                "custom": {"activated": True},
+            }
+        )
+
+    def test_is_platform_activated(self):
+        """Test reading the activation flags"""
+        self.assertTrue(self.service.is_platform_activated("youtube"))
+        self.assertFalse(self.service.is_platform_activated("nostr"))
+        self.assertFalse(self.service.is_platform_activated("heygen"))
+        self.assertFalse(self.service.is_platform_activated("missing"))
+
+    def test_check_platform_activated_uses_platform_check(self):
+        """Test that known platforms are checked by their platform module"""
+        nostr_check = MagicMock(side_effect=ValueError("inactive"))
+        with patch.object(platform_service, "_get_checker", return_value=nostr_check):
+            with self.assertRaisesRegex(ValueError, "inactive"):
+                self.service.check_platform_activated("nostr")
+        nostr_check.assert_called_once_with()
+
+    def test_get_checker(self):
+        """Test resolving the platform modules' checks"""
+        from src.nosvid.platforms import nostr
+
+        self.assertIs(
+            platform_service._get_checker("nostr"), nostr.check_platform_activated
+        )
+        self.assertIsNone(platform_service._get_checker("heygen"))
+
+    def test_check_platform_activated_unknown_platform(self):
+        """Test the default check for platforms without a module"""
+        self.service.check_platform_activated("custom")
+        with self.assertRaisesRegex(ValueError, "heygen.activated = true"):
+            self.service.check_platform_activated("heygen")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,517 @@
+"""
+Tests for the SchedulerService
+"""
+
+import os
+import tempfile
+import threading
+import unittest
+from concurrent.futures import Future
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+from zoneinfo import ZoneInfo
+
+from apscheduler.triggers.cron import CronTrigger
+
+from src.nosvid.services import scheduler_service
+from src.nosvid.utils.filesystem import save_json_file
+
+# TestSchedulerService replaces the scheduler with a mock
+JobScheduler = scheduler_service.JobScheduler
+
+
+class TestTrigger(unittest.TestCase):
+    """Tests for the cached cron triggers"""
+
+    def test_trigger_is_parsed_once(self):
+        """Test that an expression is parsed once and the trigger reused"""
+        trigger = scheduler_service._trigger("*/5 * * * *")
+
+        self.assertIsInstance(trigger, scheduler_service.SimpleCronTrigger)
+        self.assertIs(scheduler_service._trigger("*/5 * * * *"), trigger)
+        self.assertIsNot(scheduler_service._trigger("0 2 * * *"), trigger)
+
+    def test_simple_trigger_matches_cron_trigger(self):
+        """Test that simple schedules run when their CronTrigger would"""
+        expressions = ("*/5 * * * *", "0 * * * *", "0 2 * * *", "0 3 * * 0")
+        for tz in ("UTC", "Europe/Berlin"):
+            for expression in expressions:
+                cron = CronTrigger.from_crontab(expression, timezone=tz)
+                trigger = scheduler_service.SimpleCronTrigger.from_crontab(expression)
+                trigger.cron = cron
+
+                # Steps of 7h 13m 17s cover all minutes and weekdays, and
+                # the daylight saving time change on 2024-03-31
+                now = datetime(2024, 3, 20, tzinfo=timezone.utc)
+                for _ in range(200):
+                    self.assertEqual(
+                        trigger.get_next_fire_time(None, now),
+                        cron.get_next_fire_time(None, now),
+                        (tz, expression, now),
+                    )
+                    now += timedelta(hours=7, minutes=13, seconds=17)
+
+    def test_simple_trigger_in_repeated_hour(self):
+        """Test runs after a previous run in the hour repeated at DST end"""
+        tz = ZoneInfo("America/New_York")
+        for expression in ("30 * * * *", "*/15 * * * *", "45 1 * * *"):
+            cron = CronTrigger.from_crontab(expression, timezone=tz)
+            trigger = scheduler_service.SimpleCronTrigger.from_crontab(expression)
+            trigger.cron = cron
+
+            # 06:02:30 UTC, the second 01:02:30 of the day
+            previous = datetime(2024, 11, 3, 1, 2, 30, tzinfo=tz, fold=1)
+            now = previous.astimezone(timezone.utc) + timedelta(seconds=1)
+            run = trigger.get_next_fire_time(previous, now)
+
+            self.assertEqual(run, cron.get_next_fire_time(previous, now), expression)
+            self.assertGreater(run, previous.astimezone(timezone.utc), expression)
+
+    def test_complex_expression_uses_cron_trigger(self):
+        """Test that other expressions are left to CronTrigger"""
+        for expression in ("*/7 * * * *", "0 9-17 * * 1-5", "30 4 1 * *"):
+            self.assertIsInstance(
+                scheduler_service.SimpleCronTrigger.from_crontab(expression),
+                CronTrigger,
+            )
+
+
+class SoonTrigger:
+    """Trigger that fires a moment after it is asked"""
+
+    def get_next_fire_time(self, previous_fire_time, now):
+        return now + timedelta(milliseconds=20)
+
+
+class TestJobScheduler(unittest.TestCase):
+    """Tests for the JobScheduler"""
+
+    def setUp(self):
+        """Set up a running scheduler"""
+        self.scheduler = scheduler_service.JobScheduler()
+        self.scheduler.start()
+        self.addCleanup(self.scheduler.shutdown)
+
+    def test_add_job_computes_next_run_time(self):
+        """Test that a job gets the next run time of its cron trigger"""
+        job = self.scheduler.add_job(
+            lambda: None, trigger=scheduler_service._trigger("*/5 * * * *"), id="x"
+        )
+
+        self.assertIs(self.scheduler.get_job("x"), job)
+        self.assertGreater(job.next_run_time, datetime.now(timezone.utc))
+        self.assertEqual(job.next_run_time.minute % 5, 0)
+        with self.assertRaises(ValueError):
+            self.scheduler.add_job(lambda: None, trigger=SoonTrigger(), id="x")
+
+    def test_listener_sees_next_run_times(self):
+        """Test that listeners are called with every computed next run time"""
+        next_runs = []
+        scheduled = threading.Semaphore(0)
+
+        def listener(job):
+            next_runs.append(job.next_run_time)
+            scheduled.release()
+
+        self.scheduler.add_listener(listener)
+        job = self.scheduler.add_job(lambda: None, trigger=SoonTrigger(), id="x")
+        self.assertEqual(next_runs, [job.next_run_time])
+
+        # And again after each run
+        for _ in range(3):
+            self.assertTrue(scheduled.acquire(timeout=5))
+        self.assertGreater(next_runs[-1], next_runs[0])
+
+    def test_job_runs_until_paused(self):
+        """Test that due jobs run, and paused ones don't until resumed"""
+        runs = threading.Semaphore(0)
+        self.scheduler.add_job(runs.release, trigger=SoonTrigger(), id="x")
+        self.assertTrue(runs.acquire(timeout=5))
+        self.assertTrue(runs.acquire(timeout=5))
+
+        self.scheduler.pause_job("x")
+        self.assertIsNone(self.scheduler.get_job("x").next_run_time)
+        # Drain a run that was already under way
+        runs.acquire(timeout=0.2)
+        self.assertFalse(runs.acquire(timeout=0.2))
+
+        self.scheduler.resume_job("x")
+        self.assertTrue(runs.acquire(timeout=5))
+
+    def test_job_runs_in_its_executor(self):
+        """Test that jobs run in the thread pool they were added to"""
+        threads = []
+        done = threading.Event()
+
+        def record():
+            threads.append(threading.current_thread().name)
+            done.set()
+
+        self.scheduler.add_job(
+            record, trigger=SoonTrigger(), id="x", executor="io_heavy"
+        )
+        self.assertTrue(done.wait(timeout=5))
+        self.scheduler.pause_job("x")
+        self.assertTrue(threads[0].startswith("nosvid-io_heavy"))
+
+        with self.assertRaises(ValueError):
+            self.scheduler.add_job(
+                record, trigger=SoonTrigger(), id="y", executor="missing"
+            )
+
+    def test_late_run_is_skipped(self):
+        """Test that a run later than the misfire grace time is skipped"""
+        next_runs = [timedelta(seconds=-120), timedelta(hours=1)]
+        rescheduled = threading.Event()
+
+        class LateTrigger:
+            def get_next_fire_time(self, previous_fire_time, now):
+                if len(next_runs) == 1:
+                    rescheduled.set()
+                return now + next_runs.pop(0)
+
+        runs = []
+        self.scheduler.add_job(lambda: runs.append(1), trigger=LateTrigger(), id="x")
+
+        self.assertTrue(rescheduled.wait(timeout=5))
+        self.assertEqual(runs, [])
+
+
+class TestSchedulerService(unittest.TestCase):
+    """Tests for the SchedulerService"""
+
+    def setUp(self):
+        """Set up a service with a mocked scheduler"""
+        patcher = patch.object(scheduler_service, "JobScheduler")
+        self.mock_scheduler = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+        self.mock_scheduler.running = False
+
+        # Keep track of the added jobs like the scheduler would
+        self.scheduled_jobs = {}
+
+        def add_job(func, trigger, id, replace_existing, executor="default"):
+            job = self.scheduled_jobs[id] = MagicMock(
+                func=func, executor=executor, next_run_time=None
+            )
+            return job
+
+        def submit(func, executor="default"):
+            future = Future()
+            future.set_result(func())
+            return future
+
+        self.mock_scheduler.add_job.side_effect = add_job
+        self.mock_scheduler.submit.side_effect = submit
+        self.mock_scheduler.get_job.side_effect = self.scheduled_jobs.get
+        self.service = scheduler_service.SchedulerService()
+
+    def tearDown(self):
+        """Stop the download pool"""
+        self.service._download_pool.shutdown()
+
+    def test_get_scheduler_returns_one_service(self):
+        """Test that get_scheduler creates the service once"""
+        with patch.object(scheduler_service, "_INSTANCE", None), patch.object(
+            scheduler_service, "SchedulerService", return_value=self.service
+        ) as mock_service:
+            self.assertIs(scheduler_service.get_scheduler(), self.service)
+            self.assertIs(scheduler_service.get_scheduler(), self.service)
+        mock_service.assert_called_once_with()
+
+    def test_hardcoded_jobs_are_registered(self):
+        """Test that every job spec is added to the scheduler"""
+        self.assertEqual(
+            [job["id"] for job in self.service.get_all_jobs()],
+            [spec.id for spec in scheduler_service.JOB_SPECS],
+        )
+        self.assertEqual(
+            self.service.get_job("hourly_sync")["args"],
+            ["--force-refresh", "--max-videos", "5"],
+        )
+        self.assertEqual(
+            [call[1]["id"] for call in self.mock_scheduler.add_job.call_args_list],
+            ["hourly_sync", "five_minute_tick", "daily_download", "weekly_nostr"],
+        )
+
+    def test_next_run_is_pushed_by_the_scheduler(self):
+        """Test that next run times come from the scheduler's listener"""
+        self.mock_scheduler.add_listener.assert_called_once_with(
+            self.service._on_job_scheduled
+        )
+        next_run = datetime(2030, 1, 1, 0, 5, tzinfo=timezone.utc)
+        self.service._on_job_scheduled(
+            MagicMock(id="five_minute_tick", next_run_time=next_run)
+        )
+
+        jobs = {job["id"]: job for job in self.service.get_all_jobs()}
+        for job_id in ("regular_sync", "regular_download", "regular_nostrmedia"):
+            self.assertEqual(jobs[job_id]["next_run"], next_run.isoformat())
+        self.assertIsNone(jobs["hourly_sync"]["next_run"])
+        self.mock_scheduler.get_job.reset_mock()
+
+        # Reads neither ask the scheduler nor hand out the metadata itself
+        self.service.get_job("regular_sync")["next_run"] = None
+        self.assertEqual(
+            self.service.get_job("regular_sync")["next_run"], next_run.isoformat()
+        )
+        self.mock_scheduler.get_job.assert_not_called()
+
+    def test_next_run_with_real_scheduler(self):
+        """Test that every job's next run is known from the start"""
+        with patch.object(scheduler_service, "JobScheduler", JobScheduler):
+            service = scheduler_service.SchedulerService()
+        self.addCleanup(service.shutdown)
+
+        jobs = {job["id"]: job for job in service.get_all_jobs()}
+        self.assertTrue(all(job["next_run"] for job in jobs.values()))
+        self.assertEqual(
+            jobs["regular_sync"]["next_run"], jobs["regular_nostrmedia"]["next_run"]
+        )
+
+        self.assertTrue(service.disable_job("daily_download"))
+        self.assertTrue(service.enable_job("daily_download"))
+        self.assertEqual(
+            service.get_job("daily_download")["next_run"],
+            jobs["daily_download"]["next_run"],
+        )
+
+    def test_five_minute_tick_runs_enabled_phases_in_order(self):
+        """Test that the tick runs the enabled five-minute jobs in order"""
+        self.assertTrue(self.service.disable_job("regular_download"))
+        self.mock_scheduler.pause_job.assert_not_called()
+
+        calls = []
+        with patch.object(
+            self.service, "_run_regular_sync_job", lambda: calls.append("sync")
+        ), patch.object(
+            self.service, "_run_regular_download_job", lambda: calls.append("dl")
+        ), patch.object(
+            self.service, "_run_regular_nostrmedia_job", lambda: calls.append("nm")
+        ):
+            self.service._run_five_minute_tick()
+            self.assertEqual(calls, ["sync", "nm"])
+
+            self.assertTrue(self.service.enable_job("regular_download"))
+            calls.clear()
+            self.service._run_five_minute_tick()
+            self.assertEqual(calls, ["sync", "dl", "nm"])
+
+        self.assertEqual(
+            [call[0][1] for call in self.mock_scheduler.submit.call_args_list],
+            ["io_heavy", "io_heavy"],
+        )
+        self.assertEqual(self.scheduled_jobs["daily_download"].executor, "io_heavy")
+        self.assertEqual(self.scheduled_jobs["hourly_sync"].executor, "default")
+
+    def test_five_minute_tick_skips_running_downloads(self):
+        """Test that the tick syncs while the last downloads are running"""
+        self.service._tick_io_future = Future()
+        calls = []
+        with patch.object(
+            self.service, "_run_regular_sync_job", lambda: calls.append("sync")
+        ), patch.object(
+            self.service, "_run_regular_download_job", lambda: calls.append("dl")
+        ):
+            self.service._run_five_minute_tick()
+
+        self.assertEqual(calls, ["sync"])
+        self.mock_scheduler.submit.assert_not_called()
+
+    def test_enable_job_re_adds_missing_job(self):
+        """Test that enabling a removed job adds it with its own handler"""
+        del self.scheduled_jobs["hourly_sync"]
+        self.mock_scheduler.add_job.reset_mock()
+
+        self.assertTrue(self.service.enable_job("hourly_sync"))
+
+        args, kwargs = self.mock_scheduler.add_job.call_args
+        self.assertEqual(args[0], self.service._run_sync_job)
+        self.assertIs(kwargs["trigger"], scheduler_service._trigger("0 * * * *"))
+
+    def test_config_is_resolved_once(self):
+        """Test that the jobs use the config looked up at init"""
+        self.service._repository_dir = "/repo"
+        self.service._videos_dir = os.path.join("/repo", "Einundzwanzig", "videos")
+
+        with patch.object(
+            scheduler_service, "get_repository_dir"
+        ) as mock_get_dir, patch.object(
+            scheduler_service, "list_videos", return_value=([], 0)
+        ) as mock_list:
+            self.service._run_download_job()
+
+        mock_get_dir.assert_not_called()
+        self.assertEqual(mock_list.call_args[0][0], self.service._videos_dir)
+
+    def test_scan_is_shared_between_jobs(self):
+        """Test that jobs reuse a recent scan until a job changes a video"""
+        videos = [
+            {"video_id": "a", "downloaded": True},
+            {"video_id": "b", "downloaded": False},
+        ]
+        with patch.object(
+            scheduler_service, "list_videos", return_value=(videos, {})
+        ) as mock_list, patch.object(
+            scheduler_service, "download_video", return_value=True
+        ) as mock_download:
+            self.service._scan_videos()
+            self.service._run_download_job()
+            self.assertEqual(mock_list.call_count, 1)
+            self.assertEqual(mock_download.call_args[1]["video_id"], "b")
+
+            # The download dropped the scan
+            self.service._scan_videos()
+            self.assertEqual(mock_list.call_count, 2)
+
+            self.service._scan_videos(max_age=0)
+            self.assertEqual(mock_list.call_count, 3)
+
+    def test_regular_download_job_downloads_five_videos(self):
+        """Test that the regular job downloads up to five videos in the pool"""
+        videos = [{"video_id": str(i), "downloaded": False} for i in range(7)]
+        with patch.object(
+            scheduler_service, "list_videos", return_value=(videos, {})
+        ), patch.object(
+            scheduler_service, "download_video", side_effect=lambda **kw: kw
+        ) as mock_download:
+            self.service._run_regular_download_job()
+
+        self.assertEqual(
+            sorted(call[1]["video_id"] for call in mock_download.call_args_list),
+            ["0", "1", "2", "3", "4"],
+        )
+
+    def test_video_being_downloaded_is_skipped(self):
+        """Test that the download jobs don't download the same video twice"""
+        videos = [{"video_id": "a", "downloaded": False}]
+        self.service._downloading.add("a")
+        with patch.object(
+            scheduler_service, "list_videos", return_value=(videos, {})
+        ), patch.object(scheduler_service, "download_video") as mock_download:
+            self.service._run_download_job()
+            self.service._run_regular_download_job()
+        mock_download.assert_not_called()
+
+        # Failed downloads are released for the next run
+        with patch.object(
+            scheduler_service, "download_video", side_effect=RuntimeError
+        ):
+            self.assertEqual(self.service._download_videos(["b"]), 0)
+        self.assertEqual(self.service._downloading, {"a"})
+
+    def test_nostrmedia_job_uploads_mp4_file(self):
+        """Test that the nostrmedia job uploads the video's mp4 file"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            self.service._channel_dir = temp_dir
+            self.service._videos_dir = os.path.join(temp_dir, "videos")
+            youtube_dir = os.path.join(self.service._videos_dir, "abc", "youtube")
+            os.makedirs(os.path.join(youtube_dir, "folder.mp4"))
+            for name in ("video.info.json", "video.mp4"):
+                open(os.path.join(youtube_dir, name), "w").close()
+
+            videos = [{"video_id": "abc", "downloaded": True}]
+            with patch.object(
+                scheduler_service, "list_videos", return_value=(videos, {})
+            ), patch.object(
+                scheduler_service, "upload_to_nostrmedia", return_value=None
+            ) as mock_upload:
+                self.service._run_regular_nostrmedia_job()
+
+        mock_upload.assert_called_once_with(
+            file_path=os.path.join(youtube_dir, "video.mp4"), debug=False
+        )
+
+    def test_nostrmedia_job_writes_changed_metadata_only(self):
+        """Test that the uploaded URL is saved unless the metadata has it"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            self.service._channel_dir = temp_dir
+            self.service._videos_dir = os.path.join(temp_dir, "videos")
+            video_dir = os.path.join(self.service._videos_dir, "abc")
+            os.makedirs(os.path.join(video_dir, "youtube"))
+            open(os.path.join(video_dir, "youtube", "video.mp4"), "w").close()
+            metadata_path = os.path.join(video_dir, "metadata.json")
+            save_json_file(metadata_path, {"title": "abc"})
+
+            videos = [
+                {"video_id": "abc", "downloaded": True},
+                {"video_id": "xyz", "downloaded": True, "nostrmedia_url": "url"},
+            ]
+            result = {"success": True, "url": "https://example.com/abc.mp4"}
+            with patch.object(
+                scheduler_service, "list_videos", return_value=(videos, {})
+            ), patch.object(
+                scheduler_service, "upload_to_nostrmedia", return_value=result
+            ), patch.object(
+                scheduler_service, "save_json_file"
+            ) as mock_save:
+                self.service._run_regular_nostrmedia_job()
+                self.assertEqual(
+                    mock_save.call_args[0][1]["platforms"]["nostrmedia"]["url"],
+                    result["url"],
+                )
+                save_json_file(*mock_save.call_args[0])
+
+                # Nothing to write when the upload is already recorded
+                mock_save.reset_mock()
+                self.service._run_regular_nostrmedia_job()
+                mock_save.assert_not_called()
+
+    def test_nostrmedia_job_without_youtube_dir(self):
+        """Test that the nostrmedia job skips a video without a youtube dir"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            self.service._videos_dir = temp_dir
+            videos = [{"video_id": "abc", "downloaded": True}]
+            with patch.object(
+                scheduler_service, "list_videos", return_value=(videos, {})
+            ), patch.object(scheduler_service, "upload_to_nostrmedia") as mock_upload:
+                self.service._run_regular_nostrmedia_job()
+
+        mock_upload.assert_not_called()
+
+    def test_nostr_job_posts_first_pending_video(self):
+        """Test that the nostr job stops at the first video to post"""
+        videos = [
+            {"video_id": "a", "downloaded": False},
+            {"video_id": "b", "downloaded": True, "nostr_post_count": 1},
+            {"video_id": "c", "downloaded": True},
+            {"video_id": "d", "downloaded": True},
+        ]
+        with patch.object(
+            scheduler_service, "list_videos", return_value=(videos, {})
+        ), patch.object(
+            scheduler_service, "post_to_nostr", return_value=True
+        ) as mock_post:
+            self.service._run_nostr_job()
+
+        self.assertEqual(mock_post.call_args[1]["video_id"], "c")
+
+    def test_hourly_sync_is_done_by_regular_sync(self):
+        """Test that the hourly sync leaves the refresh to the regular sync"""
+        self.service._api_key = "key"
+        with patch.object(
+            scheduler_service, "sync_metadata", return_value={}
+        ) as mock_sync:
+            self.service._run_sync_job()
+            mock_sync.assert_not_called()
+
+            self.service._run_regular_sync_job()
+            self.service._run_regular_sync_job()
+            self.assertEqual(
+                [call[1]["force_refresh"] for call in mock_sync.call_args_list],
+                [True, False],
+            )
+
+            # Without the regular sync, the hourly sync syncs itself
+            self.service.disable_job("regular_sync")
+            self.service._run_sync_job()
+            self.assertTrue(mock_sync.call_args[1]["force_refresh"])
+            self.assertEqual(mock_sync.call_args[1]["max_videos"], 5)
+
+    def test_enable_unknown_job(self):
+        """Test that enabling an unknown job fails"""
+        self.assertFalse(self.service.enable_job("nonexistent"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,11 +2,16 @@
 Tests for the VideoService
 """
 
+import os
+import tempfile
+import threading
 import unittest
 from unittest.mock import Mock, patch
 
 from src.nosvid.models.video import Platform, Video
-from src.nosvid.services.video_service import VideoService
+from src.nosvid.services import video_service
+from src.nosvid.services.video_service import VideoService, download_status
+from src.nosvid.utils.filesystem import save_json_file
 
 
 class TestVideoService(unittest.TestCase):
@@ -182,11 +187,14 @@ class TestVideoService(unittest.TestCase):
         mock_download.return_value = True
 
         # Call the service
-        result = self.service.download_video("video1", self.channel_title)
+        with patch.object(Video, "to_dict") as mock_to_dict:
+            result = self.service.download_video("video1", self.channel_title)
 
         # Check the result
         self.assertTrue(result.success)
         self.assertTrue(result.data)
+        # The video isn't serialized just to look at its platforms
+        mock_to_dict.assert_not_called()
 
         # Check that the repository was called correctly
         self.mock_repo.get_by_id.assert_called_once_with("video1", self.channel_title)
@@ -276,6 +284,117 @@ class TestVideoService(unittest.TestCase):
             quality="best",
         )
 
+    @patch("src.nosvid.services.video_service.download_video_func")
+    def test_download_videos_concurrently(self, mock_download):
+        """Test that different videos download together, the same one once"""
+        self.mock_repo.get_by_id.side_effect = lambda video_id, _: Video(
+            video_id=video_id, title=video_id, published_at="", duration=0
+        )
+        self.mock_repo.save.return_value = True
+
+        # The downloads meet the test once both are running, and then wait
+        # for it to look at them
+        both_running = threading.Barrier(3, timeout=5)
+        checked = threading.Event()
+
+        def fake_download(**kwargs):
+            both_running.wait()
+            return checked.wait(timeout=5)
+
+        mock_download.side_effect = fake_download
+
+        results = {}
+
+        def download(video_id):
+            results[video_id] = self.service.download_video(
+                video_id, self.channel_title, user=f"user-{video_id}"
+            )
+
+        threads = [
+            threading.Thread(target=download, args=(video_id,))
+            for video_id in ("video1", "video2")
+        ]
+        for thread in threads:
+            thread.start()
+
+        both_running.wait()
+        status = download_status()
+        duplicate = self.service.download_video("video1", self.channel_title)
+        checked.set()
+
+        for thread in threads:
+            thread.join()
+
+        self.assertTrue(results["video1"].success)
+        self.assertTrue(results["video2"].success)
+        self.assertTrue(status["in_progress"])
+        self.assertEqual(
+            sorted(d["user"] for d in status["downloads"]),
+            ["user-video1", "user-video2"],
+        )
+        self.assertFalse(duplicate.success)
+        self.assertIn("already in progress for video video1", duplicate.error)
+        self.assertFalse(download_status()["in_progress"])
+
+    def test_download_status_does_not_wait_for_writers(self):
+        """Test that the download status is read without the writers' lock"""
+        with video_service._downloads_lock:
+            self.assertFalse(download_status()["in_progress"])
+
+    def test_cache_statistics_are_reused_until_a_write(self):
+        """Test that statistics are computed again only after changes"""
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.mock_repo.base_dir = temp_dir.name
+        self.mock_repo.aggregate_stats.return_value = {"total_with_metadata": 2}
+        self.mock_repo.save.return_value = True
+        metadata_dir = os.path.join(temp_dir.name, self.channel_title, "metadata")
+        os.makedirs(metadata_dir)
+        save_json_file(
+            os.path.join(metadata_dir, "channel_videos_UCxSRxq14XIoMbFDEjMOPU5Q.json"),
+            {"video_count": 7, "videos": []},
+        )
+
+        result = self.service.get_cache_statistics(self.channel_title)
+        self.assertEqual(result.data["total_in_cache"], 7)
+        self.assertEqual(result.data["total_with_metadata"], 2)
+
+        # A new service for the same repository reuses the statistics
+        result.data["total_with_metadata"] = 0
+        other = VideoService(self.mock_repo)
+        result = other.get_cache_statistics(self.channel_title)
+        self.assertEqual(result.data["total_with_metadata"], 2)
+        self.mock_repo.aggregate_stats.assert_called_once_with(self.channel_title)
+
+        # Saving a video drops them
+        self.mock_repo.aggregate_stats.return_value = {"total_with_metadata": 3}
+        self.service.save_video(self.video3, self.channel_title)
+        result = other.get_cache_statistics(self.channel_title)
+        self.assertEqual(result.data["total_with_metadata"], 3)
+
+        # And so does the TTL
+        with patch("src.nosvid.services.video_service.STATISTICS_TTL", 0):
+            other.get_cache_statistics(self.channel_title)
+        self.assertEqual(self.mock_repo.aggregate_stats.call_count, 3)
+
+    @patch("src.nosvid.services.video_service.update_nostrmedia_metadata")
+    def test_set_nostrmedia_url_uses_one_upload_time(self, mock_update):
+        """Test that both metadata files get the same upload time"""
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.mock_repo.base_dir = temp_dir.name
+        self.mock_repo.get_by_id.return_value = self.video1
+        self.mock_repo.save.return_value = True
+
+        result = self.service.set_nostrmedia_url(
+            "video1", self.channel_title, "https://example.com/video1.mp4"
+        )
+
+        self.assertTrue(result.success)
+        uploaded_at = mock_update.call_args[0][1]["uploaded_at"]
+        self.assertTrue(uploaded_at)
+        self.assertEqual(self.video1.platforms["nostrmedia"].uploaded_at, uploaded_at)
+
     def test_save_video_success(self):
         """Test saving a video successfully"""
         # Set up the mock
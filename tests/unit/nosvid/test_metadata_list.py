@@ -0,0 +1,79 @@
+"""
+Tests for listing the videos of a repository
+"""
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from src.nosvid.metadata import list as metadata_list
+from src.nosvid.utils.filesystem import save_json_file
+
+
+class TestListVideos(unittest.TestCase):
+    """Tests for list_videos"""
+
+    def setUp(self):
+        """Set up a videos directory with two videos"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.videos_dir = self.temp_dir.name
+        self.write_metadata("b", "2024-02-01", downloaded=False)
+        self.write_metadata(
+            "a",
+            "2024-01-01",
+            downloaded=True,
+            nostr={"posts": [{"event_id": "e"}]},
+            nostrmedia={"url": "https://example.com/a.mp4"},
+        )
+
+    def write_metadata(self, video_id, published_at, downloaded, **platforms):
+        """Write the main metadata.json of a video"""
+        platforms["youtube"] = {"url": f"yt/{video_id}", "downloaded": downloaded}
+        video_dir = os.path.join(self.videos_dir, video_id)
+        os.makedirs(video_dir, exist_ok=True)
+        save_json_file(
+            os.path.join(video_dir, "metadata.json"),
+            {"title": video_id, "published_at": published_at, "platforms": platforms},
+        )
+
+    def test_list_videos(self):
+        """Test that videos are listed oldest first with their platforms"""
+        videos, stats = metadata_list.list_videos(self.videos_dir)
+
+        self.assertEqual([v["video_id"] for v in videos], ["a", "b"])
+        self.assertEqual(videos[0]["nostrmedia_url"], "https://example.com/a.mp4")
+        self.assertEqual(videos[0]["nostr_post_count"], 1)
+        self.assertEqual(videos[1]["url"], "yt/b")
+        self.assertEqual(stats["total_with_metadata"], 2)
+        self.assertEqual(stats["total_downloaded"], 1)
+        self.assertEqual(stats["total_posted_nostr"], 1)
+
+        videos, _ = metadata_list.list_videos(self.videos_dir, show_downloaded=False)
+        self.assertEqual([v["video_id"] for v in videos], ["b"])
+
+    def test_unchanged_metadata_is_not_parsed_again(self):
+        """Test that a listing reuses the summaries of unchanged files"""
+        metadata_list.list_videos(self.videos_dir)
+
+        with patch.object(
+            metadata_list, "load_json_file", wraps=metadata_list.load_json_file
+        ) as mock_load:
+            videos, _ = metadata_list.list_videos(self.videos_dir)
+            mock_load.assert_not_called()
+
+            # A changed file is read again
+            self.write_metadata("b", "2024-02-01", downloaded=True)
+            videos, _ = metadata_list.list_videos(self.videos_dir)
+            self.assertEqual(mock_load.call_count, 1)
+        self.assertTrue(videos[1]["downloaded"])
+
+        # The listed entries are the caller's to modify
+        videos[1]["downloaded"] = False
+        videos, _ = metadata_list.list_videos(self.videos_dir)
+        self.assertTrue(videos[1]["downloaded"])
+
+
+if __name__ == "__main__":
+    unittest.main()
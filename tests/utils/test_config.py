@@ -5,6 +5,7 @@ Tests for the config utility functions
 import os
 import tempfile
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import patch
 
 import yaml
@@ -70,6 +71,76 @@ class TestConfigUtils(unittest.TestCase):
         loaded_config = config.load_config("nonexistent.yaml")
         self.assertEqual(loaded_config, {})
 
+    def test_load_config_cache(self):
+        """Test that an unchanged config file is only parsed once"""
+        config.load_config(self.temp_file.name)
+
+        with patch("builtins.open", side_effect=AssertionError("reopened")):
+            loaded_config = config.load_config(self.temp_file.name)
+
+        self.assertEqual(loaded_config, self.test_config)
+
+    def test_load_config_cache_returns_copies(self):
+        """Test that modifying a loaded config does not leak into later loads"""
+        config.load_config(self.temp_file.name)["nostr"]["nsec"] = "modified"
+
+        self.assertEqual(
+            config.load_config(self.temp_file.name)["nostr"]["nsec"], "test_nsec"
+        )
+
+    def test_load_config_shared(self):
+        """Test that shared loads return the same parsed config"""
+        shared = config.load_config(self.temp_file.name, shared=True)
+
+        self.assertIs(config.load_config(self.temp_file.name, shared=True), shared)
+        self.assertIsNot(config.load_config(self.temp_file.name), shared)
+
+        # The shared config is read-only
+        with self.assertRaises(TypeError):
+            shared["nostr"]["nsec"] = "modified"
+
+    def test_load_config_concurrent_with_clear(self):
+        """Test that loads keep working while other threads clear the cache"""
+
+        def load_and_clear(_):
+            for _ in range(200):
+                loaded = config.load_config(self.temp_file.name, shared=True)
+                self.assertEqual(loaded["nostr"]["nsec"], "test_nsec")
+                config.clear_config_cache(self.temp_file.name)
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(load_and_clear, range(4)))
+
+    def test_freeze_config_round_trip(self):
+        """Test that unfreezing a frozen config gives back plain containers"""
+        data = {"a": {"b": [1, {"c": 2}]}, "d": None}
+        frozen = config.freeze_config(data)
+
+        self.assertIsInstance(frozen["a"]["b"], tuple)
+        unfrozen = config.unfreeze_config(frozen)
+        self.assertEqual(unfrozen, data)
+        self.assertIsInstance(unfrozen["a"]["b"][1], dict)
+
+    def test_load_config_utf8(self):
+        """Test that non-ASCII values survive the binary read"""
+        with open(self.temp_file.name, "w", encoding="utf-8") as f:
+            f.write("channel:\n  title: Zürich\n")
+
+        self.assertEqual(
+            config.load_config(self.temp_file.name), {"channel": {"title": "Zürich"}}
+        )
+
+    def test_load_config_sees_changes(self):
+        """Test that editing the config file invalidates the cache"""
+        config.load_config(self.temp_file.name)
+
+        with open(self.temp_file.name, "w") as f:
+            yaml.dump({"nostr": {"activated": True}}, f)
+
+        self.assertEqual(
+            config.load_config(self.temp_file.name), {"nostr": {"activated": True}}
+        )
+
     def test_read_api_key_from_yaml(self):
         """Test reading API key from YAML file"""
         # Test reading from config.yaml
@@ -0,0 +1,171 @@
+"""
+Tests for the filesystem utility functions
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from src.nosvid.utils import filesystem
+
+
+class TestFilesystemUtils(unittest.TestCase):
+    """Tests for the filesystem utility functions"""
+
+    def setUp(self):
+        """Set up the test environment"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.metadata_file = os.path.join(self.temp_dir.name, "metadata.json")
+
+    def tearDown(self):
+        """Clean up the test environment"""
+        self.temp_dir.cleanup()
+
+    def test_load_json_file_missing(self):
+        """Test loading a missing file returns the default"""
+        self.assertEqual(filesystem.load_json_file(self.metadata_file), {})
+        self.assertEqual(filesystem.load_json_file(self.metadata_file, []), [])
+
+    def test_load_json_file_returns_independent_copies(self):
+        """Test that mutating loaded data does not leak into later loads"""
+        filesystem.save_json_file(self.metadata_file, {"platforms": {}})
+
+        first = filesystem.load_json_file(self.metadata_file)
+        first["platforms"]["nostr"] = {"posts": []}
+
+        self.assertEqual(
+            filesystem.load_json_file(self.metadata_file), {"platforms": {}}
+        )
+
+    def test_load_json_file_cache_hit(self):
+        """Test that an unchanged file is not reopened"""
+        filesystem.save_json_file(self.metadata_file, {"title": "Cached"})
+        filesystem.load_json_file(self.metadata_file)
+
+        with patch("builtins.open", side_effect=AssertionError("reopened")):
+            data = filesystem.load_json_file(self.metadata_file)
+
+        self.assertEqual(data, {"title": "Cached"})
+
+    def test_load_json_file_sees_external_changes(self):
+        """Test that a file changed behind the cache's back is reread"""
+        filesystem.save_json_file(self.metadata_file, {"title": "Old"})
+        filesystem.load_json_file(self.metadata_file)
+
+        with open(self.metadata_file, "w") as f:
+            json.dump({"title": "Changed elsewhere"}, f)
+        os.utime(self.metadata_file, ns=(0, 0))
+
+        self.assertEqual(
+            filesystem.load_json_file(self.metadata_file),
+            {"title": "Changed elsewhere"},
+        )
+
+    def test_save_json_file_invalidates_cache(self):
+        """Test that saving a file makes the next load see the new content"""
+        filesystem.save_json_file(self.metadata_file, {"n": 1})
+        filesystem.load_json_file(self.metadata_file)
+
+        # Same size and (forced) same mtime, so only the save can invalidate
+        stat = os.stat(self.metadata_file)
+        filesystem.save_json_file(self.metadata_file, {"n": 2})
+        os.utime(self.metadata_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+        self.assertEqual(filesystem.load_json_file(self.metadata_file), {"n": 2})
+
+    def test_save_json_file(self):
+        """Test saving JSON data replaces the file without leaving a temp file"""
+        with open(self.metadata_file, "w") as f:
+            json.dump({"title": "Old"}, f)
+
+        self.assertTrue(filesystem.save_json_file(self.metadata_file, {"title": "New"}))
+
+        with open(self.metadata_file) as f:
+            self.assertEqual(json.load(f), {"title": "New"})
+        self.assertEqual(os.listdir(self.temp_dir.name), ["metadata.json"])
+
+    def test_save_json_file_error_keeps_original(self):
+        """Test that a failed save leaves the existing file untouched"""
+        with open(self.metadata_file, "w") as f:
+            json.dump({"title": "Old"}, f)
+
+        with patch("src.nosvid.utils.filesystem.orjson.dumps", side_effect=TypeError):
+            self.assertFalse(filesystem.save_json_file(self.metadata_file, {}))
+
+        with open(self.metadata_file) as f:
+            self.assertEqual(json.load(f), {"title": "Old"})
+        self.assertEqual(os.listdir(self.temp_dir.name), ["metadata.json"])
+
+    def test_save_json_file_concurrent_writers(self):
+        """Test that concurrent saves of one file each write a whole file"""
+        payloads = [{"writer": n, "data": "x" * 100000} for n in range(8)]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(
+                executor.map(
+                    lambda data: filesystem.save_json_file(self.metadata_file, data),
+                    payloads,
+                )
+            )
+
+        self.assertTrue(all(results))
+        self.assertIn(filesystem.load_json_file(self.metadata_file), payloads)
+        self.assertEqual(os.listdir(self.temp_dir.name), ["metadata.json"])
+        self.assertEqual(os.stat(self.metadata_file).st_mode & 0o777, 0o644)
+
+    def test_save_json_file_fsyncs(self):
+        """Test that a save is flushed to disk before it replaces the file"""
+        with patch("src.nosvid.utils.filesystem.os.fsync") as mock_fsync:
+            filesystem.save_json_file(self.metadata_file, {"n": 1})
+
+        mock_fsync.assert_called_once()
+
+    def test_batch_write_defers_fsync(self):
+        """Test that batch_write syncs the saved files when the block exits"""
+        other_file = os.path.join(self.temp_dir.name, "other.json")
+
+        with patch("src.nosvid.utils.filesystem.os.fsync") as mock_fsync:
+            with filesystem.batch_write():
+                filesystem.save_json_file(self.metadata_file, {"n": 1})
+                filesystem.save_json_file(other_file, {"n": 2})
+                filesystem.save_json_file(self.metadata_file, {"n": 3})
+                mock_fsync.assert_not_called()
+
+        # Each file once, plus their directory
+        self.assertEqual(mock_fsync.call_count, 3)
+        self.assertEqual(filesystem.load_json_file(self.metadata_file), {"n": 3})
+
+    def test_stat_cache(self):
+        """Test that the stat cache checks signatures and evicts the oldest"""
+        cache = filesystem.StatCache(2)
+        cache.put("a", (1, 1), "A")
+        cache.put("b", (1, 1), "B")
+
+        self.assertEqual(cache.get(os.path.abspath("a"), (1, 1)), "A")
+        self.assertIsNone(cache.get("a", (2, 1)))
+
+        # "a" was used last, so "b" makes way for "c"
+        cache.put("c", (1, 1), "C")
+        self.assertIsNone(cache.get("b", (1, 1)))
+        self.assertEqual(cache.get("a", (1, 1)), "A")
+
+        cache.invalidate("a")
+        self.assertIsNone(cache.get("a", (1, 1)))
+
+    def test_video_dir_index(self):
+        """Test that the index follows platform directories being added"""
+        video_dir = os.path.join(self.temp_dir.name, "video")
+        self.assertEqual(filesystem.video_dir_index(video_dir), frozenset())
+
+        os.makedirs(os.path.join(video_dir, "youtube"))
+        open(os.path.join(video_dir, "metadata.json"), "w").close()
+        self.assertEqual(filesystem.video_dir_index(video_dir), {"youtube"})
+
+        filesystem.get_platform_dir(video_dir, "nostr")
+        self.assertEqual(filesystem.video_dir_index(video_dir), {"youtube", "nostr"})
+
+
+if __name__ == "__main__":
+    unittest.main()